@@ -3,11 +3,17 @@
 
 import argparse
 import csv
-import math
 import pathlib
+import sys
 from collections import defaultdict
-from statistics import mean, pstdev
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+from latency_histogram import LogHistogram  # noqa: E402
+from result_frame import MIB, load_frame  # noqa: E402
 
 try:
     import matplotlib.pyplot as plt  # type: ignore
@@ -25,6 +31,12 @@ FILE_SORT_ORDER = {
     "test4g.dat": 4096,
 }
 
+DEFAULT_QUANTILES = [0.5, 0.95]
+
+BENCH_COLUMNS = ["run", "file", "size_bytes", "duration_ms", "throughput_mib_per_s"]
+
+Series = Dict[str, Tuple[List[float], List[float]]]
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description=__doc__)
@@ -43,9 +55,45 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Skip plot generation (useful if matplotlib is unavailable)",
     )
+    parser.add_argument(
+        "--quantiles",
+        type=parse_quantiles,
+        default=DEFAULT_QUANTILES,
+        help="Comma-separated percentiles to report, e.g. 50,90,95,99,99.9 (default: 50,95)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read the CSV in chunks with bounded memory; quantiles are then "
+        "approximate (within 1%% relative error)",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=100_000,
+        help="Rows per chunk in --stream mode (default: 100000)",
+    )
+    parser.add_argument(
+        "--max-points",
+        type=int,
+        default=2000,
+        help="Points kept per file for the time-series plot in --stream mode (default: 2000)",
+    )
     return parser.parse_args()
 
 
+def parse_quantiles(text: str) -> List[float]:
+    quantiles = sorted({float(part) / 100 for part in text.split(",") if part.strip()})
+    if not quantiles or any(not 0 <= q <= 1 for q in quantiles):
+        raise argparse.ArgumentTypeError("percentiles must be between 0 and 100")
+    return quantiles
+
+
+def quantile_label(q: float) -> str:
+    """Column suffix for a quantile: 0.5 -> 'p50', 0.999 -> 'p99_9'."""
+    return "p" + f"{q * 100:g}".replace(".", "_")
+
+
 class BenchRow:
     __slots__ = ("run", "file", "size_bytes", "duration_ms", "throughput_mib_per_s")
 
@@ -97,78 +145,202 @@ def size_label_simple(file: str) -> str:
 
 
 def load_data(csv_path: pathlib.Path) -> List[BenchRow]:
-    rows: List[BenchRow] = []
-    with csv_path.open("r", newline="") as handle:
-        reader = csv.DictReader(handle)
-        required = {
-            "run",
-            "file",
-            "size_bytes",
-            "duration_ms",
-            "throughput_mib_per_s",
-        }
-        missing = required - set(reader.fieldnames or [])
-        if missing:
-            raise ValueError(f"CSV is missing required columns: {sorted(missing)}")
-        for raw in reader:
-            rows.append(
-                BenchRow(
-                    run=int(raw["run"]),
-                    file=raw["file"],
-                    size_bytes=int(raw["size_bytes"]),
-                    duration_ms=float(raw["duration_ms"]),
-                    throughput=float(raw["throughput_mib_per_s"]),
-                )
-            )
+    """Load upload timings from bench_results.csv (or any result format
+    understood by result_frame) through the shared ingestion cache."""
+    columns = ["iteration", "file", "fileSize", "upload_time", "upload_throughput"]
+    frame = load_frame(csv_path, columns=columns)
+    missing = set(columns) - set(frame.columns)
+    if missing:
+        raise ValueError(f"Results are missing required columns: {sorted(missing)}")
+    frame = frame.dropna(subset=["upload_time"])
+    rows: List[BenchRow] = [
+        BenchRow(run=int(run), file=file, size_bytes=int(size),
+                 duration_ms=duration * 1000, throughput=throughput / MIB)
+        for run, file, size, duration, throughput in zip(
+            frame["iteration"], frame["file"].astype(str), frame["fileSize"],
+            frame["upload_time"], frame["upload_throughput"],
+        )
+    ]
     rows.sort(key=lambda r: (sort_key(r.file), r.run))
     return rows
 
 
-def percentile(values: List[float], pct: float) -> float:
-    if not values:
-        return math.nan
-    sorted_vals = sorted(values)
-    k = (len(sorted_vals) - 1) * pct
-    f = math.floor(k)
-    c = math.ceil(k)
-    if f == c:
-        return sorted_vals[int(k)]
-    d0 = sorted_vals[f] * (c - k)
-    d1 = sorted_vals[c] * (k - f)
-    return d0 + d1
+def describe(values: Sequence[float], quantiles: Sequence[float]) -> Dict[str, float]:
+    """Moments, extremes and the requested quantiles of one group.
+
+    The values are sorted once; min/max are its ends and every quantile is
+    read from it with linear interpolation between ranks (numpy's default
+    definition), so asking for more percentiles costs no extra passes.
+    """
+    ordered = np.sort(np.asarray(values, dtype=float))
+    count = len(ordered)
+    if count == 0:
+        return {"count": 0, "mean": np.nan, "std": np.nan, "min": np.nan, "max": np.nan,
+                **{quantile_label(q): np.nan for q in quantiles}}
 
+    ranks = (count - 1) * np.asarray(quantiles, dtype=float)
+    lower = np.floor(ranks).astype(int)
+    upper = np.ceil(ranks).astype(int)
+    points = ordered[lower] + (ordered[upper] - ordered[lower]) * (ranks - lower)
 
-def summarise(rows: List[BenchRow]) -> Dict[str, Dict[str, float]]:
+    return {
+        "count": count,
+        "mean": float(ordered.mean()),
+        "std": float(ordered.std()) if count > 1 else 0.0,
+        "min": float(ordered[0]),
+        "max": float(ordered[-1]),
+        **{quantile_label(q): float(v) for q, v in zip(quantiles, points)},
+    }
+
+
+def summarise(rows: List[BenchRow], quantiles: Sequence[float] = DEFAULT_QUANTILES) -> Dict[str, Dict[str, float]]:
     grouped: Dict[str, List[BenchRow]] = defaultdict(list)
     for row in rows:
         grouped[row.file].append(row)
 
     summary: Dict[str, Dict[str, float]] = {}
     for file, items in grouped.items():
-        durations = [item.duration_ms for item in items]
-        throughputs = [item.throughput_mib_per_s for item in items]
+        durations = describe([item.duration_ms for item in items], quantiles)
+        throughputs = describe([item.throughput_mib_per_s for item in items], quantiles)
         size_bytes = items[0].size_bytes
         summary[file] = {
             "run_count": len(items),
             "size_bytes": size_bytes,
             "size_mib": size_bytes / (1024 * 1024),
-            "duration_ms_mean": mean(durations),
-            "duration_ms_std": pstdev(durations) if len(durations) > 1 else 0.0,
-            "duration_ms_min": min(durations),
-            "duration_ms_max": max(durations),
-            "throughput_mean": mean(throughputs),
-            "throughput_std": pstdev(throughputs) if len(throughputs) > 1 else 0.0,
-            "throughput_min": min(throughputs),
-            "throughput_p50": percentile(throughputs, 0.5),
-            "throughput_p95": percentile(throughputs, 0.95),
-            "throughput_max": max(throughputs),
+            **{f"duration_ms_{key}": value for key, value in durations.items() if key != "count"},
+            **{f"throughput_{key}": value for key, value in throughputs.items() if key != "count"},
         }
     return summary
 
 
-def write_summary_csv(summary: Dict[str, Dict[str, float]], outdir: pathlib.Path) -> pathlib.Path:
+class DownsampledSeries:
+    """Bounded (run, value) series that averages runs into buckets.
+
+    Each bucket holds the mean of `stride` consecutive values. Whenever
+    more than `max_points` buckets exist, adjacent pairs are merged and
+    the stride doubles, so memory stays O(max_points) for any input length.
+    """
+
+    def __init__(self, max_points: int = 2000):
+        self.max_points = max_points
+        self.stride = 1
+        self.runs: List[float] = []
+        self.sums: List[float] = []
+        self.counts: List[int] = []
+
+    def extend(self, runs: np.ndarray, values: np.ndarray) -> None:
+        start = 0
+        if self.counts and self.counts[-1] < self.stride:
+            start = min(self.stride - self.counts[-1], len(values))
+            self.sums[-1] += float(values[:start].sum())
+            self.counts[-1] += start
+        runs, values = runs[start:], values[start:]
+        full = len(values) // self.stride * self.stride
+        if full:
+            self.runs.extend(runs[:full:self.stride].tolist())
+            self.sums.extend(values[:full].reshape(-1, self.stride).sum(axis=1).tolist())
+            self.counts.extend([self.stride] * (full // self.stride))
+        if full < len(values):
+            self.runs.append(float(runs[full]))
+            self.sums.append(float(values[full:].sum()))
+            self.counts.append(len(values) - full)
+        while len(self.counts) > self.max_points:
+            self._halve()
+
+    def _halve(self) -> None:
+        self.runs = self.runs[::2]
+        self.sums = [sum(self.sums[i:i + 2]) for i in range(0, len(self.sums), 2)]
+        self.counts = [sum(self.counts[i:i + 2]) for i in range(0, len(self.counts), 2)]
+        self.stride *= 2
+
+    def points(self) -> Tuple[List[float], List[float]]:
+        return self.runs, [total / count for total, count in zip(self.sums, self.counts)]
+
+
+class StreamingFileStats:
+    """Per-file running statistics: O(1) memory in the number of rows."""
+
+    def __init__(self, size_bytes: int, max_points: int):
+        self.size_bytes = size_bytes
+        self.durations = LogHistogram()
+        self.throughputs = LogHistogram()
+        self.series = DownsampledSeries(max_points)
+
+    def add(self, runs: np.ndarray, durations: np.ndarray, throughputs: np.ndarray) -> None:
+        self.durations.record_array(durations)
+        self.throughputs.record_array(throughputs)
+        self.series.extend(runs, throughputs)
+
+
+def describe_histogram(histogram: LogHistogram, quantiles: Sequence[float]) -> Dict[str, float]:
+    """describe() for streamed data: exact moments/extremes, sketched quantiles."""
+    return {
+        "count": histogram.count,
+        "mean": histogram.mean,
+        "std": histogram.pstddev,
+        "min": histogram.min,
+        "max": histogram.max,
+        **{quantile_label(q): v for q, v in zip(quantiles, histogram.quantiles(list(quantiles)))},
+    }
+
+
+def summarise_stream(csv_path: pathlib.Path, quantiles: Sequence[float] = DEFAULT_QUANTILES,
+                     chunk_rows: int = 100_000, max_points: int = 2000
+                     ) -> Tuple[Dict[str, Dict[str, float]], Series]:
+    """Summarise bench_results.csv chunk by chunk.
+
+    Only one chunk plus a fixed-size accumulator per file is held in
+    memory. Means, standard deviations and extremes are exact (Welford /
+    Chan merging); quantiles come from a mergeable log-bucketed histogram
+    and are within 1% relative error. Rows are assumed to be in run order
+    per file, as the Go benchmark writes them.
+    """
+    stats: Dict[str, StreamingFileStats] = {}
+    chunks = pd.read_csv(csv_path, usecols=lambda name: name in BENCH_COLUMNS,
+                         chunksize=chunk_rows)
+    for chunk in chunks:
+        missing = set(BENCH_COLUMNS) - set(chunk.columns)
+        if missing:
+            raise ValueError(f"CSV is missing required columns: {sorted(missing)}")
+        for file, group in chunk.groupby("file", sort=False):
+            if file not in stats:
+                stats[file] = StreamingFileStats(int(group["size_bytes"].iloc[0]), max_points)
+            stats[file].add(
+                group["run"].to_numpy(dtype=float),
+                group["duration_ms"].to_numpy(dtype=float),
+                group["throughput_mib_per_s"].to_numpy(dtype=float),
+            )
+
+    summary: Dict[str, Dict[str, float]] = {}
+    series: Series = {}
+    for file, file_stats in stats.items():
+        durations = describe_histogram(file_stats.durations, quantiles)
+        throughputs = describe_histogram(file_stats.throughputs, quantiles)
+        summary[file] = {
+            "run_count": file_stats.durations.count,
+            "size_bytes": file_stats.size_bytes,
+            "size_mib": file_stats.size_bytes / (1024 * 1024),
+            **{f"duration_ms_{key}": value for key, value in durations.items() if key != "count"},
+            **{f"throughput_{key}": value for key, value in throughputs.items() if key != "count"},
+        }
+        series[file] = file_stats.series.points()
+    return summary, series
+
+
+def series_from_rows(rows: List[BenchRow]) -> Series:
+    series: Series = {}
+    for row in rows:
+        runs, values = series.setdefault(row.file, ([], []))
+        runs.append(row.run)
+        values.append(row.throughput_mib_per_s)
+    return series
+
+
+def write_summary_csv(summary: Dict[str, Dict[str, float]], outdir: pathlib.Path,
+                      quantiles: Sequence[float] = DEFAULT_QUANTILES) -> pathlib.Path:
     outdir.mkdir(parents=True, exist_ok=True)
     csv_path = outdir / "summary.csv"
+    labels = [quantile_label(q) for q in quantiles]
     fieldnames = [
         "file",
         "run_count",
@@ -177,12 +349,12 @@ def write_summary_csv(summary: Dict[str, Dict[str, float]], outdir: pathlib.Path
         "duration_ms_mean",
         "duration_ms_std",
         "duration_ms_min",
+        *[f"duration_ms_{label}" for label in labels],
         "duration_ms_max",
         "throughput_mean",
         "throughput_std",
         "throughput_min",
-        "throughput_p50",
-        "throughput_p95",
+        *[f"throughput_{label}" for label in labels],
         "throughput_max",
     ]
     with csv_path.open("w", newline="") as handle:
@@ -227,17 +399,13 @@ def plot_mean_bar(summary: Dict[str, Dict[str, float]], outdir: pathlib.Path) ->
     return out_path
 
 
-def plot_time_series(rows: List[BenchRow], outdir: pathlib.Path) -> Optional[pathlib.Path]:
+def plot_time_series(series: Series, outdir: pathlib.Path) -> Optional[pathlib.Path]:
     if plt is None:
         return None
     outdir.mkdir(parents=True, exist_ok=True)
-    series: Dict[str, List[BenchRow]] = defaultdict(list)
-    for row in rows:
-        series[row.file].append(row)
     fig, ax = plt.subplots(figsize=(12, 6))
     for file in sorted(series, key=sort_key):
-        runs = [item.run for item in series[file]]
-        values = [item.throughput_mib_per_s for item in series[file]]
+        runs, values = series[file]
         ax.plot(runs, values, marker="o", markersize=3, linestyle="-", label=file)
     ax.set_xlabel("Run")
     ax.set_ylabel("Throughput (MiB/s)")
@@ -251,7 +419,8 @@ def plot_time_series(rows: List[BenchRow], outdir: pathlib.Path) -> Optional[pat
     return out_path
 
 
-def plot_throughput_vs_size(summary: Dict[str, Dict[str, float]], outdir: pathlib.Path) -> Optional[pathlib.Path]:
+def plot_throughput_vs_size(summary: Dict[str, Dict[str, float]], outdir: pathlib.Path,
+                            quantiles: Sequence[float] = DEFAULT_QUANTILES) -> Optional[pathlib.Path]:
     if plt is None:
         return None
     outdir.mkdir(parents=True, exist_ok=True)
@@ -259,10 +428,12 @@ def plot_throughput_vs_size(summary: Dict[str, Dict[str, float]], outdir: pathli
     sizes = [summary[file]["size_mib"] for file in files]
     labels = [size_label(file, summary) for file in files]
     means = [summary[file]["throughput_mean"] for file in files]
-    p95s = [summary[file]["throughput_p95"] for file in files]
     fig, ax = plt.subplots(figsize=(10, 6))
     ax.plot(sizes, means, marker="o", label="Mean")
-    ax.plot(sizes, p95s, marker="o", linestyle="--", label="P95")
+    for q in quantiles:
+        label = quantile_label(q)
+        values = [summary[file][f"throughput_{label}"] for file in files]
+        ax.plot(sizes, values, marker="o", linestyle="--", label=label.replace("_", ".").upper())
     for x, y, label in zip(sizes, means, labels):
         ax.annotate(label, (x, y), textcoords="offset points", xytext=(0, 6), ha="center", fontsize=8)
     ax.set_xlabel("File size (MiB)")
@@ -279,9 +450,13 @@ def plot_throughput_vs_size(summary: Dict[str, Dict[str, float]], outdir: pathli
 
 def main() -> None:
     args = parse_args()
-    rows = load_data(args.csv)
-    summary = summarise(rows)
-    summary_path = write_summary_csv(summary, args.outdir)
+    if args.stream:
+        summary, series = summarise_stream(args.csv, args.quantiles, args.chunk_rows, args.max_points)
+    else:
+        rows = load_data(args.csv)
+        summary = summarise(rows, args.quantiles)
+        series = series_from_rows(rows)
+    summary_path = write_summary_csv(summary, args.outdir, args.quantiles)
 
     mean_bar_path = None
     timeseries_path = None
@@ -294,15 +469,19 @@ def main() -> None:
             )
         else:
             mean_bar_path = plot_mean_bar(summary, args.outdir)
-            timeseries_path = plot_time_series(rows, args.outdir)
-            vs_size_path = plot_throughput_vs_size(summary, args.outdir)
+            timeseries_path = plot_time_series(series, args.outdir)
+            vs_size_path = plot_throughput_vs_size(summary, args.outdir, args.quantiles)
 
     print("Summary (per file):")
     for file in sorted(summary, key=sort_key):
         stats = summary[file]
+        percentiles = ", ".join(
+            f"{label.replace('_', '.')}={stats[f'throughput_{label}']:.2f}"
+            for label in map(quantile_label, args.quantiles)
+        )
         print(
             f"  {file}: runs={stats['run_count']}, size={stats['size_mib']:.2f} MiB, "
-            f"avg throughput={stats['throughput_mean']:.2f} MiB/s (p50={stats['throughput_p50']:.2f}, p95={stats['throughput_p95']:.2f})"
+            f"avg throughput={stats['throughput_mean']:.2f} MiB/s ({percentiles})"
         )
     print()
     print(f"Summary CSV written to: {summary_path}")
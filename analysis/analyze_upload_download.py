@@ -6,6 +6,10 @@ import matplotlib.pyplot as plt
 import numpy as np
 import sys
 import os
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from result_frame import MIB, load_frame
 
 # Set Japanese font if available
 try:
@@ -23,8 +27,15 @@ output_dir = sys.argv[2] if len(sys.argv) > 2 else 'upload_download_analysis'
 # Create output directory
 os.makedirs(output_dir, exist_ok=True)
 
-# Read CSV
-df = pd.read_csv(csv_file)
+# Read results (parsed once, then served from the ingestion cache)
+df = load_frame(csv_file)
+df = df.assign(
+    run=df['iteration'],
+    file=df['file'].astype(str),
+    size_bytes=df['fileSize'],
+    upload_throughput_mib_per_s=df['upload_throughput'] / MIB,
+    download_throughput_mib_per_s=df['download_throughput'] / MIB,
+)
 
 # File size labels
 size_labels = {
@@ -3,11 +3,16 @@
 Analyze and display detailed test results from JSON output
 """
 
-import json
+import argparse
 import sys
-import statistics
 from pathlib import Path
-from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from result_frame import load_frame, to_records
+from result_journal import is_journal
+from result_store import is_store
 
 def format_size(bytes):
     """Format bytes to human readable size"""
@@ -22,15 +27,109 @@ def format_throughput(bytes_per_sec):
     mbps = (bytes_per_sec * 8) / 1_000_000
     return f"{mbps:.2f} Mbps"
 
-def analyze_results(json_file):
-    """Analyze test results from JSON file"""
+def timeline_throughput(timeline):
+    """Instantaneous throughput between consecutive timeline samples
+
+    timeline is a result's [[elapsed_ms, cumulative_bytes], ...] list;
+    returns [(elapsed_s, bytes_per_sec), ...] at each sample's end time.
+    """
+    series = []
+    for (t0, b0), (t1, b1) in zip(timeline, timeline[1:]):
+        if t1 > t0:
+            series.append((t1 / 1000, (b1 - b0) / ((t1 - t0) / 1000)))
+    return series
+
+def find_stalls(timeline, min_gap_ms=1000):
+    """Mid-transfer stalls: gaps of at least min_gap_ms between samples
+
+    Timeline samples are only taken when bytes arrive, so a wide gap means
+    the stream made no progress. Returns [(start_ms, duration_ms), ...].
+    """
+    return [(t0, t1 - t0) for (t0, _), (t1, _) in zip(timeline, timeline[1:])
+            if t1 - t0 >= min_gap_ms]
+
+# Per-result metrics summarised for each (scenario, file) group
+STAT_METRICS = ['upload_time', 'download_time', 'upload_throughput', 'download_throughput',
+                'total_time', 'random_data_gen_time', 'download_ttfb']
+
+def group_stats(group_ids, values, n_groups):
+    """Mean/median/min/max/stdev/count of values for every group at once
+
+    One lexsort orders the values by (group, value); counts, sums and
+    squared deviations then come from bincount and the order statistics
+    from each group's slice bounds. NaN values are ignored, and groups
+    without values get count 0 and NaN statistics.
+    """
+    keep = ~np.isnan(values)
+    ids = group_ids[keep]
+    vals = values[keep]
+    order = np.lexsort((vals, ids))
+    ids = ids[order]
+    vals = vals[order]
+
+    counts = np.bincount(ids, minlength=n_groups)
+    present = counts > 0
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    empty = np.full(n_groups, np.nan)
+
+    mean = np.divide(np.bincount(ids, weights=vals, minlength=n_groups), counts,
+                     out=empty.copy(), where=present)
+    deviations = vals - mean[ids]
+    squares = np.bincount(ids, weights=deviations * deviations, minlength=n_groups)
+    stdev = np.sqrt(np.divide(squares, counts - 1, out=empty.copy(), where=counts > 1))
+
+    first = starts[present]
+    last = first + counts[present] - 1
+    stats = {'count': counts, 'mean': mean, 'stdev': stdev,
+             'min': empty.copy(), 'max': empty.copy(), 'median': empty.copy()}
+    stats['min'][present] = vals[first]
+    stats['max'][present] = vals[last]
+    stats['median'][present] = (vals[(first + last) // 2] + vals[(first + last + 1) // 2]) / 2
+    return stats
+
+def first_valid(column, group_ids, n_groups):
+    """First non-missing value of a column in each group (None if none)"""
+    rows = np.flatnonzero(column.notna().to_numpy())
+    groups, first = np.unique(group_ids[rows], return_index=True)
+    out = np.full(n_groups, None, dtype=object)
+    out[groups] = column.to_numpy(dtype=object)[rows[first]]
+    return out
+
+def print_iterations(records):
+    """Per-iteration detail for one (scenario, file) group"""
+    print(f"  Individual Iterations:")
+    for i, result in enumerate(records, 1):
+        status = "✅" if result['success'] else "❌"
+        print(f"    Iteration {i}: {status}")
+        if result['success']:
+            print(f"      IPFS Hash: {result['ipfs_hash']}")
+            if result.get('random_data_gen_time') is not None:
+                print(f"      Random Data Gen: {result['random_data_gen_time']*1000:.2f} ms")
+            print(f"      Upload Time: {result['upload_time']*1000:.2f} ms ({format_throughput(result['upload_throughput'])})")
+            print(f"      Download Time: {result['download_time']*1000:.2f} ms ({format_throughput(result['download_throughput'])})")
+            print(f"      Total Time: {result['total_time']*1000:.2f} ms")
+            if result.get('download_ttfb') is not None:
+                print(f"      Download TTFB/TTLB: {result['download_ttfb']*1000:.2f} / "
+                      f"{result['download_ttlb']*1000:.2f} ms")
+                stalls = find_stalls(result.get('download_timeline') or [])
+                if stalls:
+                    longest = max(duration for _, duration in stalls)
+                    print(f"      Download Stalls: {len(stalls)} (longest {longest:.0f} ms)")
+        else:
+            print(f"      Error: {result.get('error') or 'Unknown error'}")
+
+def analyze_results(json_file, show_iterations=False):
+    """Analyze test results from any runner output format
 
-    with open(json_file, 'r') as f:
-        data = json.load(f)
+    Results are grouped by (scenario, file) with one sort-based group-by and
+    every metric is summarised in vectorised passes; per-iteration detail
+    (which needs the raw rows and timelines) is only produced on request.
+    """
 
-    config = data['config']
-    results = data['results']
-    timestamp = data.get('timestamp', 'Unknown')
+    frame = load_frame(json_file, timelines=show_iterations)
+    meta = frame.attrs['meta']
+    config = meta['config']
+    timestamp = meta.get('timestamp', 'Unknown')
 
     print("=" * 80)
     print(f"IPFS Bandwidth Test - Detailed Analysis")
@@ -39,104 +138,106 @@ def analyze_results(json_file):
     print(f"Total iterations per file: {config['testConfiguration']['iterations']}")
     print("=" * 80)
 
-    # Group results by scenario and file
-    scenarios = {}
-    for result in results:
-        scenario_key = (result['scenario'], result['scenario_name'], result['bandwidth'])
-        file_key = (result['file'], result['fileSize'])
-
-        if scenario_key not in scenarios:
-            scenarios[scenario_key] = {}
-        if file_key not in scenarios[scenario_key]:
-            scenarios[scenario_key][file_key] = []
-
-        scenarios[scenario_key][file_key].append(result)
+    total_tests = len(frame)
+    if total_tests == 0:
+        print("No results recorded")
+        return
+
+    # Sort-based group-by over (scenario, file), groups in order of first appearance
+    scenario_codes = frame['scenario'].cat.codes.to_numpy().astype(np.int64)
+    file_codes = frame['file'].cat.codes.to_numpy().astype(np.int64)
+    combined = scenario_codes * len(frame['file'].cat.categories) + file_codes
+    _, first_rows, group_ids = np.unique(combined, return_index=True, return_inverse=True)
+    group_ids = group_ids.ravel()
+    appearance = np.argsort(first_rows)
+    n_groups = len(first_rows)
+
+    success = frame['success'].to_numpy(dtype=bool)
+    group_total = np.bincount(group_ids, minlength=n_groups)
+    stats = {}
+    for metric in STAT_METRICS:
+        if metric in frame:
+            values = frame[metric].to_numpy(dtype=float, na_value=np.nan)
+            stats[metric] = group_stats(group_ids, np.where(success, values, np.nan), n_groups)
+
+    # Failed results carry no scenario name or bandwidth, so take the first
+    # row of each group that does
+    scenario_of = frame['scenario'].to_numpy()[first_rows]
+    scenario_name_of = (first_valid(frame['scenario_name'], group_ids, n_groups)
+                        if 'scenario_name' in frame else scenario_of.copy())
+    scenario_name_of = np.where(pd.isna(scenario_name_of), scenario_of, scenario_name_of)
+    bandwidth_of = (first_valid(frame['bandwidth'], group_ids, n_groups)
+                    if 'bandwidth' in frame else np.full(n_groups, None, dtype=object))
+    file_of = frame['file'].to_numpy()[first_rows]
+    size_of = frame['fileSize'].to_numpy()[first_rows]
+
+    members = None
+    if show_iterations:
+        order = np.argsort(group_ids, kind='stable')
+        members = np.split(order, np.cumsum(group_total)[:-1])
+
+    def stat(metric, name, group):
+        return stats[metric][name][group]
 
     # Analyze each scenario
-    for (scenario_id, scenario_name, bandwidth), files in scenarios.items():
+    scenarios = {}
+    for group in appearance:
+        scenario_key = (scenario_of[group], scenario_name_of[group], bandwidth_of[group])
+        scenarios.setdefault(scenario_key, []).append(group)
+
+    for (scenario_id, scenario_name, bandwidth), groups in scenarios.items():
         print(f"\n{'='*60}")
         print(f"Scenario: {scenario_name}")
         print(f"Bandwidth Limit: {bandwidth or 'Unlimited'}")
         print(f"{'='*60}")
 
-        for (filename, filesize), iterations in files.items():
-            print(f"\n  File: {filename} ({format_size(filesize)})")
+        for group in groups:
+            print(f"\n  File: {file_of[group]} ({format_size(size_of[group])})")
             print(f"  {'─'*40}")
 
-            # Individual iteration details
-            print(f"  Individual Iterations:")
-            for i, result in enumerate(iterations, 1):
-                status = "✅" if result['success'] else "❌"
-                print(f"    Iteration {i}: {status}")
-                if result['success']:
-                    print(f"      IPFS Hash: {result['ipfs_hash']}")
-                    print(f"      Random Data Gen: {result['random_data_gen_time']*1000:.2f} ms")
-                    print(f"      Upload Time: {result['upload_time']*1000:.2f} ms ({format_throughput(result['upload_throughput'])})")
-                    print(f"      Download Time: {result['download_time']*1000:.2f} ms ({format_throughput(result['download_throughput'])})")
-                    print(f"      Total Time: {result['total_time']*1000:.2f} ms")
-                else:
-                    print(f"      Error: {result.get('error', 'Unknown error')}")
+            if members is not None:
+                print_iterations(to_records(frame.iloc[members[group]]))
 
             # Statistical summary
-            successful = [r for r in iterations if r['success']]
-            if successful:
-                upload_times = [r['upload_time'] for r in successful]
-                download_times = [r['download_time'] for r in successful]
-                upload_throughputs = [r['upload_throughput'] for r in successful]
-                download_throughputs = [r['download_throughput'] for r in successful]
-                total_times = [r['total_time'] for r in successful]
-                gen_times = [r['random_data_gen_time'] for r in successful]
-
-                print(f"\n  Statistical Summary ({len(successful)}/{len(iterations)} successful):")
-                print(f"  {'─'*40}")
-
-                # Upload statistics
-                print(f"    Upload Time (ms):")
-                print(f"      Mean: {statistics.mean(upload_times)*1000:.2f}")
-                print(f"      Median: {statistics.median(upload_times)*1000:.2f}")
-                print(f"      Min: {min(upload_times)*1000:.2f}")
-                print(f"      Max: {max(upload_times)*1000:.2f}")
-                if len(upload_times) > 1:
-                    print(f"      StdDev: {statistics.stdev(upload_times)*1000:.2f}")
-
-                # Download statistics
-                print(f"    Download Time (ms):")
-                print(f"      Mean: {statistics.mean(download_times)*1000:.2f}")
-                print(f"      Median: {statistics.median(download_times)*1000:.2f}")
-                print(f"      Min: {min(download_times)*1000:.2f}")
-                print(f"      Max: {max(download_times)*1000:.2f}")
-                if len(download_times) > 1:
-                    print(f"      StdDev: {statistics.stdev(download_times)*1000:.2f}")
-
-                # Throughput statistics
-                print(f"    Upload Throughput:")
-                print(f"      Mean: {format_throughput(statistics.mean(upload_throughputs))}")
-                print(f"      Median: {format_throughput(statistics.median(upload_throughputs))}")
-                print(f"      Min: {format_throughput(min(upload_throughputs))}")
-                print(f"      Max: {format_throughput(max(upload_throughputs))}")
-
-                print(f"    Download Throughput:")
-                print(f"      Mean: {format_throughput(statistics.mean(download_throughputs))}")
-                print(f"      Median: {format_throughput(statistics.median(download_throughputs))}")
-                print(f"      Min: {format_throughput(min(download_throughputs))}")
-                print(f"      Max: {format_throughput(max(download_throughputs))}")
-
-                # Total time and generation time
-                print(f"    Total Transfer Time (ms):")
-                print(f"      Mean: {statistics.mean(total_times)*1000:.2f}")
-                print(f"      Median: {statistics.median(total_times)*1000:.2f}")
-
-                print(f"    Random Data Generation Time (ms):")
-                print(f"      Mean: {statistics.mean(gen_times)*1000:.2f}")
-                print(f"      Median: {statistics.median(gen_times)*1000:.2f}")
+            successful = stat('upload_time', 'count', group)
+            if not successful:
+                continue
+
+            print(f"\n  Statistical Summary ({successful}/{group_total[group]} successful):")
+            print(f"  {'─'*40}")
+
+            for metric, label in (('upload_time', 'Upload Time'), ('download_time', 'Download Time')):
+                print(f"    {label} (ms):")
+                print(f"      Mean: {stat(metric, 'mean', group)*1000:.2f}")
+                print(f"      Median: {stat(metric, 'median', group)*1000:.2f}")
+                print(f"      Min: {stat(metric, 'min', group)*1000:.2f}")
+                print(f"      Max: {stat(metric, 'max', group)*1000:.2f}")
+                if stat(metric, 'count', group) > 1:
+                    print(f"      StdDev: {stat(metric, 'stdev', group)*1000:.2f}")
+
+            for metric, label in (('upload_throughput', 'Upload Throughput'),
+                                  ('download_throughput', 'Download Throughput')):
+                print(f"    {label}:")
+                print(f"      Mean: {format_throughput(stat(metric, 'mean', group))}")
+                print(f"      Median: {format_throughput(stat(metric, 'median', group))}")
+                print(f"      Min: {format_throughput(stat(metric, 'min', group))}")
+                print(f"      Max: {format_throughput(stat(metric, 'max', group))}")
+
+            # Total time, generation time and TTFB
+            for metric, label in (('total_time', 'Total Transfer Time'),
+                                  ('random_data_gen_time', 'Random Data Generation Time'),
+                                  ('download_ttfb', 'Download TTFB')):
+                if metric in stats and stat(metric, 'count', group):
+                    print(f"    {label} (ms):")
+                    print(f"      Mean: {stat(metric, 'mean', group)*1000:.2f}")
+                    print(f"      Median: {stat(metric, 'median', group)*1000:.2f}")
 
     # Overall summary
     print(f"\n{'='*80}")
     print("Overall Summary")
     print(f"{'='*80}")
 
-    total_tests = len(results)
-    successful_tests = len([r for r in results if r['success']])
+    successful_tests = int(success.sum())
     failed_tests = total_tests - successful_tests
 
     print(f"Total Tests: {total_tests}")
@@ -144,14 +245,11 @@ def analyze_results(json_file):
     print(f"Failed: {failed_tests} ({failed_tests/total_tests*100:.1f}%)")
 
     if successful_tests > 0:
-        all_upload_times = [r['upload_time'] for r in results if r['success']]
-        all_download_times = [r['download_time'] for r in results if r['success']]
-        all_total_times = [r['total_time'] for r in results if r['success']]
-
         print(f"\nAggregated Performance:")
-        print(f"  Average Upload Time: {statistics.mean(all_upload_times)*1000:.2f} ms")
-        print(f"  Average Download Time: {statistics.mean(all_download_times)*1000:.2f} ms")
-        print(f"  Average Total Time: {statistics.mean(all_total_times)*1000:.2f} ms")
+        for metric, label in (('upload_time', 'Upload Time'), ('download_time', 'Download Time'),
+                              ('total_time', 'Total Time')):
+            values = frame[metric].to_numpy(dtype=float)[success]
+            print(f"  Average {label}: {values.mean()*1000:.2f} ms")
 
     # Comparison between scenarios
     if len(scenarios) > 1:
@@ -159,30 +257,45 @@ def analyze_results(json_file):
         print("Scenario Comparison")
         print(f"{'='*80}")
 
-        for (filename, filesize) in set(file_key for _, files in scenarios.items() for file_key in files.keys()):
+        files = {}
+        for group in appearance:
+            files.setdefault((file_of[group], size_of[group]), []).append(group)
+
+        for (filename, filesize), groups in files.items():
             print(f"\n{filename} ({format_size(filesize)}):")
             print(f"{'─'*40}")
             print(f"{'Scenario':<30} {'Upload':<15} {'Download':<15} {'Total':<15}")
             print(f"{'─'*75}")
 
-            for (scenario_id, scenario_name, bandwidth), files in scenarios.items():
-                if (filename, filesize) in files:
-                    iterations = files[(filename, filesize)]
-                    successful = [r for r in iterations if r['success']]
-                    if successful:
-                        avg_upload = statistics.mean([r['upload_time'] for r in successful]) * 1000
-                        avg_download = statistics.mean([r['download_time'] for r in successful]) * 1000
-                        avg_total = statistics.mean([r['total_time'] for r in successful]) * 1000
+            for group in groups:
+                if stat('upload_time', 'count', group):
+                    avg_upload = stat('upload_time', 'mean', group) * 1000
+                    avg_download = stat('download_time', 'mean', group) * 1000
+                    avg_total = stat('total_time', 'mean', group) * 1000
+
+                    bandwidth = bandwidth_of[group]
+                    scenario_label = f"{scenario_name_of[group][:20]:20} ({bandwidth or 'No limit'})"
+                    print(f"{scenario_label:<30} {avg_upload:>10.2f} ms   {avg_download:>10.2f} ms   {avg_total:>10.2f} ms")
 
-                        scenario_label = f"{scenario_name[:20]:20} ({bandwidth or 'No limit'})"
-                        print(f"{scenario_label:<30} {avg_upload:>10.2f} ms   {avg_download:>10.2f} ms   {avg_total:>10.2f} ms")
+def parse_args():
+    parser = argparse.ArgumentParser(description="Analyze IPFS bandwidth test results")
+    parser.add_argument("results", nargs="?",
+                        help="Results file (default: latest in test-results/)")
+    parser.add_argument("--iterations", action="store_true",
+                        help="Also print every iteration (slow on very large runs)")
+    return parser.parse_args()
 
 def main():
-    if len(sys.argv) < 2:
+    args = parse_args()
+    if args.results is None:
         # Find the latest result file
         results_dir = Path("test-results")
         if results_dir.exists():
-            json_files = sorted(results_dir.glob("test_results_*.json"))
+            json_files = sorted(
+                path for path in results_dir.glob("test_results_*")
+                if is_journal(path) or is_store(path)
+                or (path.suffix == '.json' and not path.stem.endswith('_summary'))
+            )
             if json_files:
                 json_file = json_files[-1]
                 print(f"Using latest result file: {json_file}")
@@ -193,12 +306,12 @@ def main():
             print("test-results directory not found")
             sys.exit(1)
     else:
-        json_file = Path(sys.argv[1])
+        json_file = Path(args.results)
         if not json_file.exists():
             print(f"File not found: {json_file}")
             sys.exit(1)
 
-    analyze_results(json_file)
+    analyze_results(json_file, show_iterations=args.iterations)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Mergeable, fixed-memory histogram for latency and throughput values
+
+Values are counted in logarithmically sized buckets (HDR-histogram style):
+bucket i covers [lowest * g**i, lowest * g**(i+1)) with g = 1 + precision,
+so every quantile is reported within `precision` relative error no matter
+how many values were recorded. Memory is bounded by the number of buckets
+needed to span the value range, not by the number of samples, and two
+histograms with the same layout merge by adding bucket counts.
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # only needed for record_array()
+    np = None
+
+
+class LogHistogram:
+    """Log-bucketed histogram with exact count/mean/stddev/min/max"""
+
+    def __init__(self, precision: float = 0.01, lowest: float = 1e-6):
+        self.precision = precision
+        self.lowest = lowest
+        self._log_base = math.log1p(precision)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        # Running mean and sum of squared deviations (Welford/Chan)
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def _index(self, value: float) -> int:
+        return int(math.log(value / self.lowest) / self._log_base)
+
+    def _bucket_value(self, index: int) -> float:
+        """Representative value of a bucket (geometric midpoint)"""
+        return self.lowest * math.exp((index + 0.5) * self._log_base)
+
+    def record(self, value: float, count: int = 1):
+        """Add `count` occurrences of `value`"""
+        if value < self.lowest:
+            self.zero_count += count
+        else:
+            index = self._index(value)
+            self.buckets[index] = self.buckets.get(index, 0) + count
+
+        total = self.count + count
+        delta = value - self._mean
+        self._mean += delta * count / total
+        self._m2 += delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def record_all(self, values: Iterable[float]):
+        for value in values:
+            self.record(value)
+
+    def record_array(self, values) -> 'LogHistogram':
+        """Add a batch of values with vectorised bucketing (requires NumPy)
+
+        The batch's buckets and moments are computed with array operations
+        and merged in, so per-value Python work is avoided on large inputs.
+        """
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            return self
+        batch = LogHistogram(self.precision, self.lowest)
+        small = values < self.lowest
+        indices = (np.log(values[~small] / self.lowest) / self._log_base).astype(np.int64)
+        buckets, counts = np.unique(indices, return_counts=True)
+        batch.buckets = dict(zip(buckets.tolist(), counts.tolist()))
+        batch.zero_count = int(small.sum())
+        batch.count = int(values.size)
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        batch._mean = float(values.mean())
+        batch._m2 = float(((values - batch._mean) ** 2).sum())
+        return self.merge(batch)
+
+    def merge(self, other: 'LogHistogram') -> 'LogHistogram':
+        """Add another histogram with the same layout into this one"""
+        if (other.precision, other.lowest) != (self.precision, self.lowest):
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+        if other.count == 0:
+            return self
+
+        for index, n in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + n
+        self.zero_count += other.zero_count
+
+        total = self.count + other.count
+        delta = other._mean - self._mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / total
+        self._mean += delta * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def mean(self) -> float:
+        return self._mean if self.count else 0.0
+
+    @property
+    def stddev(self) -> float:
+        """Sample standard deviation (matches statistics.stdev)"""
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    @property
+    def pstddev(self) -> float:
+        """Population standard deviation (matches statistics.pstdev)"""
+        return math.sqrt(self._m2 / self.count) if self.count > 1 else 0.0
+
+    def _value_at_rank(self, rank: int) -> float:
+        if rank <= 0:
+            return self.min
+        if rank >= self.count - 1:
+            return self.max
+        seen = self.zero_count
+        if rank < seen:
+            return self.min
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                return min(max(self._bucket_value(index), self.min), self.max)
+        return self.max
+
+    def quantile(self, q: float) -> float:
+        """Value at quantile q (0..1), linearly interpolated between ranks
+
+        Uses the same rank definition as numpy.percentile's default, so
+        small samples are not biased towards the maximum.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        lower = math.floor(rank)
+        upper = math.ceil(rank)
+        low_value = self._value_at_rank(lower)
+        if upper == lower:
+            return low_value
+        return low_value + (self._value_at_rank(upper) - low_value) * (rank - lower)
+
+    def quantiles(self, qs: List[float]) -> List[float]:
+        return [self.quantile(q) for q in qs]
+
+    def stats(self) -> Dict[str, float]:
+        """Summary in the runner's statistics format"""
+        if self.count == 0:
+            return {}
+        return {
+            'mean': self.mean,
+            'median': self.quantile(0.5),
+            'min': self.min,
+            'max': self.max,
+            'stddev': self.stddev,
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'count': self.count,
+        }
+
+    def to_dict(self) -> Dict:
+        """JSON-serialisable form; see from_dict()"""
+        return {
+            'precision': self.precision,
+            'lowest': self.lowest,
+            'count': self.count,
+            'zero_count': self.zero_count,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'mean': self._mean,
+            'm2': self._m2,
+            'buckets': sorted([index, n] for index, n in self.buckets.items()),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LogHistogram':
+        hist = cls(precision=data['precision'], lowest=data['lowest'])
+        hist.buckets = {int(index): n for index, n in data['buckets']}
+        hist.zero_count = data['zero_count']
+        hist.count = data['count']
+        if hist.count:
+            hist.min = data['min']
+            hist.max = data['max']
+        hist._mean = data['mean']
+        hist._m2 = data['m2']
+        return hist
+
+
+def build_histograms(results: List[Dict], metrics: List[str],
+                     histograms: Optional[Dict[str, LogHistogram]] = None) -> Dict[str, LogHistogram]:
+    """Record each metric of each result into per-metric histograms"""
+    if histograms is None:
+        histograms = {metric: LogHistogram() for metric in metrics}
+    for result in results:
+        for metric in metrics:
+            value = result.get(metric)
+            if value is not None:
+                histograms[metric].record(value)
+    return histograms
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Unified, cached ingestion of benchmark results into a pandas DataFrame
+
+Every result format in this repository is normalised to one frame whose
+columns follow the runner's result records (times in seconds, throughput
+in bytes/s):
+
+    run-bandwidth-test.py   test_results_*.json / .ndjson[.gz|.zst] / .npz
+    main.go (bench)         bench_results.csv
+    bench_updown            bench_upload_download_*.csv
+
+Strings (scenario, file, bandwidth, error, ...) become categoricals, and
+fields that some rows lack use nullable dtypes. Run-level information
+(config, timestamp, summary, concurrency levels, ...) is attached as
+frame.attrs['meta'].
+
+Parsed sources are cached as columnar .npz stores (see result_store.py) in
+$IPFS_BENCH_CACHE (default ~/.cache/ipfs_bench). The cache key covers the
+file's path, size, mtime and a hash of its first and last MiB, so a
+re-run reads a few arrays instead of re-parsing a multi-GB file, while
+any rewrite or append invalidates the entry. Set IPFS_BENCH_CACHE=off to
+disable caching.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+import result_store
+from result_journal import is_journal, iter_records, summary_path
+from result_store import META_KEY, ColumnarResultStore
+
+PathLike = Union[str, Path]
+
+MIB = 1024 * 1024
+CACHE_VERSION = 1
+SAMPLE_BYTES = 1024 * 1024
+
+# Result keys whose values are large per-row series; skipped unless asked for
+SERIES_COLUMNS = ('upload_timeline', 'download_timeline')
+
+
+def cache_dir() -> Optional[Path]:
+    setting = os.environ.get('IPFS_BENCH_CACHE')
+    if setting == 'off':
+        return None
+    if setting:
+        return Path(setting)
+    return Path.home() / '.cache' / 'ipfs_bench'
+
+
+def source_key(path: PathLike) -> Tuple[str, str]:
+    """(path digest, content digest) identifying one version of a source file"""
+    path = Path(path).resolve()
+    stat = path.stat()
+    content = hashlib.sha256(f"{CACHE_VERSION}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    with open(path, 'rb') as f:
+        content.update(f.read(SAMPLE_BYTES))
+        if stat.st_size > SAMPLE_BYTES:
+            f.seek(max(SAMPLE_BYTES, stat.st_size - SAMPLE_BYTES))
+            content.update(f.read())
+    return hashlib.sha256(str(path).encode()).hexdigest()[:16], content.hexdigest()[:16]
+
+
+def detect_format(path: PathLike) -> str:
+    """One of "runner", "bench" or "updown" """
+    name = str(path)
+    if name.endswith('.csv'):
+        with open(name, 'r', newline='') as f:
+            header = next(csv.reader(f), [])
+        if 'upload_duration_ms' in header:
+            return 'updown'
+        if 'duration_ms' in header:
+            return 'bench'
+        raise ValueError(f"Unrecognised CSV columns in {name}: {header}")
+    return 'runner'
+
+
+def _runner_rows(path: PathLike, meta: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Results of a runner output file; run-level records are collected into meta"""
+    if is_journal(path):
+        for kind, record in iter_records(path):
+            if kind == 'result':
+                yield record
+            elif kind == 'header':
+                meta['config'] = record.get('config', {})
+                meta['timestamp'] = record.get('timestamp')
+            else:
+                meta.setdefault(kind, []).append(record)
+    else:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        meta.update({key: value for key, value in data.items() if key != 'results'})
+        yield from data['results']
+
+
+def _bench_rows(path: PathLike) -> Iterator[Dict[str, Any]]:
+    """bench_results.csv written by main.go (upload only)"""
+    with open(path, 'r', newline='') as f:
+        for raw in csv.DictReader(f):
+            yield {
+                'iteration': int(raw['run']),
+                'file': raw['file'],
+                'fileSize': int(raw['size_bytes']),
+                'success': True,
+                'upload_time': float(raw['duration_ms']) / 1000,
+                'upload_throughput': float(raw['throughput_mib_per_s']) * MIB,
+                'total_time': float(raw['duration_ms']) / 1000,
+                'ipfs_hash': raw.get('cid') or None,
+                'started': raw.get('started') or None,
+            }
+
+
+def _updown_rows(path: PathLike) -> Iterator[Dict[str, Any]]:
+    """bench_upload_download_*.csv written by bench_updown"""
+    with open(path, 'r', newline='') as f:
+        for raw in csv.DictReader(f):
+            upload_time = float(raw['upload_duration_ms']) / 1000
+            download_time = float(raw['download_duration_ms']) / 1000
+            yield {
+                'iteration': int(raw['run']),
+                'file': raw['file'],
+                'fileSize': int(raw['size_bytes']),
+                'upload_node': int(raw['upload_node']),
+                'download_node': int(raw['download_node']),
+                'success': True,
+                'upload_time': upload_time,
+                'download_time': download_time,
+                'total_time': upload_time + download_time,
+                'upload_throughput': float(raw['upload_throughput_mib_per_s']) * MIB,
+                'download_throughput': float(raw['download_throughput_mib_per_s']) * MIB,
+                'ipfs_hash': raw.get('cid') or None,
+                'started': raw.get('started') or None,
+            }
+
+
+def _build_store(path: PathLike, target: Path):
+    """Parse a source file once into a columnar store at `target`"""
+    source_format = detect_format(path)
+    meta: Dict[str, Any] = {}
+    store = ColumnarResultStore(target)
+    if source_format == 'bench':
+        store.extend(_bench_rows(path))
+    elif source_format == 'updown':
+        store.extend(_updown_rows(path))
+    else:
+        store.extend(_runner_rows(path, meta))
+    store.save({'source': str(path), 'format': source_format, 'meta': meta})
+
+
+def _frame_from_store(path: PathLike, columns: Optional[Sequence[str]],
+                      timelines: bool) -> pd.DataFrame:
+    with np.load(path) as archive:
+        info = json.loads(str(archive[META_KEY]))
+        kinds = info['columns']
+        if columns is not None:
+            names = [name for name in columns if name in kinds]
+        else:
+            names = [name for name in kinds if timelines or name not in SERIES_COLUMNS]
+
+        data = {}
+        for name in names:
+            kind = kinds[name]
+            valid_key = f"{name}.valid"
+            valid = archive[valid_key] if valid_key in archive.files else None
+            if kind == 'str':
+                data[name] = pd.Categorical.from_codes(
+                    archive[f"{name}.codes"], categories=archive[f"{name}.dict"].astype(object)
+                )
+            elif kind in ('series', 'null'):
+                data[name] = result_store.decode_column(archive, name, kind)
+            elif kind == 'float' or valid is None:
+                data[name] = archive[name]
+            else:
+                # ints / bools that some rows lack
+                dtype = 'Int64' if kind == 'int' else 'boolean'
+                data[name] = pd.array(archive[name], dtype=dtype)
+                data[name][~valid] = pd.NA
+
+    frame = pd.DataFrame(data, index=pd.RangeIndex(info['rows']))
+    # The runner's own .npz output has its run metadata at the top level
+    frame.attrs['meta'] = info.get('meta', {
+        key: value for key, value in info.items() if key not in ('rows', 'columns')
+    })
+    frame.attrs['format'] = info.get('format', 'runner')
+    return frame
+
+
+def load_frame(path: PathLike, columns: Optional[Sequence[str]] = None,
+               timelines: bool = False, use_cache: bool = True) -> pd.DataFrame:
+    """Load any result file as a DataFrame, parsing it at most once
+
+    `columns` restricts the frame to those columns (only they are read from
+    the cache); by default everything except the per-row timelines is
+    loaded, unless `timelines` is set. Columns a source does not have are
+    simply absent from the frame.
+    """
+    path = Path(path)
+    if result_store.is_store(path):
+        frame = _frame_from_store(path, columns, timelines)
+    else:
+        directory = cache_dir() if use_cache else None
+        if directory is None:
+            with tempfile.TemporaryDirectory() as tmp:
+                target = Path(tmp) / 'frame.npz'
+                _build_store(path, target)
+                frame = _frame_from_store(target, columns, timelines)
+        else:
+            path_digest, content_digest = source_key(path)
+            target = directory / f"{path_digest}-{content_digest}.npz"
+            if not target.exists():
+                directory.mkdir(parents=True, exist_ok=True)
+                for stale in directory.glob(f"{path_digest}-*.npz"):
+                    stale.unlink()
+                _build_store(path, target)
+            frame = _frame_from_store(target, columns, timelines)
+
+    # The summary artifact is written at the end of a run, after the
+    # results file may already have been cached, so it is read fresh
+    summary_file = summary_path(path)
+    if frame.attrs['format'] == 'runner' and summary_file.exists() and summary_file != path:
+        with open(summary_file, 'r') as f:
+            frame.attrs['meta']['summary'] = json.load(f).get('summary')
+    return frame
+
+
+def to_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Rows as plain dicts (None for missing values, lists for series)"""
+    records = []
+    columns = list(frame.columns)
+    for values in zip(*(frame[name].tolist() for name in columns)):
+        record = {}
+        for name, value in zip(columns, values):
+            if isinstance(value, np.ndarray):
+                value = value.tolist()
+            elif value is pd.NA or (isinstance(value, float) and np.isnan(value)):
+                value = None
+            record[name] = value
+        records.append(record)
+    return records
+
+
+def load_results(path: PathLike) -> Dict[str, Any]:
+    """Cached equivalent of result_journal.load_results for any format
+
+    Returns the legacy {"config", "results", "timestamp", ...} layout,
+    timelines included.
+    """
+    frame = load_frame(path, timelines=True)
+    return {**frame.attrs['meta'], 'results': to_records(frame)}
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Append-only NDJSON result journal for the bandwidth test runner
+
+Each line is one JSON object tagged with a "record" type:
+
+    {"record": "header", "config": {...}, "timestamp": "..."}
+    {"record": "result", "iteration": 1, "file": "test10m.dat", ...}
+    {"record": "concurrency_level", ...}
+
+Results are appended as soon as they are produced and flushed in batches,
+so a crash loses at most one unflushed batch and long runs never rewrite
+earlier output. Journals may be gzip (.gz) or zstd (.zst) compressed; a
+truncated final line or compressed frame (e.g. after a crash) is ignored
+when reading, and a malformed line elsewhere is skipped with a warning.
+Before a resumed run appends to a journal, repair_journal() cuts such a
+torn tail off, so new records never follow a partial line. The
+end-of-run summary is written as a separate JSON artifact next to the
+journal (see summary_path()).
+
+Runs that report to an .npz store journal into a spool (run.spool.ndjson)
+while they run, and build_store() turns it into the store in one pass at
+the end, so the store is never rewritten mid-run and a crash loses no
+more than it would with a plain journal.
+"""
+
+import gzip
+import json
+import os
+import threading
+import time
+import warnings
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Union
+
+import result_store
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - only needed for .zst journals
+    zstandard = None
+
+PathLike = Union[str, Path]
+
+COMPRESSION_SUFFIXES = {
+    None: '',
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+
+def is_journal(path: PathLike) -> bool:
+    """True if path names an NDJSON journal (optionally compressed)"""
+    name = str(path)
+    return any(name.endswith('.ndjson' + suffix) for suffix in COMPRESSION_SUFFIXES.values())
+
+
+def summary_path(journal_path: PathLike) -> Path:
+    """Path of the summary artifact that accompanies a journal or .npz store"""
+    name = Path(journal_path).name
+    stem = name.split('.ndjson', 1)[0].split('.npz', 1)[0]
+    return Path(journal_path).with_name(f"{stem}_summary.json")
+
+
+def spool_path(store: PathLike) -> Path:
+    """Spool journal an .npz store is built from (run.npz -> run.spool.ndjson)"""
+    store = Path(store)
+    return store.with_name(store.name[:-len('.npz')] + '.spool.ndjson')
+
+
+def is_spool(path: PathLike) -> bool:
+    """True if path names the spool journal of an .npz store"""
+    return str(path).endswith('.spool.ndjson')
+
+
+def spooled_store(spool: PathLike) -> Path:
+    """.npz store a spool journal is built into (run.spool.ndjson -> run.npz)"""
+    spool = Path(spool)
+    return spool.with_name(spool.name[:-len('.spool.ndjson')] + '.npz')
+
+
+def _open_binary(path: PathLike, mode: str):
+    name = str(path)
+    if name.endswith('.gz'):
+        return gzip.open(name, mode)
+    if name.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required for .zst journals "
+                               "(python3 -m pip install zstandard)")
+        if 'r' in mode:
+            return zstandard.ZstdDecompressor().stream_reader(
+                open(name, 'rb'), read_across_frames=True, closefd=True
+            )
+        return zstandard.ZstdCompressor().stream_writer(open(name, mode), closefd=True)
+    return open(name, mode)
+
+
+class ResultJournal:
+    """Buffered, thread-safe NDJSON appender
+
+    Records are flushed to disk every `flush_every` records or
+    `flush_interval` seconds, whichever comes first. Compressed journals
+    are flushed with a sync point so every flushed batch is readable.
+    """
+
+    def __init__(self, path: PathLike, flush_every: int = 50, flush_interval: float = 5.0):
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._handle = _open_binary(self.path, 'ab')
+
+    def append(self, record: Dict[str, Any], kind: str = 'result'):
+        """Queue one record; flushes when the batch is full or stale"""
+        line = json.dumps({'record': kind, **record}, separators=(',', ':')) + '\n'
+        with self._lock:
+            self._pending.append(line.encode())
+            if (len(self._pending) >= self.flush_every
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._pending:
+            self._handle.write(b''.join(self._pending))
+            self._pending.clear()
+        if zstandard is not None and isinstance(self._handle, zstandard.ZstdCompressionWriter):
+            self._handle.flush(zstandard.FLUSH_FRAME)
+        elif isinstance(self._handle, gzip.GzipFile):
+            self._handle.flush(gzip.zlib.Z_SYNC_FLUSH)
+        else:
+            self._handle.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self._handle.close()
+
+
+def _stream_errors() -> tuple:
+    """Exceptions raised when a compressed journal ends in a torn frame"""
+    if zstandard is not None:
+        return EOFError, gzip.BadGzipFile, zstandard.ZstdError
+    return EOFError, gzip.BadGzipFile
+
+
+def _iter_lines(path: PathLike, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Stream the lines of a journal, ending at a torn compressed frame
+
+    The decompressed stream is split by hand so that every line decoded
+    before a truncated frame is still returned; the last item may lack its
+    newline.
+    """
+    pending = b''
+    with _open_binary(path, 'rb') as raw:
+        # read1 returns what one decompression step produced, so data decoded
+        # before a torn frame is not discarded along with the failing read
+        read = getattr(raw, 'read1', raw.read)
+        while True:
+            try:
+                chunk = read(chunk_size)
+            except _stream_errors():
+                break  # truncated compressed stream
+            if not chunk:
+                break
+            lines = (pending + chunk).split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                yield line + b'\n'
+    if pending:
+        yield pending
+
+
+def _iter_tagged(path: PathLike) -> Iterator[Dict[str, Any]]:
+    """Stream raw journal records, skipping malformed lines
+
+    A torn final line (no newline, or not valid JSON) is dropped silently,
+    since that is what a crash mid-write leaves behind. A malformed line
+    followed by more records is skipped with a warning and reading goes on.
+    """
+    bad_line = None
+    for number, line in enumerate(_iter_lines(path), 1):
+        if bad_line is not None:
+            warnings.warn(f"{path}: skipping malformed journal line {bad_line}", RuntimeWarning)
+            bad_line = None
+        if not line.endswith(b'\n'):
+            return  # torn trailing write
+        try:
+            yield json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            bad_line = number
+
+
+def rewrite_journal(path: PathLike, keep: Callable[[str, Dict[str, Any]], bool]) -> int:
+    """Rewrite a journal with only the records `keep(kind, record)` accepts
+
+    Torn or malformed lines are dropped as well. The new journal replaces
+    the old one atomically; returns the number of records dropped.
+    """
+    path = Path(path)
+    # Keep the compression suffix, which selects the codec
+    tmp = path.with_name(path.name.replace('.ndjson', '.tmp.ndjson', 1))
+    dropped = 0
+    with _open_binary(tmp, 'wb') as out:
+        for record in _iter_tagged(path):
+            kind = record.pop('record', 'result')
+            if keep(kind, record):
+                out.write((json.dumps({'record': kind, **record}, separators=(',', ':')) + '\n').encode())
+            else:
+                dropped += 1
+    os.replace(tmp, path)
+    return dropped
+
+
+def repair_journal(path: PathLike):
+    """Cut a torn trailing write off a journal before appending to it
+
+    Uncompressed journals are truncated after their last complete line.
+    A compressed stream cannot be cut at a line boundary, so its readable
+    records are rewritten instead.
+    """
+    if str(path).endswith('.ndjson'):
+        with open(path, 'r+b') as f:
+            end = f.seek(0, os.SEEK_END)
+            while end > 0:
+                start = max(0, end - 64 * 1024)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b'\n')
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+            f.truncate(end)
+    else:
+        rewrite_journal(path, lambda kind, record: True)
+
+
+def iter_records(path: PathLike) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Stream (record type, record) pairs from a journal in file order"""
+    for record in _iter_tagged(path):
+        yield record.pop('record', 'result'), record
+
+
+def iter_journal(path: PathLike, kind: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Stream records from a journal, optionally only those of one type
+
+    The "record" tag is removed from yielded dicts. A partially written
+    trailing record is skipped rather than raising.
+    """
+    for record_kind, record in iter_records(path):
+        if kind is None or record_kind == kind:
+            yield record
+
+
+def iter_results(path: PathLike) -> Iterator[Dict[str, Any]]:
+    """Stream result records from a journal, .npz store or legacy JSON file"""
+    if is_journal(path):
+        yield from iter_journal(path, 'result')
+    elif result_store.is_store(path):
+        yield from result_store.iter_rows(path)
+    else:
+        with open(path, 'r') as f:
+            yield from json.load(f)['results']
+
+
+def load_results(path: PathLike) -> Dict[str, Any]:
+    """Load a run in the legacy JSON layout from any output format
+
+    Journals are folded into {"config", "results", "timestamp", ...}; other
+    record types are collected into lists keyed by their type (e.g.
+    "concurrency_level"), and the summary artifact is attached as
+    "summary" when present. Columnar stores carry the same keys in their
+    metadata. Prefer result_store.load_columns() for large stores.
+    """
+    if result_store.is_store(path):
+        meta = result_store.read_metadata(path)
+        data = {key: value for key, value in meta.items() if key not in ('rows', 'columns')}
+        data['results'] = list(result_store.iter_rows(path))
+        summary_file = summary_path(path)
+        if summary_file.exists():
+            with open(summary_file, 'r') as f:
+                data['summary'] = json.load(f).get('summary')
+        return data
+
+    if not is_journal(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    data: Dict[str, Any] = {'config': {}, 'results': [], 'timestamp': None}
+    for kind, record in iter_records(path):
+        if kind == 'header':
+            data['config'] = record.get('config', {})
+            data['timestamp'] = record.get('timestamp')
+        elif kind == 'result':
+            data['results'].append(record)
+        else:
+            data.setdefault(kind, []).append(record)
+
+    summary_file = summary_path(path)
+    if summary_file.exists():
+        with open(summary_file, 'r') as f:
+            data['summary'] = json.load(f).get('summary')
+    return data
+
+
+def build_store(spool: PathLike, store: PathLike, compress: bool = False,
+                metadata: Optional[Dict[str, Any]] = None) -> int:
+    """Write an .npz store from a spool journal in one streaming pass
+
+    Result records become rows; every other record type is collected into a
+    metadata list keyed by its type (as load_results() does for journals),
+    next to the header's config and `metadata`. Returns the row count.
+    """
+    columns = result_store.ColumnarResultStore(store, compress=compress)
+    meta: Dict[str, Any] = {'config': {}, 'timestamp': None}
+    for kind, record in iter_records(spool):
+        if kind == 'result':
+            columns.append(record)
+        elif kind == 'header':
+            meta['config'] = record.get('config', {})
+            meta['timestamp'] = record.get('timestamp')
+        elif kind != 'resume':
+            meta.setdefault(kind, []).append(record)
+    columns.save({**meta, **(metadata or {})})
+    return columns.rows
+
+
+def spool_store(store: PathLike, spool: PathLike):
+    """Start a spool journal holding an .npz store's rows and metadata records
+
+    Used to resume a finished store: the run then appends to the spool and
+    rebuilds the store from it. Fields a row lacks are left out again.
+    """
+    meta = result_store.read_metadata(store)
+    journal = ResultJournal(spool)
+    journal.append({'config': meta.get('config', {}), 'timestamp': meta.get('timestamp')},
+                   kind='header')
+    for kind, records in meta.items():
+        if kind not in ('rows', 'columns', 'config', 'timestamp') and isinstance(records, list):
+            for record in records:
+                journal.append(record, kind=kind)
+    for row in result_store.iter_rows(store):
+        journal.append({name: value for name, value in row.items() if value is not None})
+    journal.close()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Columnar result store (NumPy .npz) for the bandwidth test runner
+
+Results are kept column by column instead of as a list of dicts:
+
+    <name>               numeric / bool column, one entry per result
+    <name>.valid         presence mask, only written if some rows lack the field
+    <name>.codes         dictionary-encoded strings: int32 code per row (-1 = None)
+    <name>.dict          ... and the distinct values the codes index into
+    <name>.offsets       series columns (e.g. timelines): row i owns
+    <name>.values        values[offsets[i]:offsets[i + 1]]
+    __meta__             JSON: row count, column kinds, config, run aggregates
+
+Each member of an .npz archive is read independently, so
+load_columns(path, ['download_time'], where={'scenario': '100mbps'}) reads
+two small arrays and never touches the timelines or the other metrics.
+"""
+
+import json
+import os
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+PathLike = Union[str, Path]
+
+META_KEY = '__meta__'
+
+
+def is_store(path: PathLike) -> bool:
+    """True if path names a columnar result store"""
+    return str(path).endswith('.npz')
+
+
+def _kind_of(value: Any) -> str:
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, int):
+        return 'int'
+    if isinstance(value, float):
+        return 'float'
+    if isinstance(value, str):
+        return 'str'
+    if isinstance(value, (list, tuple)):
+        return 'series'
+    raise TypeError(f"Unsupported result value {value!r}")
+
+
+class _Column:
+    """Growable column of one kind with a presence mask"""
+
+    def __init__(self, kind: str, rows: int = 0):
+        self.kind = kind
+        self.valid = bytearray(rows)
+        if kind == 'str':
+            self.codes = array('i', [-1]) * rows
+            self.dictionary: Dict[str, int] = {}
+        elif kind == 'series':
+            self.offsets = array('q', [0]) * (rows + 1)
+            self.values = array('d')
+            self.width = 1
+            self.nested = False  # points are [x, y, ...] rather than scalars
+        else:
+            missing = float('nan') if kind == 'float' else 0
+            self.data = array({'bool': 'b', 'int': 'q', 'float': 'd'}[kind], [missing]) * rows
+
+    def _promote_to_float(self):
+        self.data = array('d', (v if ok else float('nan') for v, ok in zip(self.data, self.valid)))
+        self.kind = 'float'
+
+    def append(self, value: Any):
+        present = value is not None
+        if present and self.kind == 'int' and isinstance(value, float):
+            self._promote_to_float()
+        self.valid.append(present)
+        if self.kind == 'str':
+            if present:
+                code = self.dictionary.setdefault(str(value), len(self.dictionary))
+            else:
+                code = -1
+            self.codes.append(code)
+        elif self.kind == 'series':
+            for point in value or []:
+                if isinstance(point, (list, tuple)):
+                    self.width = len(point)
+                    self.nested = True
+                    self.values.extend(point)
+                else:
+                    self.values.append(point)
+            self.offsets.append(len(self.values) // self.width)
+        else:
+            self.data.append(value if present else (float('nan') if self.kind == 'float' else 0))
+
+    def arrays(self, name: str) -> Dict[str, np.ndarray]:
+        """Snapshot as NumPy arrays (copies, so appends may continue)"""
+        out = {}
+        if not all(self.valid):
+            out[f"{name}.valid"] = np.frombuffer(bytes(self.valid), dtype=np.bool_)
+        if self.kind == 'str':
+            out[f"{name}.codes"] = np.array(self.codes, dtype=np.int32)
+            out[f"{name}.dict"] = np.array(list(self.dictionary), dtype=str)
+        elif self.kind == 'series':
+            out[f"{name}.offsets"] = np.array(self.offsets, dtype=np.int64)
+            values = np.array(self.values, dtype=np.float64)
+            out[f"{name}.values"] = values.reshape(-1, self.width) if self.nested else values
+        elif self.kind == 'bool':
+            out[name] = np.array(self.data, dtype=np.bool_)
+        else:
+            out[name] = np.array(self.data, dtype=np.int64 if self.kind == 'int' else np.float64)
+        return out
+
+
+class ColumnarResultStore:
+    """Thread-safe columnar accumulator for result dicts
+
+    Columns are created on first sight of a field (earlier rows are marked
+    missing) and typed from its first non-None value; int columns are
+    promoted to float if a float arrives later, and fields that have only
+    ever been None are recorded as "null" columns. save() rewrites the .npz
+    atomically, so a crash never leaves a torn archive.
+    """
+
+    def __init__(self, path: PathLike, compress: bool = False):
+        self.path = Path(path)
+        self.compress = compress
+        self.rows = 0
+        self._columns: Dict[str, _Column] = {}
+        self._null_columns: Dict[str, None] = {}  # fields seen only as None so far
+        self._lock = threading.Lock()
+
+    def append(self, result: Dict[str, Any]):
+        with self._lock:
+            for name, value in result.items():
+                if name in self._columns:
+                    continue
+                if value is None:
+                    self._null_columns[name] = None
+                else:
+                    self._columns[name] = _Column(_kind_of(value), self.rows)
+                    self._null_columns.pop(name, None)
+            for name, column in self._columns.items():
+                column.append(result.get(name))
+            self.rows += 1
+
+    def extend(self, results):
+        for result in results:
+            self.append(result)
+
+    def save(self, metadata: Optional[Dict[str, Any]] = None):
+        """Write all columns plus `metadata` (JSON-serialisable) to the archive"""
+        with self._lock:
+            arrays: Dict[str, np.ndarray] = {}
+            for name, column in self._columns.items():
+                arrays.update(column.arrays(name))
+            meta = {
+                'rows': self.rows,
+                'columns': {
+                    **{name: 'null' for name in self._null_columns},
+                    **{name: column.kind for name, column in self._columns.items()},
+                },
+                **(metadata or {}),
+            }
+        arrays[META_KEY] = np.array(json.dumps(meta))
+
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            (np.savez_compressed if self.compress else np.savez)(f, **arrays)
+        os.replace(tmp, self.path)
+
+
+def read_metadata(path: PathLike) -> Dict[str, Any]:
+    with np.load(path) as archive:
+        return json.loads(str(archive[META_KEY]))
+
+
+def decode_column(archive, name: str, kind: str) -> np.ndarray:
+    """Materialise one column; strings become an object array with None"""
+    if kind == 'null':
+        return np.full(json.loads(str(archive[META_KEY]))['rows'], None, dtype=object)
+    if kind == 'str':
+        codes = archive[f"{name}.codes"]
+        dictionary = np.append(archive[f"{name}.dict"].astype(object), None)
+        return dictionary[codes]  # code -1 selects the trailing None
+    if kind == 'series':
+        offsets = archive[f"{name}.offsets"]
+        values = archive[f"{name}.values"]
+        column = np.empty(len(offsets) - 1, dtype=object)
+        for i in range(len(column)):
+            column[i] = values[offsets[i]:offsets[i + 1]]
+        return column
+    return archive[name]
+
+
+def _mask(archive, meta: Dict[str, Any], where: Dict[str, Any]) -> np.ndarray:
+    """Row mask for equality filters, evaluated on dictionary codes"""
+    mask = np.ones(meta['rows'], dtype=bool)
+    for name, wanted in where.items():
+        kind = meta['columns'].get(name)
+        if kind is None or kind == 'null':
+            return np.zeros(meta['rows'], dtype=bool)
+        if kind == 'str':
+            dictionary = list(archive[f"{name}.dict"])
+            code = dictionary.index(wanted) if wanted in dictionary else -2
+            mask &= archive[f"{name}.codes"] == code
+        else:
+            mask &= archive[name] == wanted
+            if f"{name}.valid" in archive.files:
+                mask &= archive[f"{name}.valid"]
+    return mask
+
+
+def load_columns(path: PathLike, columns: Optional[Sequence[str]] = None,
+                 where: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+    """Read selected columns, optionally only rows matching `where`
+
+    `where` maps column names to required values (equality, ANDed). String
+    filters compare dictionary codes, so no strings are decoded for rows
+    that are dropped. Numeric columns are returned as-is; use
+    load_valid() for the presence mask of fields that can be missing.
+    """
+    with np.load(path) as archive:
+        meta = json.loads(str(archive[META_KEY]))
+        names = list(meta['columns']) if columns is None else list(columns)
+        mask = _mask(archive, meta, where) if where else None
+        out = {}
+        for name in names:
+            column = decode_column(archive, name, meta['columns'][name])
+            out[name] = column if mask is None else column[mask]
+        return out
+
+
+def load_valid(path: PathLike, column: str) -> np.ndarray:
+    """Presence mask of a column (all True if every row has the field)"""
+    with np.load(path) as archive:
+        key = f"{column}.valid"
+        if key in archive.files:
+            return archive[key]
+        return np.ones(json.loads(str(archive[META_KEY]))['rows'], dtype=bool)
+
+
+def iter_rows(path: PathLike) -> Iterator[Dict[str, Any]]:
+    """Yield results as dicts in the runner's original layout"""
+    with np.load(path) as archive:
+        meta = json.loads(str(archive[META_KEY]))
+        columns = {}
+        for name, kind in meta['columns'].items():
+            valid_key = f"{name}.valid"
+            valid = archive[valid_key] if valid_key in archive.files else None
+            columns[name] = (kind, decode_column(archive, name, kind), valid)
+
+    for i in range(meta['rows']):
+        row = {}
+        for name, (kind, column, valid) in columns.items():
+            if kind == 'null' or (valid is not None and not valid[i]):
+                value = None
+            elif kind == 'series':
+                value = column[i].tolist()
+            elif kind == 'str':
+                value = column[i]
+            else:
+                value = column[i].item()
+            row[name] = value
+        yield row
+
+
+def list_columns(path: PathLike) -> List[str]:
+    return list(read_metadata(path)['columns'])
@@ -4,123 +4,2109 @@ IPFS Bandwidth Performance Test Runner
 Executes test scenarios defined in test-scenarios.json
 """
 
+import argparse
+import asyncio
+import hashlib
+import itertools
 import json
+import mmap
+import os
+import queue
+import random
+import re
+import socket
+import struct
 import sys
 import time
 import subprocess
 import statistics
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
 from pathlib import Path
 
+from latency_histogram import LogHistogram, build_histograms
+from result_journal import (COMPRESSION_SUFFIXES, ResultJournal, build_store, is_journal, is_spool,
+                            iter_journal, iter_results, repair_journal, rewrite_journal,
+                            spool_path, spool_store, spooled_store, summary_path)
+from result_store import is_store
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - only needed for --engine async
+    aiohttp = None
+
+# Per-thread accumulator for TCP connection setup time, reset around each
+# transfer so connection cost can be reported separately from transfer cost
+_connect_timing = threading.local()
+
+
+def reset_connect_time():
+    """Start a new connection-setup measurement on this thread"""
+    _connect_timing.elapsed = 0.0
+
+
+def connect_time() -> float:
+    """Seconds spent establishing connections since reset_connect_time()"""
+    return getattr(_connect_timing, 'elapsed', 0.0)
+
+
+class TimedHTTPConnection(urllib3.connection.HTTPConnection):
+    """HTTPConnection that records how long establishing the socket took"""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_timing.elapsed = connect_time() + time.perf_counter() - start
+
+
+class TimedHTTPConnectionPool(urllib3.HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TargetHTTPAdapter(HTTPAdapter):
+    """Keep-alive adapter with connection timing and tunable socket buffers"""
+
+    def __init__(self, socket_options: Optional[List[tuple]] = None, **kwargs):
+        self._socket_options = socket_options or []
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if self._socket_options:
+            pool_kwargs['socket_options'] = (
+                list(urllib3.connection.HTTPConnection.default_socket_options)
+                + self._socket_options
+            )
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            **self.poolmanager.pool_classes_by_scheme,
+            'http': TimedHTTPConnectionPool,
+        }
+
+# Result fields aggregated into histograms, keyed by their summary name
+HISTOGRAM_METRICS = {
+    'upload_stats': 'upload_time',
+    'download_stats': 'download_time',
+    'upload_throughput_stats': 'upload_throughput',
+    'download_throughput_stats': 'download_throughput',
+    'total_stats': 'total_time',
+    'propagation_wait_stats': 'propagation_wait',
+}
+
+# Retrieval paths a download can be measured over: Kubo RPC cat, and the
+# node's HTTP gateway as a plain file, a trustless CAR and per raw block
+DOWNLOAD_PATHS = ('rpc', 'gateway', 'car', 'raw')
+
+# Bandwidth scripts that take <container> <rate> and shape only that
+# container. Any other bandwidthCommand script takes just <rate> and shapes
+# every benchmark container at once (see shaping_scope)
+PER_CONTAINER_SHAPING_SCRIPTS = ('limit-bandwidth.sh',)
+STOP_CHAOS_COMMAND = './scripts/network-chaos/stop-chaos.sh'
+
+# Queueing disciplines installed by the bandwidth scripts (pumba netem, tc tbf/htb)
+SHAPING_QDISC = re.compile(r'\b(netem|tbf|htb)\b')
+
+
+def latency_percentiles(histogram: LogHistogram) -> Dict[str, float]:
+    """p50/p90/p95/p99 of a histogram"""
+    p50, p90, p95, p99 = histogram.quantiles([0.50, 0.90, 0.95, 0.99])
+    return {'p50': p50, 'p90': p90, 'p95': p95, 'p99': p99}
+
+
+def arrival_offsets(rate: float, count: int, arrival: str = 'constant',
+                    seed: Optional[int] = None) -> List[float]:
+    """Intended start offsets (seconds) for `count` operations at `rate` ops/s
+
+    "constant" spaces operations evenly; "poisson" draws exponential
+    inter-arrival gaps with the same mean.
+    """
+    if arrival == 'constant':
+        return [i / rate for i in range(count)]
+    if arrival == 'poisson':
+        rng = random.Random(seed)
+        offsets, t = [], 0.0
+        for _ in range(count):
+            offsets.append(t)
+            t += rng.expovariate(rate)
+        return offsets
+    raise ValueError(f"Unknown arrival process: {arrival}")
+
+
+def pair_rounds(nodes: List[Any]) -> List[List[Tuple[Any, Any]]]:
+    """Schedule every ordered (uploader, downloader) pair in disjoint rounds
+
+    Round-robin (circle method): no node appears twice within a round, so a
+    round's pairs can run in parallel without sharing a link endpoint. The
+    n-1 rounds (n rounded up to even) are run in one direction and then
+    reversed, covering all n(n-1) ordered pairs in 2(n-1) rounds, with n
+    rounded up to even (an odd n leaves one node idle per round).
+    """
+    slots = list(nodes) + ([None] if len(nodes) % 2 else [])
+    count = len(slots)
+    rounds = []
+    for _ in range(count - 1):
+        pairs = [(slots[i], slots[count - 1 - i]) for i in range(count // 2)
+                 if slots[i] is not None and slots[count - 1 - i] is not None]
+        if pairs:
+            rounds.append(pairs)
+        slots = [slots[0], slots[-1]] + slots[1:-1]
+    return rounds + [[(b, a) for a, b in pairs] for pairs in rounds]
+
+
+def rpc_value(value: Any) -> str:
+    """Kubo RPC query-string form of a parameter value (booleans as true/false)"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def import_label(params: Dict[str, Any]) -> str:
+    """Tag for a set of /api/v0/add parameters, e.g. chunker=size-1048576,raw-leaves=true"""
+    return ','.join(f"{key}={rpc_value(value)}" for key, value in params.items())
+
+
+def expand_import_matrix(scenarios: List[Dict]) -> List[Dict]:
+    """Expand each scenario's importParams into one scenario per parameter set
+
+    In importParams a list is a matrix axis and a scalar a fixed
+    parameter; every combination of the axes becomes its own scenario
+    "<id>[<label>]" with scalar importParams and baseScenario set to the
+    original id, so it is shaped, resumed and summarised like any other.
+    Scenarios without importParams are returned unchanged.
+    """
+    expanded = []
+    for scenario in scenarios:
+        params = scenario.get('importParams')
+        if not params:
+            expanded.append(scenario)
+            continue
+        axes = [value if isinstance(value, list) else [value] for value in params.values()]
+        for values in itertools.product(*axes):
+            chosen = dict(zip(params, values))
+            label = import_label(chosen)
+            expanded.append({
+                **scenario,
+                'id': f"{scenario['id']}[{label}]",
+                'name': f"{scenario['name']} [{label}]",
+                'baseScenario': scenario['id'],
+                'importParams': chosen,
+            })
+    return expanded
+
+
+def parse_refs(ipfs_hash: str, payload: str) -> List[str]:
+    """Root CID followed by the distinct CIDs of a refs NDJSON response"""
+    blocks = {ipfs_hash: None}
+    for line in payload.splitlines():
+        try:
+            ref = json.loads(line).get('Ref')
+        except json.JSONDecodeError:
+            continue
+        if ref:
+            blocks[ref] = None
+    return list(blocks)
+
+
+def eviction_error(path: str, status: int, payload: str) -> Optional[str]:
+    """Why a pin/rm or repo/gc call of an eviction failed, None if it did not
+
+    pin/rm of a CID that is no longer pinned is fine (GC still drops it);
+    repo/gc reports per-block failures as {"Error": ...} lines.
+    """
+    if path.endswith('/pin/rm') and status != 200 and 'not pinned' in payload:
+        return None
+    if status != 200:
+        return f"{path}: HTTP {status} {payload.strip()[:200]}"
+    for line in payload.splitlines():
+        try:
+            error = json.loads(line).get('Error')
+        except (json.JSONDecodeError, AttributeError):
+            continue
+        if error:
+            return f"{path}: {error}"
+    return None
+
+
+def prefetch_error(status: int, payload: str) -> Optional[str]:
+    """Why a prefetching refs call failed, None if it walked the whole DAG
+
+    refs reports blocks it could not fetch as {"Err": ...} lines.
+    """
+    if status != 200:
+        return f"/api/v0/refs: HTTP {status} {payload.strip()[:200]}"
+    for line in payload.splitlines():
+        try:
+            error = json.loads(line).get('Err')
+        except (json.JSONDecodeError, AttributeError):
+            continue
+        if error:
+            return f"/api/v0/refs: {error}"
+    return None
+
+
+def path_fields(path: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten one extra download path's measurement into <path>_* result fields"""
+    return {
+        f'{path}_success': result['success'],
+        f'{path}_download_time': result['download_time'],
+        f'{path}_ttfb': result.get('ttfb'),
+        f'{path}_throughput': result.get('throughput', 0),
+        f'{path}_bytes': result.get('size', 0),
+        f'{path}_size_match': result.get('size_match'),
+        f'{path}_error': result.get('error'),
+        f'{path}_cache': result.get('cache'),
+    }
+
+
+def gateway_mismatch(path: str, received: int, expected_size: int, sha256: str,
+                     expected_sha256: Optional[str]) -> Optional[str]:
+    """Why a gateway download did not deliver the content, None if it did
+
+    "gateway" must return exactly the file; a CAR or the raw blocks carry
+    framing and intermediate nodes on top of it, so they can only come up short.
+    """
+    if path == 'gateway':
+        if received != expected_size:
+            return f"size mismatch: {received} of {expected_size} bytes"
+        if expected_sha256 not in (None, sha256):
+            return "content hash mismatch"
+        return None
+    if received < expected_size:
+        return f"short {path} download: {received} of {expected_size} bytes"
+    return None
+
+
+def shaping_scope(command: Union[str, List[str]]) -> str:
+    """"container" if a bandwidthCommand shapes one given container, else "global"
+
+    A list is an argument template with {container} and {rate}
+    placeholders and is per-container if it uses {container}; a plain
+    script path is per-container only for PER_CONTAINER_SHAPING_SCRIPTS.
+    """
+    if isinstance(command, list):
+        return 'container' if any('{container}' in arg for arg in command) else 'global'
+    return 'container' if os.path.basename(command) in PER_CONTAINER_SHAPING_SCRIPTS else 'global'
+
+
+def shaping_command(command: Union[str, List[str]], rate: str,
+                    container: Optional[str] = None) -> List[str]:
+    """Argument list that applies `rate` with a bandwidthCommand"""
+    if isinstance(command, list):
+        return [arg.format(container=container, rate=rate) for arg in command]
+    return [command, container, rate] if container is not None else [command, rate]
+
+
+def has_provider(payload: str) -> bool:
+    """True if a routing/findprovs NDJSON response names at least one provider"""
+    for line in payload.splitlines():
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if event.get('Type') == 4 and event.get('Responses'):
+            return True
+    return False
+
+
+def has_peer(payload: str, peer_id: str) -> bool:
+    """True if a swarm/peers response lists `peer_id` as connected"""
+    return any(peer.get('Peer') == peer_id for peer in json.loads(payload).get('Peers') or [])
+
+
+class TransferTimeline:
+    """Downsampled bytes-over-time samples taken from a streaming loop
+
+    add() is called with each chunk as it is sent or received. A
+    [elapsed_ms, cumulative_bytes] sample is kept at most every interval;
+    once more than max_points samples exist every other one is dropped and
+    the interval doubles, so memory stays bounded for any transfer length.
+    All times come from perf_counter_ns. Because samples are only taken
+    when bytes move, a gap between consecutive samples much wider than the
+    interval marks a mid-transfer stall.
+    """
+
+    def __init__(self, start_ns: int, interval_ms: float = 100, max_points: int = 512):
+        self.start_ns = start_ns
+        self.interval_ns = int(interval_ms * 1_000_000)
+        self.max_points = max_points
+        self.total = 0
+        self.first_byte_ns: Optional[int] = None
+        self.last_byte_ns: Optional[int] = None
+        self.points: List[List[float]] = []
+        self._next_sample_ns = start_ns
+
+    def add(self, nbytes: int):
+        now = time.perf_counter_ns()
+        if self.first_byte_ns is None:
+            self.first_byte_ns = now
+        self.total += nbytes
+        self.last_byte_ns = now
+        if now >= self._next_sample_ns:
+            self._sample(now)
+
+    def _sample(self, now: int):
+        self.points.append([round((now - self.start_ns) / 1e6, 3), self.total])
+        self._next_sample_ns = now + self.interval_ns
+        if len(self.points) > self.max_points:
+            self.points = self.points[::2]
+            self.interval_ns *= 2
+
+    def elapsed(self, ns: Optional[int]) -> Optional[float]:
+        """Seconds from the start of the transfer to `ns` (None if unset)"""
+        return (ns - self.start_ns) / 1e9 if ns is not None else None
+
+    def finish(self) -> List[List[float]]:
+        """Close the timeline with a sample at the last byte and return it"""
+        if self.last_byte_ns is not None and (not self.points or self.points[-1][1] != self.total):
+            self.points.append([round((self.last_byte_ns - self.start_ns) / 1e6, 3), self.total])
+        return self.points
+
+
+class SyntheticPayload:
+    """Unique, reproducible pseudo-random content generated while it is sent
+
+    A pseudo-random base block (drawn once per seed) is repeated, and the
+    first bytes of every STAMP_INTERVAL are overwritten with (run nonce,
+    upload sequence number, offset). No two intervals of any payload in a
+    run are equal, so every block Kubo cuts (with any chunker producing
+    blocks of at least STAMP_INTERVAL bytes) is new to every node and block
+    deduplication cannot turn later iterations into cache hits. Producing a
+    chunk costs one small struct write per interval in a reused buffer,
+    i.e. several GB/s, well above a 10 Gbit link.
+    """
+
+    STAMP_INTERVAL = 4096
+    STAMP = struct.Struct('<QQQ')
+    _base_blocks: Dict[Tuple[Optional[int], int], bytes] = {}
+
+    def __init__(self, size: int, nonce: int, sequence: int, seed: Optional[int] = None,
+                 chunk_size: int = 1024 * 1024):
+        self.size = size
+        self.nonce = nonce
+        self.sequence = sequence
+        # Stamps sit at absolute offsets, so chunks are whole intervals
+        self.chunk_size = max(1, -(-chunk_size // self.STAMP_INTERVAL)) * self.STAMP_INTERVAL
+        key = (seed, self.chunk_size)
+        if key not in self._base_blocks:
+            self._base_blocks[key] = random.Random(seed).randbytes(self.chunk_size)
+        self._base = self._base_blocks[key]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self):
+        """Yield the content as memoryview slices of one reused buffer
+
+        Each slice is overwritten by the next one, so consumers must use
+        it before asking for more (as the request bodies do).
+        """
+        buffer = bytearray(self._base)
+        view = memoryview(buffer)
+        for offset in range(0, self.size, self.chunk_size):
+            n = min(self.chunk_size, self.size - offset)
+            for stamp in range(0, n - self.STAMP.size + 1, self.STAMP_INTERVAL):
+                self.STAMP.pack_into(buffer, stamp, self.nonce, self.sequence, offset + stamp)
+            yield view[:n]
+
+
+class MultipartFileStream:
+    """multipart/form-data request body that streams a file in fixed-size slices
+
+    requests builds ``files=`` uploads fully in memory before sending. This
+    body instead yields the part header, zero-copy memoryview slices of an
+    mmap of the file, and the closing boundary, so the client holds at most
+    one chunk regardless of file size. ``__len__`` lets requests send a
+    Content-Length header instead of falling back to chunked encoding.
+    ``on_sent`` is called with the size of each file slice once it has been
+    written, which drives the upload timeline.
+
+    The uploaded content can instead be the file behind a ``prefix`` or a
+    generated ``payload`` (see SyntheticPayload); the file is then only
+    used for its name.
+    """
+
+    def __init__(self, filepath: str, field: str = 'file', chunk_size: int = 1024 * 1024,
+                 on_sent: Optional[Callable[[int], None]] = None, prefix: bytes = b'',
+                 payload: Optional[SyntheticPayload] = None):
+        self.filepath = filepath
+        self.chunk_size = chunk_size
+        self.on_sent = on_sent
+        self.prefix = prefix
+        self.payload = payload
+        self.file_size = 0 if payload is not None else os.path.getsize(filepath)
+        self.size = len(prefix) + (len(payload) if payload is not None else self.file_size)
+
+        boundary = uuid.uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={boundary}'
+        self._head = (
+            f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="{field}"; '
+            f'filename="{os.path.basename(filepath)}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'
+        ).encode()
+        self._tail = f'\r\n--{boundary}--\r\n'.encode()
+
+    def __len__(self) -> int:
+        return len(self._head) + self.size + len(self._tail)
+
+    def __iter__(self):
+        yield self._head
+
+        for chunk in self.content():
+            yield chunk
+            # Resumed only after the consumer has sent the slice
+            if self.on_sent is not None:
+                self.on_sent(len(chunk))
+
+        yield self._tail
+
+    def content(self):
+        """The uploaded content alone, without the multipart framing"""
+        if self.prefix:
+            yield self.prefix
+        if self.payload is not None:
+            yield from self.payload
+        elif self.file_size:
+            with open(self.filepath, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                view = memoryview(mm)
+                try:
+                    for offset in range(0, self.file_size, self.chunk_size):
+                        yield view[offset:offset + self.chunk_size]
+                finally:
+                    # A slice may still be referenced if the request was
+                    # aborted mid-body; let GC unmap it in that case
+                    try:
+                        view.release()
+                        mm.close()
+                    except BufferError:
+                        pass
+
+    def content_sha256(self) -> str:
+        """SHA-256 of the uploaded content, regenerated after the transfer
+
+        Hashing is slower than generation, so it is kept off the timed
+        upload path.
+        """
+        digest = hashlib.sha256()
+        for chunk in self.content():
+            digest.update(chunk)
+        return digest.hexdigest()
+
+
+class AsyncTransferEngine:
+    """asyncio execution engine for high op-rate, small-object workloads
+
+    Drives many upload→download pipelines from a single thread using
+    aiohttp, with a semaphore bounding the number of pipelines in flight.
+    Results are built with IPFSBandwidthTester.build_result, so records are
+    identical to those of the blocking engine.
+    """
+
+    def __init__(self, tester: 'IPFSBandwidthTester'):
+        if aiohttp is None:
+            raise RuntimeError("aiohttp is required for the async engine "
+                               "(python3 -m pip install aiohttp)")
+        self.tester = tester
+        self.max_in_flight = tester.test_config.get('asyncMaxInFlight', 64)
+
+    def run_iterations(self, file_info: Dict, scenario: Dict, iterations: Sequence[int],
+                       in_flight: Optional[int] = None,
+                       offsets: Optional[List[float]] = None,
+                       tags: Optional[Dict[str, Any]] = None,
+                       pair: Optional[Tuple[Dict, Dict]] = None) -> List[Dict]:
+        """Run the given iterations concurrently and return their results in order
+
+        With `offsets` (seconds from now, one per iteration) the pipelines are
+        started open-loop at those times instead of as fast as the semaphore
+        allows; see IPFSBandwidthTester.run_open_loop. `tags` are added to
+        every result. Each result is journaled as soon as it completes.
+        `pair` is the (upload, download) target pair (default: by role).
+        """
+        return asyncio.run(self._run_iterations(
+            file_info, scenario, iterations, in_flight or self.max_in_flight, offsets, tags or {},
+            pair or self.tester.default_pair()
+        ))
+
+    async def _run_iterations(self, file_info: Dict, scenario: Dict, iterations: Sequence[int],
+                              in_flight: int, offsets: Optional[List[float]],
+                              tags: Dict[str, Any], pair: Tuple[Dict, Dict]) -> List[Dict]:
+        # Hash the source file up front so no pipeline blocks the loop on it
+        if self.tester.payload_config['mode'] == 'file':
+            self.tester.file_sha256(f"{self.tester.test_config['testDirectory']}/{file_info['filename']}")
+
+        semaphore = asyncio.Semaphore(in_flight)
+
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_start.append(self._on_connect_start)
+        trace.on_connection_create_end.append(self._on_connect_end)
+
+        connector = aiohttp.TCPConnector(limit=in_flight, limit_per_host=in_flight)
+        timeout = aiohttp.ClientTimeout(total=self.tester.test_config['timeout'])
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         trace_configs=[trace]) as session:
+            origin_perf = time.perf_counter()
+            origin_wall = time.time()
+
+            async def bounded(index: int, iteration: int) -> Dict:
+                if offsets is not None:
+                    await asyncio.sleep(max(0.0, origin_perf + offsets[index] - time.perf_counter()))
+                async with semaphore:
+                    result = await self.run_single_test(session, file_info, scenario, iteration, pair)
+                if offsets is not None:
+                    result['intended_start'] = origin_wall + offsets[index]
+                    result['total_time'] = time.perf_counter() - (origin_perf + offsets[index])
+                result.update(tags)
+                self.tester.emit_result(result)
+                return result
+
+            return list(await asyncio.gather(*(bounded(n, i) for n, i in enumerate(iterations))))
+
+    @staticmethod
+    def _next_chunk(chunks: Iterator) -> Optional[bytes]:
+        """Next body chunk copied into memory, or None once exhausted"""
+        chunk = next(chunks, None)
+        return None if chunk is None else bytes(chunk)
+
+    @staticmethod
+    async def _on_connect_start(session, ctx, params):
+        ctx.connect_start = time.perf_counter()
+
+    @staticmethod
+    async def _on_connect_end(session, ctx, params):
+        if ctx.trace_request_ctx is not None:
+            ctx.trace_request_ctx['connect_time'] += time.perf_counter() - ctx.connect_start
+
+    async def run_single_test(self, session: 'aiohttp.ClientSession', file_info: Dict,
+                              scenario: Dict, iteration: int,
+                              pair: Tuple[Dict, Dict]) -> Dict:
+        """Run a single test iteration (async counterpart of run_single_test)"""
+        hygiene = self.tester.hygiene
+        if hygiene is None:
+            return await self._run_pipeline(session, file_info, scenario, iteration, pair)
+        ticket = await hygiene.begin_async(pair)
+        try:
+            result = await self._run_pipeline(session, file_info, scenario, iteration, pair)
+        finally:
+            hygiene.end(pair)
+        return hygiene.finish(result, pair, ticket)
+
+    async def _run_pipeline(self, session: 'aiohttp.ClientSession', file_info: Dict,
+                            scenario: Dict, iteration: int, pair: Tuple[Dict, Dict]) -> Dict:
+        tester = self.tester
+        filepath = f"{tester.test_config['testDirectory']}/{file_info['filename']}"
+        upload_target, download_target = pair
+
+        upload_result = await self.upload_file(session, filepath, upload_target, file_info['sizeBytes'],
+                                               tester.import_params_for(scenario))
+        group = tester.group_of.get(upload_target['container'])
+        if not upload_result['success']:
+            return tester.build_result(file_info, scenario, iteration, upload_result, group=group)
+
+        cache_mode = tester.cache_mode_for(scenario)
+        cache_prep_time = None
+        try:
+            if cache_mode == 'cold':
+                cache_prep_time = await self.evict(session, upload_result['hash'], download_target)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"      Warning: could not evict {upload_result['hash']}: {e}")
+            cache_mode = 'cold-failed'
+
+        propagation_wait, propagation_ready = await self.wait_for_propagation(
+            session, upload_result['hash'], upload_target, download_target
+        )
+
+        try:
+            if cache_mode == 'warm':
+                cache_prep_time = await self.prefetch(session, upload_result['hash'], download_target)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"      Warning: could not prefetch {upload_result['hash']}: {e}")
+            cache_mode = 'warm-failed'
+
+        expected_size = upload_result.get('content_size', file_info['sizeBytes'])
+        expected_sha256 = upload_result.get('content_sha256') or tester.file_sha256(filepath)
+        download_result = await self.download_file(
+            session,
+            upload_result['hash'],
+            download_target,
+            expected_size,
+            expected_sha256
+        )
+        if download_result['success']:
+            download_result['paths'] = await self.fetch_paths(
+                session, scenario, upload_result['hash'], upload_target, download_target,
+                expected_size, expected_sha256, cache_mode
+            )
+        download_result['propagation_wait'] = propagation_wait
+        download_result['propagation_ready'] = propagation_ready
+        download_result['cache_mode'] = cache_mode
+        download_result['cache_prep_time'] = cache_prep_time
+
+        return tester.build_result(file_info, scenario, iteration, upload_result, download_result,
+                                   group=group)
+
+    async def rpc(self, session: 'aiohttp.ClientSession', target: Dict[str, Any], path: str,
+                  **params) -> Tuple[int, bytes]:
+        """Async counterpart of IPFSBandwidthTester.rpc (returns status and body)"""
+        async with session.post(self.tester.api_url(target, path), params=params) as response:
+            return response.status, await response.read()
+
+    async def evict(self, session: 'aiohttp.ClientSession', ipfs_hash: str,
+                    target: Dict[str, Any]) -> float:
+        """Async counterpart of IPFSBandwidthTester.evict"""
+        start = time.perf_counter()
+        for path, params in (('/api/v0/pin/rm', {'arg': ipfs_hash}), ('/api/v0/repo/gc', {})):
+            status, payload = await self.rpc(session, target, path, **params)
+            error = eviction_error(path, status, payload.decode(errors='replace'))
+            if error:
+                raise aiohttp.ClientError(f"eviction failed: {error}")
+        return time.perf_counter() - start
+
+    async def prefetch(self, session: 'aiohttp.ClientSession', ipfs_hash: str,
+                       target: Dict[str, Any]) -> float:
+        """Async counterpart of IPFSBandwidthTester.prefetch"""
+        start = time.perf_counter()
+        status, payload = await self.rpc(session, target, '/api/v0/refs', arg=ipfs_hash,
+                                         recursive='true')
+        error = prefetch_error(status, payload.decode(errors='replace'))
+        if error:
+            raise aiohttp.ClientError(f"prefetch failed: {error}")
+        return time.perf_counter() - start
+
+    async def dag_blocks(self, session: 'aiohttp.ClientSession', ipfs_hash: str,
+                         target: Dict[str, Any]) -> List[str]:
+        """Async counterpart of IPFSBandwidthTester.dag_blocks"""
+        status, payload = await self.rpc(session, target, '/api/v0/refs', arg=ipfs_hash,
+                                         recursive='true', unique='true')
+        if status != 200:
+            raise aiohttp.ClientError(f"refs of {ipfs_hash}: HTTP {status}")
+        return parse_refs(ipfs_hash, payload.decode())
+
+    async def gateway_download(self, session: 'aiohttp.ClientSession', ipfs_hash: str,
+                               target: Dict[str, Any], path: str, expected_size: int,
+                               expected_sha256: Optional[str] = None,
+                               blocks: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Async counterpart of IPFSBandwidthTester.gateway_download"""
+        tester = self.tester
+        if path == 'raw' and not blocks:
+            return {'success': False, 'error': "no block list for the raw download",
+                    'download_time': 0.0, 'connect_time': 0.0}
+        if path == 'raw':
+            fetches = [(cid, {'format': 'raw'}) for cid in blocks]
+        else:
+            fetches = [(ipfs_hash, {'format': 'car'} if path == 'car' else {})]
+        timing = {'connect_time': 0.0}
+        digest = hashlib.sha256()
+        received = 0
+        first_byte_ns = None
+        start_ns = time.perf_counter_ns()
+
+        try:
+            for cid, params in fetches:
+                async with session.get(tester.gateway_url(target, f'/ipfs/{cid}'), params=params,
+                                       trace_request_ctx=timing) as response:
+                    if response.status != 200:
+                        return {
+                            'success': False,
+                            'error': f"HTTP {response.status}",
+                            'download_time': (time.perf_counter_ns() - start_ns) / 1e9,
+                            'connect_time': timing['connect_time']
+                        }
+                    async for chunk in response.content.iter_chunked(tester.download_chunk_size):
+                        if first_byte_ns is None:
+                            first_byte_ns = time.perf_counter_ns()
+                        digest.update(chunk)
+                        received += len(chunk)
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e) or type(e).__name__,
+                'download_time': (time.perf_counter_ns() - start_ns) / 1e9,
+                'connect_time': timing['connect_time']
+            }
+
+        download_time = (time.perf_counter_ns() - start_ns) / 1e9
+        error = gateway_mismatch(path, received, expected_size, digest.hexdigest(), expected_sha256)
+        return {
+            'success': error is None,
+            'size': received,
+            'size_match': error is None if path == 'gateway' else None,
+            'download_time': download_time,
+            'ttfb': (first_byte_ns - start_ns) / 1e9 if first_byte_ns is not None else None,
+            'connect_time': timing['connect_time'],
+            'throughput': received / download_time if download_time > 0 else 0,
+            'error': error
+        }
+
+    async def fetch_paths(self, session: 'aiohttp.ClientSession', scenario: Dict, ipfs_hash: str,
+                          upload_target: Dict[str, Any], download_target: Dict[str, Any],
+                          expected_size: int, expected_sha256: Optional[str],
+                          cache_mode: Optional[str]) -> Dict[str, Any]:
+        """Async counterpart of IPFSBandwidthTester.fetch_paths"""
+        tester = self.tester
+        fields: Dict[str, Any] = {}
+        for path in tester.extra_paths_for(scenario):
+            blocks = None
+            cache = 'warm' if cache_mode == 'warm' else 'cold'
+            try:
+                if cache == 'cold':
+                    await self.evict(session, ipfs_hash, download_target)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"      Warning: could not evict {ipfs_hash} before the {path} download: {e}")
+                cache = 'cold-failed'
+            try:
+                if path == 'raw':
+                    blocks = await self.dag_blocks(session, ipfs_hash, upload_target)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"      Warning: could not list the blocks of {ipfs_hash}: {e}")
+            result = await self.gateway_download(session, ipfs_hash, download_target, path,
+                                                 expected_size, expected_sha256, blocks)
+            result['cache'] = cache
+            fields.update(path_fields(path, result))
+        return fields
+
+    async def peer_id(self, session: 'aiohttp.ClientSession', target: Dict[str, Any]) -> str:
+        key = target['container']
+        if key not in self.tester._peer_ids:
+            async with session.post(self.tester.api_url(target, '/api/v0/id')) as response:
+                response.raise_for_status()
+                self.tester._peer_ids[key] = json.loads(await response.text())['ID']
+        return self.tester._peer_ids[key]
+
+    async def probe_propagation(self, session: 'aiohttp.ClientSession', ipfs_hash: str,
+                                upload_target: Dict, download_target: Dict) -> bool:
+        """Async counterpart of IPFSBandwidthTester.probe_propagation"""
+        if self.tester.readiness['propagation'] == 'findprovs':
+            async with session.post(self.tester.api_url(download_target, '/api/v0/routing/findprovs'),
+                                    params={'arg': ipfs_hash, 'num-providers': '1'}) as response:
+                return response.status == 200 and has_provider(await response.text())
+        uploader = await self.peer_id(session, upload_target)
+        async with session.post(self.tester.api_url(download_target, '/api/v0/swarm/peers')) as response:
+            return response.status == 200 and has_peer(await response.text(), uploader)
+
+    async def wait_for_propagation(self, session: 'aiohttp.ClientSession', ipfs_hash: str,
+                                   upload_target: Dict, download_target: Dict) -> Tuple[float, bool]:
+        """Async counterpart of IPFSBandwidthTester.wait_for_propagation"""
+        readiness = self.tester.readiness
+        if readiness['propagation'] == 'none':
+            return 0.0, True
+        start = time.perf_counter()
+        deadline = start + readiness['timeoutSeconds']
+        while True:
+            try:
+                ready = await asyncio.wait_for(
+                    self.probe_propagation(session, ipfs_hash, upload_target, download_target),
+                    max(deadline - time.perf_counter(), 0.1)
+                )
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, KeyError):
+                ready = False
+            now = time.perf_counter()
+            if ready or now >= deadline:
+                return now - start, ready
+            await asyncio.sleep(readiness['pollIntervalSeconds'])
+
+    async def upload_file(self, session: 'aiohttp.ClientSession', filepath: str,
+                          target: Dict[str, Any], size: Optional[int] = None,
+                          params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Upload a file (or generated payload) to IPFS and measure performance"""
+        timing = {'connect_time': 0.0}
+        start_ns = time.perf_counter_ns()
+        timeline = self.tester.new_timeline(start_ns)
+
+        try:
+            body = self.tester.upload_body(filepath, size, on_sent=timeline.add)
+
+            async def stream():
+                # Chunks are produced on a worker thread, so payload
+                # generation and mmap page-ins of concurrent uploads do
+                # not serialize on the event loop
+                chunks = iter(body)
+                while True:
+                    chunk = await asyncio.to_thread(self._next_chunk, chunks)
+                    if chunk is None:
+                        break
+                    yield chunk
+
+            async with session.post(
+                self.tester.api_url(target, '/api/v0/add'),
+                params={key: rpc_value(value) for key, value in (params or {}).items()},
+                data=stream(),
+                headers={'Content-Type': body.content_type, 'Content-Length': str(len(body))},
+                trace_request_ctx=timing
+            ) as response:
+                ttfb_ns = time.perf_counter_ns()
+                payload = await response.read()
+            end_ns = time.perf_counter_ns()
+
+            upload_time = (end_ns - start_ns) / 1e9
+            phases = {
+                'upload_time': upload_time,
+                'send_time': timeline.elapsed(timeline.last_byte_ns),
+                'ttfb': (ttfb_ns - start_ns) / 1e9,
+                'ttlb': upload_time,
+                'timeline': timeline.finish(),
+                'connect_time': timing['connect_time']
+            }
+
+            if response.status == 200:
+                result = json.loads(payload)
+                if self.tester.payload_config['mode'] != 'file':
+                    phases['content_size'] = body.size
+                    phases['content_sha256'] = await asyncio.to_thread(body.content_sha256)
+                return {
+                    'success': True,
+                    'hash': result['Hash'],
+                    'size': result['Size'],
+                    'throughput': int(result['Size']) / upload_time if upload_time > 0 else 0,
+                    **phases
+                }
+            else:
+                return {
+                    'success': False,
+                    'error': f"HTTP {response.status}",
+                    **phases
+                }
+
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e) or type(e).__name__,
+                'upload_time': (time.perf_counter_ns() - start_ns) / 1e9,
+                'connect_time': timing['connect_time']
+            }
+
+    async def download_file(self, session: 'aiohttp.ClientSession', ipfs_hash: str,
+                            target: Dict[str, Any], expected_size: int,
+                            expected_sha256: Optional[str] = None) -> Dict[str, Any]:
+        """Download a file from IPFS and measure performance"""
+        timing = {'connect_time': 0.0}
+        start_ns = time.perf_counter_ns()
+        timeline = self.tester.new_timeline(start_ns)
+
+        try:
+            async with session.post(
+                self.tester.api_url(target, '/api/v0/cat'),
+                params={'arg': ipfs_hash},
+                trace_request_ctx=timing
+            ) as response:
+                if response.status != 200:
+                    return {
+                        'success': False,
+                        'error': f"HTTP {response.status}",
+                        'download_time': (time.perf_counter_ns() - start_ns) / 1e9,
+                        'connect_time': timing['connect_time']
+                    }
+
+                digest = hashlib.sha256()
+                async for chunk in response.content.iter_chunked(self.tester.download_chunk_size):
+                    digest.update(chunk)
+                    timeline.add(len(chunk))
+
+            download_time = (time.perf_counter_ns() - start_ns) / 1e9
+            received = timeline.total
+            sha256 = digest.hexdigest()
+
+            size_match = received == expected_size
+            if expected_sha256 is not None:
+                size_match = size_match and sha256 == expected_sha256
+
+            return {
+                'success': True,
+                'size': received,
+                'sha256': sha256,
+                'size_match': size_match,
+                'download_time': download_time,
+                'ttfb': timeline.elapsed(timeline.first_byte_ns),
+                'ttlb': timeline.elapsed(timeline.last_byte_ns),
+                'timeline': timeline.finish(),
+                'connect_time': timing['connect_time'],
+                'throughput': received / download_time if download_time > 0 else 0
+            }
+
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e) or type(e).__name__,
+                'download_time': (time.perf_counter_ns() - start_ns) / 1e9,
+                'connect_time': timing['connect_time']
+            }
+
+
+class RepoHygiene:
+    """Background unpin/GC worker that keeps node blockstores from growing
+
+    Finished iterations hand over their CID (finish()); a worker thread
+    unpins it on both nodes, records the repo size after every iteration
+    and runs repo/gc on a node once its unpinned bytes reach
+    gcThresholdBytes, or when a scenario ends (flush()), so collection
+    overlaps the next scenario's shaping setup instead of adding dead time.
+    GC never overlaps a measurement: iterations register their nodes with
+    begin()/end(), a pending GC waits for in-flight iterations to finish,
+    and new iterations wait (gc_wait) until the GC is done; gc_duration is
+    the time spent in the GCs they waited for. The async engine waits with
+    begin_async() on the event loop, since in-flight iterations need the
+    default executor to finish. begin() also snapshots the repo sizes, which
+    are refreshed after every unpin and GC, so a result carries the sizes
+    its measurement ran against.
+    """
+
+    def __init__(self, tester: 'IPFSBandwidthTester', gc_threshold_bytes: int):
+        self.tester = tester
+        self.gc_threshold_bytes = gc_threshold_bytes
+        self.records: List[Dict] = []
+        self.repo_sizes: Dict[str, Optional[int]] = {}
+        self._targets = {t['container']: t for group in tester.groups for t in group['targets']}
+        self._pending_bytes = {container: 0 for container in self._targets}
+        self._active = {container: 0 for container in self._targets}
+        self._collecting: set = set()
+        self._gc_seconds = {container: 0.0 for container in self._targets}
+        self._cond = threading.Condition()
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='repo-hygiene', daemon=True)
+        self._thread.start()
+        for container in self._targets:
+            self._queue.put(('stat', container, None, 0))
+
+    def begin(self, pair: Tuple[Dict, Dict]) -> Dict:
+        """Register a measurement on its nodes; returns its GC wait, GC duration and repo sizes"""
+        start = time.perf_counter()
+        with self._cond:
+            gc_before = self._gc_seconds_on(pair)
+            while not self._register(pair):
+                self._cond.wait()
+            return self._ticket(pair, start, gc_before)
+
+    async def begin_async(self, pair: Tuple[Dict, Dict]) -> Dict:
+        """begin() that polls from the event loop instead of blocking a thread"""
+        start = time.perf_counter()
+        with self._cond:
+            gc_before = self._gc_seconds_on(pair)
+        while True:
+            with self._cond:
+                if self._register(pair):
+                    return self._ticket(pair, start, gc_before)
+            await asyncio.sleep(self.tester.readiness['pollIntervalSeconds'])
+
+    def _register(self, pair: Tuple[Dict, Dict]) -> bool:
+        # Called with self._cond held
+        containers = [target['container'] for target in pair]
+        if any(container in self._collecting for container in containers):
+            return False
+        for container in containers:
+            self._active[container] += 1
+        return True
+
+    def _gc_seconds_on(self, pair: Tuple[Dict, Dict]) -> float:
+        # Called with self._cond held
+        return sum(self._gc_seconds[target['container']] for target in pair)
+
+    def _ticket(self, pair: Tuple[Dict, Dict], start: float, gc_before: float) -> Dict:
+        # Called with self._cond held, right after registering
+        return {
+            'gc_wait': time.perf_counter() - start,
+            'gc_duration': self._gc_seconds_on(pair) - gc_before,
+            'repo_sizes': {target['container']: self.repo_sizes.get(target['container'])
+                           for target in pair},
+        }
+
+    def end(self, pair: Tuple[Dict, Dict]):
+        with self._cond:
+            for target in pair:
+                self._active[target['container']] -= 1
+            self._cond.notify_all()
+
+    def finish(self, result: Dict, pair: Tuple[Dict, Dict], ticket: Dict) -> Dict:
+        """Tag a result with its begin() ticket and queue its CID for cleanup"""
+        upload_target, download_target = pair
+        result['gc_wait'] = ticket['gc_wait']
+        result['gc_duration'] = ticket['gc_duration']
+        result['upload_repo_size'] = ticket['repo_sizes'][upload_target['container']]
+        result['download_repo_size'] = ticket['repo_sizes'][download_target['container']]
+        if result.get('ipfs_hash'):
+            for target in pair:
+                self._queue.put(('unpin', target['container'], result['ipfs_hash'], result['fileSize']))
+        return result
+
+    def flush(self, targets: List[Dict]):
+        """Collect everything unpinned so far on these nodes (without waiting)"""
+        for target in targets:
+            self._queue.put(('gc', target['container'], None, 0))
+
+    def close(self):
+        """Collect all nodes and wait for the worker to finish"""
+        self.flush(list(self._targets.values()))
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            task = self._queue.get()
+            if task is None:
+                return
+            action, container, cid, size = task
+            target = self._targets[container]
+            try:
+                if action == 'unpin':
+                    self._call(target, '/api/v0/pin/rm', arg=cid)
+                    self._pending_bytes[container] += size
+                    self._record({'action': 'unpin', 'container': container, 'cid': cid,
+                                  'repo_size': self._repo_size(target)})
+                    if self._pending_bytes[container] >= self.gc_threshold_bytes:
+                        self._collect(target)
+                elif action == 'gc':
+                    if self._pending_bytes[container]:
+                        self._collect(target)
+                else:
+                    self._repo_size(target)
+            except (requests.RequestException, ValueError, KeyError) as e:
+                print(f"  Warning: repo hygiene {action} on {container} failed: {e}")
+
+    def _call(self, target: Dict, path: str, **params) -> 'requests.Response':
+        response = self.tester.rpc(target, path, **params)
+        error = eviction_error(path, response.status_code, response.text)
+        if error:
+            raise requests.HTTPError(error, response=response)
+        return response
+
+    def _repo_size(self, target: Dict) -> int:
+        response = self.tester.rpc(target, '/api/v0/repo/stat', **{'size-only': 'true'})
+        response.raise_for_status()
+        size = response.json()['RepoSize']
+        self.repo_sizes[target['container']] = size
+        return size
+
+    def _collect(self, target: Dict):
+        container = target['container']
+        with self._cond:
+            self._collecting.add(container)
+            while self._active[container]:
+                self._cond.wait()
+        before = self.repo_sizes.get(container)
+        start = time.perf_counter()
+        gc_time, error = None, None
+        try:
+            try:
+                self._call(target, '/api/v0/repo/gc')
+                # A failed GC leaves the bytes pending, so the next one retries
+                self._pending_bytes[container] = 0
+            except requests.RequestException as e:
+                error = str(e)
+            gc_time = time.perf_counter() - start
+            entry = {'action': 'gc', 'container': container, 'gc_time': gc_time,
+                     'repo_size_before': before}
+            if error:
+                entry['error'] = error
+                print(f"  Warning: repo hygiene gc on {container} failed: {error}")
+            # Refreshed before waiting iterations resume, even after a
+            # failed GC, which may still have freed blocks
+            entry['repo_size'] = self._repo_size(target)
+            self._record(entry)
+        finally:
+            with self._cond:
+                self._gc_seconds[container] += (time.perf_counter() - start
+                                                if gc_time is None else gc_time)
+                self._collecting.discard(container)
+                self._cond.notify_all()
+
+    def _record(self, entry: Dict):
+        entry = {'group': self.tester.group_of.get(entry['container']),
+                 'timestamp': datetime.now().isoformat(), **entry}
+        with self.tester._results_lock:
+            self.records.append(entry)
+        if self.tester.journal is not None:
+            self.tester.journal.append(entry, kind='hygiene')
+
+
 class IPFSBandwidthTester:
-    def __init__(self, config_file: str = "test-scenarios.json"):
+    def __init__(self, config_file: str = "test-scenarios.json", engine: str = "sync"):
         """Initialize the tester with configuration"""
         with open(config_file, 'r') as f:
             self.config = json.load(f)
 
         self.test_config = self.config['testConfiguration']
         self.test_files = self.config['testFiles']
-        self.scenarios = self.config['networkScenarios']
-        self.targets = self.config['testTargets']
         self.results = []
 
+        # UnixFS import parameters passed to /api/v0/add (chunker, raw-leaves,
+        # cid-version, trickle, hash, pin, ...): testConfiguration.importParams
+        # applies to every upload, and a scenario's importParams (lists are
+        # swept) expands it into one scenario per parameter set (see
+        # expand_import_matrix). Nothing set keeps Kubo's defaults
+        self.import_defaults = self.test_config.get('importParams', {})
+        self.scenarios = expand_import_matrix(self.config['networkScenarios'])
+
+        # Independent container groups ("testGroups": [{name, targets}]).
+        # Scenarios are scheduled across the groups in parallel, one scenario
+        # per group at a time; without testGroups the testTargets form a
+        # single group. A container may belong to one group only, since
+        # shaping applied for one scenario must not leak into another, and
+        # with several groups every bandwidthCommand must be per-container
+        # (see shaping_scope): a group's shaping then only ever touches its
+        # own containers, while a global script would override the limits of
+        # the groups measuring in parallel
+        self.groups = self.config.get('testGroups') or [
+            {'name': 'default', 'targets': self.config['testTargets']}
+        ]
+        self.group_of: Dict[str, str] = {}
+        for group in self.groups:
+            for target in group['targets']:
+                if target['container'] in self.group_of:
+                    raise ValueError(f"Container {target['container']} is in groups "
+                                     f"{self.group_of[target['container']]} and {group['name']}")
+                self.group_of[target['container']] = group['name']
+        self.scenario_groups: Dict[str, str] = {}
+        # Whether each scenario's bandwidth limit was seen to take effect
+        # on all of its group's containers (results carry shaping_confirmed)
+        self.shaping_confirmed: Dict[str, bool] = {}
+        # Guards the summary state shared by the group workers
+        self._results_lock = threading.RLock()
+
+        # Mergeable per-(scenario, file) histograms of HISTOGRAM_METRICS and
+        # total/successful counts, updated as results arrive so summaries
+        # never need the raw result list
+        self.histograms: Dict[Tuple[str, str], Dict[str, LogHistogram]] = {}
+        self.result_counts: Dict[Tuple[str, str], Dict[str, int]] = {}
+
+        # Streaming upload/download chunk sizes (bytes); memory use per
+        # transfer is bounded by these regardless of object size
+        self.download_chunk_size = self.test_config.get('downloadChunkSize', 1024 * 1024)
+        self.upload_chunk_size = self.test_config.get('uploadChunkSize', 1024 * 1024)
+        self._file_digests: Dict[str, str] = {}
+
+        # Upload content (testConfiguration.payload): "file" re-sends the test
+        # file, which Kubo deduplicates, so from the second iteration on the
+        # download node already holds its blocks; "prefix" and "prng" make
+        # every upload unique (see upload_body). A seed fixes the generated
+        # base content and prefix lengths; the nonce stamped into every
+        # upload also mixes in the run's start time, so neither a later run
+        # nor a --resume regenerates blocks an earlier run left in the repos
+        # (it is recorded in the journal header to regenerate a payload)
+        self.payload_config = {
+            'mode': 'file',
+            'seed': None,
+            'maxPrefixBytes': 256 * 1024 - 1,
+            **self.test_config.get('payload', {}),
+        }
+        self._payload_rng = random.Random(self.payload_config['seed'])
+        self._payload_nonce = self._payload_rng.getrandbits(64) ^ (time.time_ns() & (2 ** 64 - 1))
+        self._payload_sequence = itertools.count()
+
+        # With "file" payloads every uploader imports the same CID, so a
+        # pair matrix download could be served by any node already holding
+        # it and its cells would not measure the (uploader, downloader) link
+        matrices = [s['id'] for s in self.scenarios if s.get('enabled') and s.get('pairMatrix')]
+        if matrices and self.payload_config['mode'] == 'file':
+            raise ValueError(
+                f"Pair matrix scenarios {', '.join(matrices)} need unique uploads: set "
+                f"testConfiguration.payload.mode to \"prefix\" or \"prng\""
+            )
+
+        # Download cache state (testConfiguration.cache.mode, overridable per
+        # scenario with cacheMode): "cold" evicts the CID from the download
+        # node before each download, "warm" prefetches it there first and
+        # "mixed" picks one of the two per iteration (warmFraction). Unset
+        # leaves the blockstore alone, as before. A download whose eviction
+        # or prefetch failed is recorded as "cold-failed"/"warm-failed" and
+        # left out of the cold/warm stats
+        self.cache_config = {
+            'mode': None,
+            'warmFraction': 0.5,
+            'seed': None,
+            **self.test_config.get('cache', {}),
+        }
+        self._cache_rng = random.Random(self.cache_config['seed'])
+        self.cache_histograms: Dict[Tuple[str, str, str], LogHistogram] = {}
+
+        # Background unpin/GC (testConfiguration.hygiene, see RepoHygiene);
+        # started with the run so its records reach the journal
+        self.hygiene_config = {
+            'enabled': False,
+            'gcThresholdBytes': 1024 * 1024 * 1024,
+            **self.test_config.get('hygiene', {}),
+        }
+        self.hygiene: Optional[RepoHygiene] = None
+
+        # CPU-cost baselines (testConfiguration.baselines): before a file's
+        # transfers the upload node imports the same kind of content over its
+        # own loopback (command, `ipfs add` via docker exec), once with
+        # --only-hash and once for real, so each upload_time can be split
+        # into hashing, local import and network time (see run_baseline)
+        self.baseline_config = {
+            'enabled': False,
+            'command': ['docker', 'exec', '-i', '{container}', 'ipfs', 'add', '-Q'],
+            'iterations': 3,
+            **self.test_config.get('baselines', {}),
+        }
+        self.baselines: Dict[Tuple[str, str], Dict] = {}
+
+        # Retrieval paths compared on each download (testConfiguration.
+        # downloadPaths, overridable per scenario). "rpc" (/api/v0/cat) is the
+        # result's own download; "gateway", "car" and "raw" fetch the same CID
+        # from the download node's gatewayPort afterwards, evicted first
+        # unless the cache mode is "warm" (see fetch_paths)
+        self.download_paths = self.test_config.get('downloadPaths', ['rpc'])
+        for paths in [self.download_paths] + [s['downloadPaths'] for s in self.scenarios if 'downloadPaths' in s]:
+            unknown = set(paths) - set(DOWNLOAD_PATHS)
+            if unknown:
+                raise ValueError(f"Unknown download paths {sorted(unknown)}; "
+                                 f"expected some of {', '.join(DOWNLOAD_PATHS)}")
+        self.path_histograms: Dict[Tuple[str, str, str], Dict[str, LogHistogram]] = {}
+
+        # Keep-alive HTTP sessions, one per test target (keyed by container)
+        self.pool_config = self.test_config.get('connectionPool', {})
+        self.sessions: Dict[str, requests.Session] = {}
+        self._sessions_lock = threading.Lock()
+
+        # Concurrency sweep: scenarios may list worker counts under
+        # "concurrency"; the HTTP pools must hold the largest level
+        self.max_concurrency = max(
+            (max(s.get('concurrency') or [1]) for s in self.scenarios), default=1
+        )
+        self.concurrency_results: List[Dict] = []
+        self.open_loop_results: List[Dict] = []
+        self.pair_matrix_results: List[Dict] = []
+
+        # Readiness probes (testConfiguration.readiness) instead of fixed
+        # sleeps: shaping is confirmed by polling the container's qdiscs (or,
+        # without tc in the container, the pumba sidecar from outside) and
+        # each download waits until the uploader is reachable from the
+        # download node ("connected", via swarm/peers) or the CID has a
+        # provider record ("findprovs"); "none" downloads straight away
+        self.readiness = {
+            'propagation': 'connected',
+            'timeoutSeconds': 10,
+            'pollIntervalSeconds': 0.05,
+            'shapingProbe': ['docker', 'exec', '{container}', 'tc', 'qdisc', 'show'],
+            'shapingSidecar': 'pumba-rate-{container}',
+            'shapingFallbackSeconds': 2,
+            **self.test_config.get('readiness', {}),
+        }
+        self._peer_ids: Dict[str, str] = {}
+        self.shaping_waits: List[Dict] = []
+        self._probe_warnings: Set[Tuple[str, str]] = set()
+        self._unshaped_qdiscs: Dict[str, str] = {}
+
+        # Shaping is applied to and removed from a group's containers
+        # concurrently (at most shapingWorkers at once, default: all of them);
+        # each scenario setup/teardown is kept with its latency and outcome
+        self.shaping_workers = self.test_config.get('shapingWorkers')
+        self._global_shaping_lock = threading.Lock()
+
+        # Global bandwidth commands (see shaping_scope) shape every container
+        # in one call, so they run once per setup and never concurrently
+        self.global_shaping_scenarios = [
+            s['id'] for s in self.scenarios
+            if s['enabled'] and s.get('bandwidthCommand') and shaping_scope(s['bandwidthCommand']) == 'global'
+        ]
+        if self.global_shaping_scenarios and len(self.groups) > 1:
+            raise ValueError(
+                f"testGroups run in parallel, but scenarios {', '.join(self.global_shaping_scenarios)} "
+                f"use a global bandwidthCommand, which would override the other groups' limits "
+                f"mid-measurement. Use a per-container command (limit-bandwidth.sh, or a "
+                f"template with {{container}} and {{rate}}) or a single group"
+            )
+        if self.global_shaping_scenarios and (self.shaping_workers or 1) > 1:
+            raise ValueError(
+                f"shapingWorkers={self.shaping_workers} asks for concurrent shaping, but scenarios "
+                f"{', '.join(self.global_shaping_scenarios)} use a global bandwidthCommand, which "
+                f"shapes all containers in one call and must run alone. Use a per-container "
+                f"command (limit-bandwidth.sh, or a template with {{container}} and {{rate}}) "
+                f"or drop shapingWorkers"
+            )
+        self.scenario_setups: List[Dict] = []
+
+        # Execution engine: blocking requests ("sync") or asyncio ("async")
+        self.engine = engine
+        self.async_engine = AsyncTransferEngine(self) if engine == 'async' else None
+
         # Create output directory if it doesn't exist
         Path(self.test_config['outputDirectory']).mkdir(parents=True, exist_ok=True)
 
-        # Set up result file with timestamp
+        # Set up result file with timestamp. "ndjson" (default) appends each
+        # result to a journal as it completes, "npz" journals into a spool
+        # that is turned into a columnar store (see result_store.py) once the
+        # run ends, and "json" rewrites one document. Only "json" keeps the
+        # raw result dicts in memory
+        reporting = self.config.get('reporting', {})
+        self.result_format = reporting.get('format', 'ndjson')
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.result_file = f"{self.test_config['outputDirectory']}/test_results_{timestamp}.json"
-
-    def apply_bandwidth_limit(self, scenario: Dict[str, Any], container: str) -> bool:
-        """Apply bandwidth limitation to a container"""
+        result_base = f"{self.test_config['outputDirectory']}/test_results_{timestamp}"
+        if self.result_format == 'json':
+            self.result_file = f"{result_base}.json"
+        elif self.result_format == 'npz':
+            self.result_file = f"{result_base}.npz"
+        else:
+            self.result_file = f"{result_base}.ndjson{COMPRESSION_SUFFIXES[reporting.get('compression')]}"
+        self.journal: Optional[ResultJournal] = None
+
+        # Resume state (see resume_from): successful (scenario, file, iteration)
+        # tuples and whole concurrency levels / open-loop runs already recorded
+        self.resumed_from: Optional[str] = None
+        self.completed: set = set()
+        self.completed_levels: set = set()
+        self.completed_open_loops: set = set()
+        self.completed_matrices: set = set()
+
+    def apply_bandwidth_limit(self, scenario: Dict[str, Any], container: str,
+                              log: Optional[List[str]] = None) -> str:
+        """Apply a per-container bandwidth limitation to one container
+
+        Returns "confirmed", "unconfirmed" (the command ran but its effect
+        was not observed) or "failed".
+        """
         if scenario['bandwidth'] is None:
-            print(f"  No bandwidth limit for {scenario['name']}")
-            return True
+            self.say(f"No bandwidth limit for {scenario['name']}", log)
+            return 'confirmed'
 
+        before = self.qdisc_snapshot(container)
         try:
             # Stop any existing chaos
             subprocess.run(
-                ["./scripts/network-chaos/stop-chaos.sh", container],
+                [STOP_CHAOS_COMMAND, container],
                 capture_output=True,
                 text=True,
                 check=False
             )
 
             # Apply new bandwidth limit
-            cmd = [scenario['bandwidthCommand'], container, scenario['bandwidth']]
+            cmd = shaping_command(scenario['bandwidthCommand'], scenario['bandwidth'], container)
             subprocess.run(cmd, capture_output=True, text=True, check=True)
-            print(f"  Applied {scenario['bandwidth']} limit to {container}")
-            time.sleep(2)  # Wait for network changes to take effect
-            return True
-        except subprocess.CalledProcessError as e:
-            print(f"  Failed to apply bandwidth limit: {e}")
-            return False
-
-    def remove_bandwidth_limit(self, container: str):
-        """Remove bandwidth limitation from a container"""
+        except (subprocess.CalledProcessError, OSError) as e:
+            self.say(f"Failed to apply bandwidth limit to {container}: {e}", log)
+            return 'failed'
+        return self.confirm_shaping(scenario, container, 'apply', log, before)
+
+    def remove_bandwidth_limit(self, container: str, scenario: Optional[Dict[str, Any]] = None,
+                               log: Optional[List[str]] = None) -> str:
+        """Remove bandwidth limitation from one container (see apply_bandwidth_limit)"""
+        before = self.qdisc_snapshot(container)
         try:
             subprocess.run(
-                ["./scripts/network-chaos/stop-chaos.sh", container],
+                [STOP_CHAOS_COMMAND, container],
                 capture_output=True,
                 text=True,
                 check=False
             )
-            print(f"  Removed bandwidth limit from {container}")
-            time.sleep(2)
-        except Exception as e:
-            print(f"  Warning: Could not remove bandwidth limit: {e}")
-
-    def upload_file(self, filepath: str, api_port: int) -> Dict[str, Any]:
-        """Upload a file to IPFS and measure performance"""
-        start_time = time.time()
-
+        except OSError as e:
+            self.say(f"Warning: Could not remove bandwidth limit from {container}: {e}", log)
+            return 'failed'
+        return self.confirm_shaping(scenario, container, 'remove', log, before)
+
+    def run_global_shaping(self, scenario: Optional[Dict[str, Any]], action: str) -> bool:
+        """Run a global bandwidthCommand (or clear all chaos) once
+
+        Global scripts replace every pumba sidecar and shape every benchmark
+        container, so concurrent copies would remove each other's sidecars;
+        calls are serialised and made once per scenario setup or teardown.
+        """
+        with self._global_shaping_lock:
+            subprocess.run([STOP_CHAOS_COMMAND], capture_output=True, text=True, check=False)
+            if action != 'apply':
+                return True
+            try:
+                subprocess.run(shaping_command(scenario['bandwidthCommand'], scenario['bandwidth']),
+                               capture_output=True, text=True, check=True)
+            except (subprocess.CalledProcessError, OSError) as e:
+                print(f"  Failed to apply {scenario['bandwidth']} limit with "
+                      f"{scenario['bandwidthCommand']}: {e}")
+                return False
+        return True
+
+    def confirm_shaping(self, scenario: Optional[Dict[str, Any]], container: str, action: str,
+                        log: Optional[List[str]] = None, before: Optional[str] = None) -> str:
+        """Wait for a container's shaping change to take effect and record it
+
+        `before` is the container's qdisc snapshot from before the change.
+        Returns "confirmed" or "unconfirmed".
+        """
+        wait, ready, method = self.wait_for_shaping(container, action == 'apply', before)
+        self.record_shaping(scenario, container, action, wait, ready, method)
+        if action == 'apply':
+            self.say(f"Applied {scenario['bandwidth']} limit to {container} "
+                     f"({'active' if ready else 'not confirmed'} after {wait:.2f}s, "
+                     f"{method})", log)
+        else:
+            self.say(f"Removed bandwidth limit from {container} "
+                     f"({'cleared' if ready else 'not confirmed'} after {wait:.2f}s, "
+                     f"{method})", log)
+        return 'confirmed' if ready else 'unconfirmed'
+
+    def say(self, message: str, log: Optional[List[str]] = None):
+        """Print a progress line, or keep it for later when running in a worker thread"""
+        if log is None:
+            print(f"  {message}")
+        else:
+            log.append(message)
+
+    def shaping_scope_for(self, scenario: Optional[Dict[str, Any]]) -> str:
+        """Scope of the shaping a scenario sets up (see shaping_scope)
+
+        Clearing shaping left by a crashed run (no scenario) is global if
+        any enabled scenario shapes globally.
+        """
+        if scenario is None:
+            return 'global' if self.global_shaping_scenarios else 'container'
+        if not scenario.get('bandwidthCommand'):
+            return 'container'
+        return shaping_scope(scenario['bandwidthCommand'])
+
+    def shape_targets(self, scenario: Optional[Dict[str, Any]], targets: List[Dict],
+                      action: str) -> Dict[str, str]:
+        """Apply ("apply") or remove ("remove") shaping on all targets at once
+
+        A per-container bandwidthCommand runs for each container in a thread
+        pool, so setting up a scenario takes about as long as its slowest
+        container instead of the sum over all of them. A global command
+        runs once, serially, and only the readiness probes are parallel.
+        Each container's output is printed together once all are done.
+        Returns each container's outcome (see apply_bandwidth_limit); the
+        outcomes and wall-clock setup latency are kept as a
+        'scenario_setup' record.
+        """
+        if action == 'apply' and scenario['bandwidth'] is None:
+            print(f"  No bandwidth limit for {scenario['name']}")
+            return {target['container']: 'confirmed' for target in targets}
+
+        containers = [target['container'] for target in targets]
+        logs: Dict[str, List[str]] = {container: [] for container in containers}
+        start = time.perf_counter()
+        if self.shaping_scope_for(scenario) == 'global':
+            with ThreadPoolExecutor(max_workers=len(containers)) as pool:
+                befores = dict(zip(containers, pool.map(self.qdisc_snapshot, containers)))
+                changed = self.run_global_shaping(scenario, action)
+                outcomes = pool.map(
+                    lambda container: self.confirm_shaping(scenario, container, action,
+                                                           logs[container], befores[container])
+                    if changed else 'failed',
+                    containers
+                )
+                succeeded = dict(zip(containers, outcomes))
+        else:
+            with ThreadPoolExecutor(max_workers=self.shaping_workers or len(containers)) as pool:
+                if action == 'apply':
+                    outcomes = pool.map(
+                        lambda container: self.apply_bandwidth_limit(scenario, container, logs[container]),
+                        containers
+                    )
+                else:
+                    outcomes = pool.map(
+                        lambda container: self.remove_bandwidth_limit(container, scenario, logs[container]),
+                        containers
+                    )
+                succeeded = dict(zip(containers, outcomes))
+        latency = time.perf_counter() - start
+        for container in containers:
+            for line in logs[container]:
+                print(f"  [{container}] {line}")
+
+        setup = {
+            'scenario': scenario['id'] if scenario else None,
+            'group': self.group_of.get(containers[0]) if containers else None,
+            'action': action,
+            'latency': latency,
+            'containers': {container: outcome != 'failed' for container, outcome in succeeded.items()},
+            'confirmed': {container: outcome == 'confirmed' for container, outcome in succeeded.items()},
+        }
+        with self._results_lock:
+            self.scenario_setups.append(setup)
+        if self.journal is not None:
+            self.journal.append(setup, kind='scenario_setup')
+
+        confirmed = sum(1 for outcome in succeeded.values() if outcome == 'confirmed')
+        failed = sum(1 for outcome in succeeded.values() if outcome == 'failed')
+        print(f"  Shaping {action}: {confirmed}/{len(containers)} containers confirmed"
+              + (f", {failed} failed" if failed else "") + f" in {latency:.2f}s")
+        return succeeded
+
+    def warn_probe(self, container: str, probe: str, message: str):
+        """Print a shaping probe warning, once per container and probe"""
+        with self._results_lock:
+            if (container, probe) in self._probe_warnings:
+                return
+            self._probe_warnings.add((container, probe))
+        print(f"  WARNING: {message}")
+
+    def run_probe(self, container: str, probe: str, cmd: List[str]) -> Optional[str]:
+        """Stdout of a shaping probe, or None (with a warning) if it cannot run"""
         try:
-            # Read file
-            with open(filepath, 'rb') as f:
-                files = {'file': f}
-
-                # Upload to IPFS
-                response = requests.post(
-                    f'http://localhost:{api_port}/api/v0/add',
-                    files=files,
-                    timeout=self.test_config['timeout']
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            self.warn_probe(container, probe, f"{probe} probe cannot run for {container}: {e}")
+            return None
+        if result.returncode != 0:
+            detail = result.stderr.strip() or f"exit status {result.returncode}"
+            self.warn_probe(container, probe, f"{probe} probe cannot run for {container}: {detail}")
+            return None
+        return result.stdout
+
+    def qdisc_snapshot(self, container: str) -> Optional[str]:
+        """readiness.shapingProbe output for a container, None if it cannot run
+
+        The probe (default: `tc qdisc show` inside the container) gets
+        {container} substituted.
+        """
+        cmd = [arg.replace('{container}', container) for arg in self.readiness['shapingProbe']]
+        return self.run_probe(container, 'qdisc', cmd)
+
+    def shaping_reached(self, container: str, active: bool,
+                        before: Optional[str]) -> Tuple[Optional[bool], str]:
+        """Whether a container's shaping change has taken effect, and how that was seen
+
+        Static tbf/netem qdiscs installed at container start (container-init,
+        router setups) are not the benchmark's shaping, so the qdiscs are
+        compared with the snapshot taken before the change: an apply is seen
+        once a shaping qdisc shows up that was not there, a remove once the
+        qdiscs change back, match the container's known unshaped state or
+        hold no shaping qdisc at all. If the probe cannot run, e.g. when the
+        container has no tc, checks from outside whether the
+        readiness.shapingSidecar pumba container is running. (None, 'none')
+        if neither can be observed.
+        """
+        output = self.qdisc_snapshot(container)
+        if output is not None:
+            shaped = SHAPING_QDISC.search(output) is not None
+            if active:
+                if before is not None and self._unshaped_qdiscs.get(container) is None:
+                    self._unshaped_qdiscs[container] = before
+                return shaped and output != before, 'qdisc'
+            reached = (not shaped or output == self._unshaped_qdiscs.get(container)
+                       or (before is not None and output != before))
+            if reached and self._unshaped_qdiscs.get(container) is None:
+                self._unshaped_qdiscs[container] = output
+            return reached, 'qdisc'
+        if self.readiness.get('shapingSidecar'):
+            sidecar = self.readiness['shapingSidecar'].replace('{container}', container)
+            output = self.run_probe(container, 'sidecar', [
+                'docker', 'ps', '--filter', f'name={sidecar}', '--format', '{{.Names}}',
+            ])
+            if output is not None:
+                return (sidecar in output.split()) == active, 'sidecar'
+        return None, 'none'
+
+    def wait_for_shaping(self, container: str, active: bool,
+                         before: Optional[str] = None) -> Tuple[float, bool, str]:
+        """Poll until a container's shaping is (or is no longer) in place
+
+        Returns (seconds waited, whether the state was confirmed, probe
+        used). If shaping cannot be observed at all, warns and falls back to
+        sleeping readiness.shapingFallbackSeconds, unconfirmed.
+        """
+        start = time.perf_counter()
+        deadline = start + self.readiness['timeoutSeconds']
+        while True:
+            reached, method = self.shaping_reached(container, active, before)
+            if reached is None:
+                self.warn_probe(container, 'sleep',
+                                f"shaping on {container} cannot be observed, sleeping "
+                                f"{self.readiness['shapingFallbackSeconds']}s per change "
+                                f"instead of confirming it")
+                time.sleep(self.readiness['shapingFallbackSeconds'])
+                return time.perf_counter() - start, False, 'sleep'
+            now = time.perf_counter()
+            if reached or now >= deadline:
+                return now - start, reached, method
+            time.sleep(self.readiness['pollIntervalSeconds'])
+
+    def record_shaping(self, scenario: Optional[Dict[str, Any]], container: str,
+                       action: str, wait: float, ready: bool, method: str):
+        """Keep (and journal) the setup time spent applying or removing shaping"""
+        entry = {
+            'scenario': scenario['id'] if scenario else None,
+            'group': self.group_of.get(container),
+            'container': container,
+            'action': action,
+            'wait': wait,
+            'ready': ready,
+            'probe': method,
+        }
+        with self._results_lock:
+            self.shaping_waits.append(entry)
+        if self.journal is not None:
+            self.journal.append(entry, kind='shaping')
+
+    def session_for(self, target: Dict[str, Any]) -> requests.Session:
+        """Return the persistent HTTP session for a test target
+
+        Pool size and socket buffer sizes come from
+        testConfiguration.connectionPool, overridable per target with a
+        connectionPool entry of its own.
+        """
+        key = target['container']
+        with self._sessions_lock:
+            if key not in self.sessions:
+                pool = {**self.pool_config, **target.get('connectionPool', {})}
+                socket_options = []
+                if pool.get('sendBufferBytes'):
+                    socket_options.append((socket.SOL_SOCKET, socket.SO_SNDBUF, pool['sendBufferBytes']))
+                if pool.get('recvBufferBytes'):
+                    socket_options.append((socket.SOL_SOCKET, socket.SO_RCVBUF, pool['recvBufferBytes']))
+
+                pool_size = max(pool.get('poolSize', 10), self.max_concurrency)
+                adapter = TargetHTTPAdapter(
+                    socket_options=socket_options,
+                    pool_connections=1,
+                    pool_maxsize=pool_size,
                 )
+                session = requests.Session()
+                session.mount('http://', adapter)
+                self.sessions[key] = session
+            return self.sessions[key]
+
+    def close_sessions(self):
+        """Close all persistent HTTP sessions"""
+        with self._sessions_lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions.clear()
+
+    def new_timeline(self, start_ns: int) -> TransferTimeline:
+        """Create a transfer timeline using testConfiguration.timeline settings"""
+        timeline_config = self.test_config.get('timeline', {})
+        return TransferTimeline(
+            start_ns,
+            interval_ms=timeline_config.get('intervalMs', 100),
+            max_points=timeline_config.get('maxPoints', 512),
+        )
 
-            upload_time = time.time() - start_time
+    def api_url(self, target: Dict[str, Any], path: str) -> str:
+        """Build a Kubo RPC URL for a test target"""
+        return f"http://{target.get('host', 'localhost')}:{target['apiPort']}{path}"
+
+    def gateway_url(self, target: Dict[str, Any], path: str) -> str:
+        """Build an HTTP gateway URL for a test target"""
+        return f"http://{target.get('host', 'localhost')}:{target['gatewayPort']}{path}"
+
+    def peer_id(self, target: Dict[str, Any]) -> str:
+        """Peer ID of a test target's Kubo node (looked up once)"""
+        key = target['container']
+        if key not in self._peer_ids:
+            response = self.session_for(target).post(self.api_url(target, '/api/v0/id'),
+                                                     timeout=self.test_config['timeout'])
+            response.raise_for_status()
+            self._peer_ids[key] = response.json()['ID']
+        return self._peer_ids[key]
+
+    def probe_propagation(self, ipfs_hash: str, upload_target: Dict, download_target: Dict,
+                          timeout: float) -> bool:
+        """One readiness check: can the download node fetch ipfs_hash now?"""
+        session = self.session_for(download_target)
+        if self.readiness['propagation'] == 'findprovs':
+            response = session.post(self.api_url(download_target, '/api/v0/routing/findprovs'),
+                                    params={'arg': ipfs_hash, 'num-providers': 1}, timeout=timeout)
+            return response.status_code == 200 and has_provider(response.text)
+        uploader = self.peer_id(upload_target)
+        response = session.post(self.api_url(download_target, '/api/v0/swarm/peers'), timeout=timeout)
+        return response.status_code == 200 and has_peer(response.text, uploader)
+
+    def wait_for_propagation(self, ipfs_hash: str, upload_target: Dict,
+                             download_target: Dict) -> Tuple[float, bool]:
+        """Poll until the download node can fetch ipfs_hash
+
+        Returns (seconds waited, whether readiness was confirmed). On timeout
+        the download goes ahead anyway, so any remaining lookup time shows up
+        in download_time.
+        """
+        if self.readiness['propagation'] == 'none':
+            return 0.0, True
+        start = time.perf_counter()
+        deadline = start + self.readiness['timeoutSeconds']
+        while True:
+            try:
+                ready = self.probe_propagation(ipfs_hash, upload_target, download_target,
+                                               max(deadline - time.perf_counter(), 0.1))
+            except (requests.RequestException, ValueError, KeyError):
+                ready = False
+            now = time.perf_counter()
+            if ready or now >= deadline:
+                return now - start, ready
+            time.sleep(self.readiness['pollIntervalSeconds'])
+
+    def rpc(self, target: Dict[str, Any], path: str, timeout: Optional[float] = None,
+            **params) -> requests.Response:
+        """POST a Kubo RPC call and read the whole response (errors are not raised)"""
+        return self.session_for(target).post(self.api_url(target, path), params=params,
+                                             timeout=timeout or self.test_config['timeout'])
+
+    def cache_mode_for(self, scenario: Dict) -> Optional[str]:
+        """Cache state for the next download of a scenario ("cold"/"warm"/None)"""
+        mode = scenario.get('cacheMode', self.cache_config['mode'])
+        if mode == 'mixed':
+            return 'warm' if self._cache_rng.random() < self.cache_config['warmFraction'] else 'cold'
+        return mode
+
+    def import_params_for(self, scenario: Dict) -> Dict[str, Any]:
+        """/api/v0/add parameters of a scenario (run-wide defaults overridden by its own)"""
+        return {**self.import_defaults, **scenario.get('importParams', {})}
+
+    def evict(self, ipfs_hash: str, target: Dict[str, Any]) -> float:
+        """Remove a CID's blocks from a node (unpin + repo/gc); returns seconds spent
+
+        GC drops every unpinned block on the node, so with concurrent
+        pipelines other in-flight downloads may have to refetch blocks.
+        Raises requests.HTTPError if either call fails, since the CID may
+        then still be cached.
+        """
+        start = time.perf_counter()
+        for path, params in (('/api/v0/pin/rm', {'arg': ipfs_hash}), ('/api/v0/repo/gc', {})):
+            response = self.rpc(target, path, **params)
+            error = eviction_error(path, response.status_code, response.text)
+            if error:
+                raise requests.HTTPError(f"eviction failed: {error}", response=response)
+        return time.perf_counter() - start
+
+    def prefetch(self, ipfs_hash: str, target: Dict[str, Any]) -> float:
+        """Pull a CID's whole DAG into a node's blockstore; returns seconds spent
+
+        Raises requests.HTTPError if refs fails or reports an error, since
+        the DAG may then be only partly cached.
+        """
+        start = time.perf_counter()
+        response = self.rpc(target, '/api/v0/refs', arg=ipfs_hash, recursive='true')
+        error = prefetch_error(response.status_code, response.text)
+        if error:
+            raise requests.HTTPError(f"prefetch failed: {error}", response=response)
+        return time.perf_counter() - start
+
+    def upload_body(self, filepath: str, size: Optional[int] = None,
+                    on_sent: Optional[Callable[[int], None]] = None) -> MultipartFileStream:
+        """Request body for one upload in the configured payload mode
+
+        "file" sends the test file as is, "prefix" puts random bytes of
+        random length in front of it (shifting every fixed-size chunk
+        boundary) and "prng" generates `size` bytes of unique content
+        (see SyntheticPayload) without reading the file at all.
+        """
+        mode = self.payload_config['mode']
+        if mode == 'prng':
+            payload = SyntheticPayload(
+                size if size is not None else os.path.getsize(filepath),
+                self._payload_nonce, next(self._payload_sequence),
+                self.payload_config['seed'], self.upload_chunk_size
+            )
+            return MultipartFileStream(filepath, chunk_size=self.upload_chunk_size,
+                                       on_sent=on_sent, payload=payload)
+        prefix = b''
+        if mode == 'prefix':
+            prefix = os.urandom(self._payload_rng.randint(1, self.payload_config['maxPrefixBytes']))
+        return MultipartFileStream(filepath, chunk_size=self.upload_chunk_size,
+                                   on_sent=on_sent, prefix=prefix)
+
+    def upload_file(self, filepath: str, target: Dict[str, Any], size: Optional[int] = None,
+                    params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Upload a file (or generated payload) to IPFS and measure performance
+
+        `params` are /api/v0/add import parameters (see import_params_for).
+        Phases are timed on perf_counter_ns: send_time is when the last body
+        byte was handed to the socket, ttfb when the response headers
+        arrived (Kubo answers once the import is done) and ttlb when the
+        response body was fully read.
+        """
+        session = self.session_for(target)
+        reset_connect_time()
+        start_ns = time.perf_counter_ns()
+        timeline = self.new_timeline(start_ns)
+
+        try:
+            # Stream the multipart body straight from the page cache (or generator)
+            body = self.upload_body(filepath, size, on_sent=timeline.add)
+
+            # Upload to IPFS
+            response = session.post(
+                self.api_url(target, '/api/v0/add'),
+                params={key: rpc_value(value) for key, value in (params or {}).items()},
+                data=body,
+                headers={'Content-Type': body.content_type},
+                timeout=self.test_config['timeout'],
+                stream=True
+            )
+            ttfb_ns = time.perf_counter_ns()
+            payload = response.content
+            end_ns = time.perf_counter_ns()
+
+            upload_time = (end_ns - start_ns) / 1e9
+            phases = {
+                'upload_time': upload_time,
+                'send_time': timeline.elapsed(timeline.last_byte_ns),
+                'ttfb': (ttfb_ns - start_ns) / 1e9,
+                'ttlb': upload_time,
+                'timeline': timeline.finish(),
+                'connect_time': connect_time()
+            }
 
             if response.status_code == 200:
-                result = response.json()
+                result = json.loads(payload)
+                if self.payload_config['mode'] != 'file':
+                    phases['content_size'] = body.size
+                    phases['content_sha256'] = body.content_sha256()
                 return {
                     'success': True,
                     'hash': result['Hash'],
                     'size': result['Size'],
-                    'upload_time': upload_time,
-                    'throughput': int(result['Size']) / upload_time if upload_time > 0 else 0
+                    'throughput': int(result['Size']) / upload_time if upload_time > 0 else 0,
+                    **phases
                 }
             else:
                 return {
                     'success': False,
                     'error': f"HTTP {response.status_code}",
-                    'upload_time': upload_time
+                    **phases
                 }
 
         except Exception as e:
             return {
                 'success': False,
                 'error': str(e),
-                'upload_time': time.time() - start_time
+                'upload_time': (time.perf_counter_ns() - start_ns) / 1e9,
+                'connect_time': connect_time()
             }
 
-    def download_file(self, ipfs_hash: str, api_port: int, expected_size: int) -> Dict[str, Any]:
-        """Download a file from IPFS and measure performance"""
-        start_time = time.time()
+    def file_sha256(self, filepath: str) -> str:
+        """Return the SHA-256 of a test file, hashing it once per run"""
+        if filepath not in self._file_digests:
+            digest = hashlib.sha256()
+            buffer = bytearray(self.download_chunk_size)
+            view = memoryview(buffer)
+            with open(filepath, 'rb', buffering=0) as f:
+                while True:
+                    n = f.readinto(buffer)
+                    if not n:
+                        break
+                    digest.update(view[:n])
+            self._file_digests[filepath] = digest.hexdigest()
+        return self._file_digests[filepath]
+
+    def loopback_add(self, target: Dict[str, Any], params: Dict[str, Any],
+                     content: Iterable = ()) -> Tuple[float, Optional[str]]:
+        """Time one baselines.command add on a node, fed `content` on stdin
+
+        Returns (seconds, CID printed by the add, or None if it failed).
+        """
+        cmd = [arg.format(container=target['container']) for arg in self.baseline_config['command']]
+        cmd += [f"--{key}={rpc_value(value)}" for key, value in params.items()]
+        start = time.perf_counter()
+        try:
+            proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                    stderr=subprocess.DEVNULL)
+        except OSError:
+            return time.perf_counter() - start, None
+        try:
+            for chunk in content:
+                proc.stdin.write(chunk)
+            output, _ = proc.communicate(timeout=self.test_config['timeout'])
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+            proc.wait()
+            return time.perf_counter() - start, None
+        elapsed = time.perf_counter() - start
+        cid = output.decode().strip()
+        return elapsed, cid if proc.returncode == 0 and cid else None
+
+    def run_baseline(self, file_info: Dict, scenario: Dict, target: Dict[str, Any]) -> Optional[Dict]:
+        """Measure the hashing and local import cost of a file's uploads on their node
+
+        Each round times three loopback adds with the scenario's import
+        parameters: an empty --only-hash add (the fixed cost of exec, CLI
+        start-up and the local RPC call, subtracted from the other two), an
+        --only-hash add of fresh content (chunking and hashing) and a real
+        add of fresh content (hashing plus blockstore writes). Content comes
+        from upload_body, so the adds meet the same deduplication as the
+        uploads in the configured payload mode. Medians over
+        baselines.iterations rounds are kept per (scenario, file).
+        """
+        filepath = f"{self.test_config['testDirectory']}/{file_info['filename']}"
+        params = self.import_params_for(scenario)
+        hash_only = {**params, 'only-hash': True}
+        overheads, hash_times, add_times = [], [], []
+
+        pair = (target,)
+        if self.hygiene is not None:
+            self.hygiene.begin(pair)
+        try:
+            for _ in range(self.baseline_config['iterations']):
+                overhead, empty_cid = self.loopback_add(target, hash_only)
+                hash_time, hashed_cid = self.loopback_add(
+                    target, hash_only, self.upload_body(filepath, file_info['sizeBytes']).content()
+                )
+                add_time, cid = self.loopback_add(
+                    target, params, self.upload_body(filepath, file_info['sizeBytes']).content()
+                )
+                if not (empty_cid and hashed_cid and cid):
+                    print(f"    Warning: baseline add failed on {target['container']}, "
+                          f"no upload decomposition for {file_info['filename']}")
+                    return None
+                # Keep the blockstore as the transfers would find it
+                try:
+                    self.rpc(target, '/api/v0/pin/rm', arg=cid)
+                except requests.RequestException as e:
+                    print(f"    Warning: could not unpin baseline {cid}: {e}")
+                overheads.append(overhead)
+                hash_times.append(hash_time)
+                add_times.append(add_time)
+        finally:
+            if self.hygiene is not None:
+                self.hygiene.end(pair)
+
+        overhead = statistics.median(overheads)
+        hash_time = max(0.0, statistics.median(hash_times) - overhead)
+        loopback_time = max(hash_time, statistics.median(add_times) - overhead)
+        baseline = {
+            'scenario': scenario['id'],
+            'file': file_info['filename'],
+            'fileSize': file_info['sizeBytes'],
+            'container': target['container'],
+            'group': self.group_of.get(target['container']),
+            'import_params': import_label(params) if params else None,
+            'rounds': len(overheads),
+            'exec_overhead': overhead,
+            'hash_time': hash_time,
+            'import_time': loopback_time - hash_time,
+            'loopback_time': loopback_time,
+        }
+        with self._results_lock:
+            self.baselines[(scenario['id'], file_info['filename'])] = baseline
+        if self.journal is not None:
+            self.journal.append(baseline, kind='baseline')
+
+        print(f"    Baseline on {target['container']}: hash {hash_time:.3f}s, "
+              f"local import {loopback_time - hash_time:.3f}s (exec overhead {overhead:.3f}s)")
+        return baseline
+
+    def extra_paths_for(self, scenario: Dict) -> List[str]:
+        """Download paths measured after a scenario's RPC download"""
+        return [path for path in scenario.get('downloadPaths', self.download_paths) if path != 'rpc']
+
+    def dag_blocks(self, ipfs_hash: str, target: Dict[str, Any]) -> List[str]:
+        """CIDs of every block of a DAG, root first (listed by refs on `target`)"""
+        response = self.rpc(target, '/api/v0/refs', arg=ipfs_hash, recursive='true', unique='true')
+        response.raise_for_status()
+        return parse_refs(ipfs_hash, response.text)
+
+    def gateway_download(self, ipfs_hash: str, target: Dict[str, Any], path: str,
+                         expected_size: int, expected_sha256: Optional[str] = None,
+                         blocks: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Fetch a CID from a node's HTTP gateway and measure performance
+
+        "gateway" streams GET /ipfs/<cid> and is verified like cat; "car"
+        streams the trustless CAR of the whole DAG (?format=car) and "raw"
+        requests each of `blocks` in turn (?format=raw), as a trustless
+        client walking the DAG would, and fails without a block list.
+        Throughput is bytes received over time, CAR framing and intermediate
+        blocks included; a download that comes up short fails (see
+        gateway_mismatch).
+        """
+        if path == 'raw' and not blocks:
+            return {'success': False, 'error': "no block list for the raw download",
+                    'download_time': 0.0, 'connect_time': 0.0}
+        session = self.session_for(target)
+        if path == 'raw':
+            fetches = [(cid, {'format': 'raw'}) for cid in blocks]
+        else:
+            fetches = [(ipfs_hash, {'format': 'car'} if path == 'car' else {})]
+        digest = hashlib.sha256()
+        buffer = bytearray(self.download_chunk_size)
+        view = memoryview(buffer)
+        received = 0
+        first_byte_ns = None
+        reset_connect_time()
+        start_ns = time.perf_counter_ns()
+
+        try:
+            for cid, params in fetches:
+                response = session.get(self.gateway_url(target, f'/ipfs/{cid}'), params=params,
+                                       timeout=self.test_config['timeout'], stream=True)
+                with response:
+                    if response.status_code != 200:
+                        return {
+                            'success': False,
+                            'error': f"HTTP {response.status_code}",
+                            'download_time': (time.perf_counter_ns() - start_ns) / 1e9,
+                            'connect_time': connect_time()
+                        }
+                    response.raw.decode_content = True
+                    while True:
+                        n = response.raw.readinto(buffer)
+                        if not n:
+                            break
+                        if first_byte_ns is None:
+                            first_byte_ns = time.perf_counter_ns()
+                        digest.update(view[:n])
+                        received += n
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'download_time': (time.perf_counter_ns() - start_ns) / 1e9,
+                'connect_time': connect_time()
+            }
+
+        download_time = (time.perf_counter_ns() - start_ns) / 1e9
+        error = gateway_mismatch(path, received, expected_size, digest.hexdigest(), expected_sha256)
+        return {
+            'success': error is None,
+            'size': received,
+            'size_match': error is None if path == 'gateway' else None,
+            'download_time': download_time,
+            'ttfb': (first_byte_ns - start_ns) / 1e9 if first_byte_ns is not None else None,
+            'connect_time': connect_time(),
+            'throughput': received / download_time if download_time > 0 else 0,
+            'error': error
+        }
+
+    def fetch_paths(self, scenario: Dict, ipfs_hash: str, upload_target: Dict[str, Any],
+                    download_target: Dict[str, Any], expected_size: int,
+                    expected_sha256: Optional[str], cache_mode: Optional[str]) -> Dict[str, Any]:
+        """Download a CID again over each extra path, as <path>_* result fields
+
+        Each path starts from a node the CID was evicted from, unless the
+        cache mode is "warm"; <path>_cache records the state it started in
+        ("cold", "warm", or "cold-failed" if the eviction failed).
+        """
+        fields: Dict[str, Any] = {}
+        for path in self.extra_paths_for(scenario):
+            blocks = None
+            cache = 'warm' if cache_mode == 'warm' else 'cold'
+            try:
+                if cache == 'cold':
+                    self.evict(ipfs_hash, download_target)
+            except requests.RequestException as e:
+                print(f"      Warning: could not evict {ipfs_hash} before the {path} download: {e}")
+                cache = 'cold-failed'
+            try:
+                if path == 'raw':
+                    # The uploader holds the whole DAG, so listing it there
+                    # neither counts as download time nor warms the downloader
+                    blocks = self.dag_blocks(ipfs_hash, upload_target)
+            except requests.RequestException as e:
+                print(f"      Warning: could not list the blocks of {ipfs_hash}: {e}")
+            result = self.gateway_download(ipfs_hash, download_target, path, expected_size,
+                                           expected_sha256, blocks)
+            result['cache'] = cache
+            fields.update(path_fields(path, result))
+        return fields
+
+    def download_file(self, ipfs_hash: str, target: Dict[str, Any], expected_size: int,
+                      expected_sha256: Optional[str] = None) -> Dict[str, Any]:
+        """Download a file from IPFS and measure performance
+
+        The body is streamed into a single reusable buffer and hashed on the
+        fly, so memory stays flat regardless of object size.
+        """
+        session = self.session_for(target)
+        reset_connect_time()
+        start_ns = time.perf_counter_ns()
+        timeline = self.new_timeline(start_ns)
 
         try:
             # Download from IPFS
-            response = requests.post(
-                f'http://localhost:{api_port}/api/v0/cat',
+            response = session.post(
+                self.api_url(target, '/api/v0/cat'),
                 params={'arg': ipfs_hash},
                 timeout=self.test_config['timeout'],
                 stream=True
@@ -128,45 +2114,157 @@ class IPFSBandwidthTester:
 
             if response.status_code == 200:
                 # Read content to measure actual download time
-                content = b''
-                for chunk in response.iter_content(chunk_size=8192):
-                    content += chunk
-
-                download_time = time.time() - start_time
+                digest = hashlib.sha256()
+                buffer = bytearray(self.download_chunk_size)
+                view = memoryview(buffer)
+                response.raw.decode_content = True
+                with response:
+                    while True:
+                        n = response.raw.readinto(buffer)
+                        if not n:
+                            break
+                        digest.update(view[:n])
+                        timeline.add(n)
+
+                download_time = (time.perf_counter_ns() - start_ns) / 1e9
+                received = timeline.total
+                sha256 = digest.hexdigest()
+
+                size_match = received == expected_size
+                if expected_sha256 is not None:
+                    size_match = size_match and sha256 == expected_sha256
 
                 return {
                     'success': True,
-                    'size': len(content),
-                    'size_match': len(content) == expected_size,
+                    'size': received,
+                    'sha256': sha256,
+                    'size_match': size_match,
                     'download_time': download_time,
-                    'throughput': len(content) / download_time if download_time > 0 else 0
+                    'ttfb': timeline.elapsed(timeline.first_byte_ns),
+                    'ttlb': timeline.elapsed(timeline.last_byte_ns),
+                    'timeline': timeline.finish(),
+                    'connect_time': connect_time(),
+                    'throughput': received / download_time if download_time > 0 else 0
                 }
             else:
                 return {
                     'success': False,
                     'error': f"HTTP {response.status_code}",
-                    'download_time': time.time() - start_time
+                    'download_time': (time.perf_counter_ns() - start_ns) / 1e9,
+                    'connect_time': connect_time()
                 }
 
         except Exception as e:
             return {
                 'success': False,
                 'error': str(e),
-                'download_time': time.time() - start_time
+                'download_time': (time.perf_counter_ns() - start_ns) / 1e9,
+                'connect_time': connect_time()
             }
 
-    def run_single_test(self, file_info: Dict, scenario: Dict, iteration: int) -> Dict:
-        """Run a single test iteration"""
-        filepath = f"{self.test_config['testDirectory']}/{file_info['filename']}"
-        upload_target = next(t for t in self.targets if t['role'] == 'upload')
-        download_target = next(t for t in self.targets if t['role'] == 'download')
+    def default_pair(self, targets: Optional[List[Dict]] = None) -> Tuple[Dict, Dict]:
+        """The (upload, download) targets chosen by role (default: first group)"""
+        targets = targets or self.groups[0]['targets']
+        return (next(t for t in targets if t['role'] == 'upload'),
+                next(t for t in targets if t['role'] == 'download'))
+
+    def run_single_test(self, file_info: Dict, scenario: Dict, iteration: int,
+                        upload_target: Optional[Dict] = None,
+                        download_target: Optional[Dict] = None) -> Dict:
+        """Run a single test iteration (between the role targets by default)
+
+        With repo hygiene enabled the iteration first waits for any GC on
+        its nodes, and its CID is handed to the hygiene worker afterwards.
+        """
+        if upload_target is None or download_target is None:
+            upload_target, download_target = self.default_pair()
+        if self.hygiene is None:
+            return self._run_pipeline(file_info, scenario, iteration, upload_target, download_target)
+
+        pair = (upload_target, download_target)
+        ticket = self.hygiene.begin(pair)
+        try:
+            result = self._run_pipeline(file_info, scenario, iteration, upload_target, download_target)
+        finally:
+            self.hygiene.end(pair)
+        return self.hygiene.finish(result, pair, ticket)
 
+    def _run_pipeline(self, file_info: Dict, scenario: Dict, iteration: int,
+                      upload_target: Dict, download_target: Dict) -> Dict:
+        filepath = f"{self.test_config['testDirectory']}/{file_info['filename']}"
         print(f"    Iteration {iteration + 1}/{self.test_config['iterations']}: {file_info['filename']}")
 
         # Upload file
-        upload_result = self.upload_file(filepath, upload_target['apiPort'])
+        upload_result = self.upload_file(filepath, upload_target, file_info['sizeBytes'],
+                                         self.import_params_for(scenario))
 
+        group = self.group_of.get(upload_target['container'])
         if not upload_result['success']:
+            return self.build_result(file_info, scenario, iteration, upload_result, group=group)
+
+        # Put the download node's blockstore in the requested cache state
+        cache_mode = self.cache_mode_for(scenario)
+        cache_prep_time = None
+        try:
+            if cache_mode == 'cold':
+                cache_prep_time = self.evict(upload_result['hash'], download_target)
+        except requests.RequestException as e:
+            # The CID may still be cached: keep the download out of the cold stats
+            print(f"      Warning: could not evict {upload_result['hash']}: {e}")
+            cache_mode = 'cold-failed'
+
+        # Wait until the content is reachable from the download node
+        propagation_wait, propagation_ready = self.wait_for_propagation(
+            upload_result['hash'], upload_target, download_target
+        )
+
+        try:
+            if cache_mode == 'warm':
+                cache_prep_time = self.prefetch(upload_result['hash'], download_target)
+        except requests.RequestException as e:
+            # The DAG may be only partly cached: keep the download out of the warm stats
+            print(f"      Warning: could not prefetch {upload_result['hash']}: {e}")
+            cache_mode = 'warm-failed'
+
+        # Download file from different node
+        expected_size = upload_result.get('content_size', file_info['sizeBytes'])
+        expected_sha256 = upload_result.get('content_sha256') or self.file_sha256(filepath)
+        download_result = self.download_file(
+            upload_result['hash'],
+            download_target,
+            expected_size,
+            expected_sha256
+        )
+        if download_result['success']:
+            download_result['paths'] = self.fetch_paths(
+                scenario, upload_result['hash'], upload_target, download_target,
+                expected_size, expected_sha256, cache_mode
+            )
+        download_result['propagation_wait'] = propagation_wait
+        download_result['propagation_ready'] = propagation_ready
+        download_result['cache_mode'] = cache_mode
+        download_result['cache_prep_time'] = cache_prep_time
+
+        return self.build_result(file_info, scenario, iteration, upload_result, download_result,
+                                 group=group)
+
+    def build_result(self, file_info: Dict, scenario: Dict, iteration: int,
+                     upload_result: Dict[str, Any],
+                     download_result: Optional[Dict[str, Any]] = None,
+                     group: Optional[str] = None) -> Dict:
+        """Build the result record for one iteration (shared by both engines)
+
+        `group` is the container group that ran it (see testGroups); results
+        are tagged with their import parameter set and base scenario.
+        """
+        import_params = self.import_params_for(scenario)
+        tags = {
+            'base_scenario': scenario.get('baseScenario', scenario['id']),
+            'import_params': import_label(import_params) if import_params else None,
+            'group': group,
+            'shaping_confirmed': self.shaping_confirmed.get(scenario['id'])
+        }
+        if download_result is None:
             return {
                 'iteration': iteration + 1,
                 'file': file_info['filename'],
@@ -175,19 +2273,13 @@ class IPFSBandwidthTester:
                 'success': False,
                 'error': upload_result.get('error', 'Upload failed'),
                 'upload_time': upload_result.get('upload_time', 0),
-                'download_time': 0
+                'download_time': 0,
+                'upload_connect_time': upload_result.get('connect_time', 0),
+                'download_connect_time': 0,
+                'connect_time': upload_result.get('connect_time', 0),
+                **tags
             }
 
-        # Wait a moment for propagation
-        time.sleep(0.5)
-
-        # Download file from different node
-        download_result = self.download_file(
-            upload_result['hash'],
-            download_target['apiPort'],
-            file_info['sizeBytes']
-        )
-
         return {
             'iteration': iteration + 1,
             'file': file_info['filename'],
@@ -202,59 +2294,570 @@ class IPFSBandwidthTester:
             'upload_throughput': upload_result.get('throughput', 0),
             'download_throughput': download_result.get('throughput', 0),
             'total_time': upload_result['upload_time'] + download_result['download_time'],
+            'upload_connect_time': upload_result.get('connect_time', 0),
+            'download_connect_time': download_result.get('connect_time', 0),
+            'connect_time': upload_result.get('connect_time', 0) + download_result.get('connect_time', 0),
+            'upload_send_time': upload_result.get('send_time'),
+            'upload_ttfb': upload_result.get('ttfb'),
+            'upload_timeline': upload_result.get('timeline', []),
+            'download_ttfb': download_result.get('ttfb'),
+            'download_ttlb': download_result.get('ttlb'),
+            'download_timeline': download_result.get('timeline', []),
             'size_match': download_result.get('size_match', False),
-            'error': download_result.get('error', None)
+            'propagation_wait': download_result.get('propagation_wait'),
+            'propagation_ready': download_result.get('propagation_ready'),
+            'cache_mode': download_result.get('cache_mode'),
+            'cache_prep_time': download_result.get('cache_prep_time'),
+            **self.upload_decomposition(scenario, file_info, upload_result['upload_time']),
+            **download_result.get('paths', {}),
+            'error': download_result.get('error', None),
+            **tags
+        }
+
+    def upload_decomposition(self, scenario: Dict, file_info: Dict,
+                             upload_time: float) -> Dict[str, Optional[float]]:
+        """Split an upload into hashing, local import and network time
+
+        Uses the (scenario, file) baseline; everything the loopback add did
+        not account for is attributed to the network. All None without a
+        baseline.
+        """
+        baseline = self.baselines.get((scenario['id'], file_info['filename']))
+        if baseline is None:
+            return {'upload_hash_time': None, 'upload_import_time': None, 'upload_network_time': None}
+        return {
+            'upload_hash_time': baseline['hash_time'],
+            'upload_import_time': baseline['import_time'],
+            'upload_network_time': max(0.0, upload_time - baseline['loopback_time']),
+        }
+
+    def open_output(self):
+        """Open the streaming result output (the journal, or the spool of an .npz store)"""
+        reporting = self.config.get('reporting', {})
+        if self.result_format == 'json' or self.journal is not None:
+            return
+        self.journal = ResultJournal(
+            spool_path(self.result_file) if self.result_format == 'npz' else self.result_file,
+            flush_every=reporting.get('flushEvery', 50),
+            flush_interval=reporting.get('flushIntervalSeconds', 5.0),
+        )
+        self.journal.append({
+            'config': self.config,
+            'engine': self.engine,
+            'payload_nonce': self._payload_nonce,
+            'timestamp': datetime.now().isoformat()
+        }, kind='resume' if self.resumed_from else 'header')
+
+    def resume_from(self, path: str):
+        """Continue an interrupted run recorded in `path`
+
+        Successful (scenario, file, iteration) results are replayed into the
+        summaries and skipped when the scenarios run again; failed ones are
+        retried. Concurrency levels, open-loop runs and pair matrices are
+        single measurements, so they are kept only if their summary record
+        was written and rerun in full otherwise; the partial results of such
+        a run are removed from the file, so they are not counted next to the
+        rerun. New results are appended to the same file, after cutting off
+        any record torn by the interruption.
+
+        An .npz store resumes through its spool journal: a finished store
+        is first copied into a fresh spool, and a run that crashed before
+        building its store is resumed from the spool it left behind.
+        """
+        self.result_file = path
+        if is_store(path):
+            spool = spool_path(path)
+            if not spool.exists():
+                spool_store(path, spool)
+            else:
+                print(f"Resuming from {spool}, left by an interrupted run")
+            path = str(spool)
+        if is_spool(path):
+            self.result_file = str(spooled_store(path))
+        if is_journal(path):
+            levels = list(iter_journal(path, 'concurrency_level'))
+            open_loops = list(iter_journal(path, 'open_loop'))
+            matrices = list(iter_journal(path, 'pair_matrix'))
+            baselines = list(iter_journal(path, 'baseline'))
+            self.result_format = 'npz' if is_spool(path) else 'ndjson'
+        else:
+            with open(path, 'r') as f:
+                previous = json.load(f)
+            levels = previous.get('concurrency_level', [])
+            open_loops = previous.get('open_loop', [])
+            matrices = previous.get('pair_matrix', [])
+            baselines = previous.get('baseline', [])
+            self.result_format = 'json'
+        self.resumed_from = path
+
+        self.completed_levels = {(l['scenario'], l['file'], l['concurrency']) for l in levels}
+        self.completed_open_loops = {(r['scenario'], r['file']) for r in open_loops}
+        self.completed_matrices = {(m['scenario'], m['file']) for m in matrices}
+        self.concurrency_results.extend(levels)
+        self.open_loop_results.extend(open_loops)
+        self.pair_matrix_results.extend(matrices)
+        self.baselines.update({(b['scenario'], b['file']): b for b in baselines})
+
+        replayed = []
+        superseded = 0
+        for result in iter_results(path):
+            if self.is_superseded(result):
+                superseded += 1
+                continue
+            if self.result_format == 'json':
+                self.results.append(result)
+            if 'upload_node' in result or 'concurrency' in result or 'intended_start' in result:
+                replayed.append(result)
+            elif result['success']:
+                # Results number iterations from 1
+                self.completed.add((result['scenario'], result['file'], result['iteration'] - 1))
+                replayed.append(result)
+
+        if is_journal(path):
+            if superseded:
+                rewrite_journal(path, lambda kind, record: kind != 'result'
+                                or not self.is_superseded(record))
+            else:
+                repair_journal(path)
+        self.record_results(replayed)
+        print(f"Resuming {path}: {len(replayed)} results carried over"
+              + (f" ({superseded} from incomplete runs discarded)" if superseded else "") + ", "
+              f"{len(self.completed_levels)} concurrency levels, "
+              f"{len(self.completed_open_loops)} open-loop runs and "
+              f"{len(self.completed_matrices)} pair matrices complete")
+
+    def is_superseded(self, result: Dict) -> bool:
+        """Whether a resumed result belongs to a run that has to be redone
+
+        True for results of pair matrices, concurrency levels and open-loop
+        runs whose summary record was never written.
+        """
+        if 'upload_node' in result:
+            return (result['scenario'], result['file']) not in self.completed_matrices
+        if 'concurrency' in result:
+            return (result['scenario'], result['file'], result['concurrency']) not in self.completed_levels
+        if 'intended_start' in result:
+            return (result['scenario'], result['file']) not in self.completed_open_loops
+        return False
+
+    def pending_iterations(self, file_info: Dict, scenario: Dict) -> List[int]:
+        """Iterations of a file still to run in this scenario"""
+        return [
+            i for i in range(self.test_config['iterations'])
+            if (scenario['id'], file_info['filename'], i) not in self.completed
+        ]
+
+    def has_pending_work(self, scenario: Dict) -> bool:
+        for file_info in self.test_files:
+            if scenario.get('pairMatrix'):
+                if (scenario['id'], file_info['filename']) not in self.completed_matrices:
+                    return True
+            elif scenario.get('openLoop'):
+                if (scenario['id'], file_info['filename']) not in self.completed_open_loops:
+                    return True
+            elif scenario.get('concurrency'):
+                if any((scenario['id'], file_info['filename'], workers) not in self.completed_levels
+                       for workers in scenario['concurrency']):
+                    return True
+            elif self.pending_iterations(file_info, scenario):
+                return True
+        return False
+
+    def emit_result(self, result: Dict):
+        """Journal a result as soon as its iteration finishes"""
+        if self.journal is not None:
+            self.journal.append(result)
+
+    def record_results(self, results: List[Dict]):
+        """Fold a batch of finished results into the summary histograms
+
+        The batch is aggregated into its own histograms first and then
+        merged, so batches produced by separate workers combine cheaply.
+        """
+        with self._results_lock:
+            self._record_results_locked(results)
+
+    def _record_results_locked(self, results: List[Dict]):
+        batches: Dict[Tuple[str, str], List[Dict]] = {}
+        for result in results:
+            key = (result['scenario'], result['file'])
+            batches.setdefault(key, []).append(result)
+
+            counts = self.result_counts.setdefault(key, {'total': 0, 'successful': 0})
+            counts['total'] += 1
+            if result['success']:
+                counts['successful'] += 1
+                if result.get('cache_mode') in ('cold', 'warm'):
+                    self.cache_histograms.setdefault(
+                        (*key, result['cache_mode']), LogHistogram()
+                    ).record(result['download_time'])
+
+                # The RPC download, side by side with the extra paths that
+                # succeeded from a known cache state
+                paths = [path for path in DOWNLOAD_PATHS[1:] if result.get(f'{path}_success')
+                         and result.get(f'{path}_cache') != 'cold-failed']
+                if paths:
+                    self._record_path(key, 'rpc', result['download_throughput'], result.get('download_ttfb'))
+                for path in paths:
+                    self._record_path(key, path, result[f'{path}_throughput'], result[f'{path}_ttfb'])
+
+        metrics = list(HISTOGRAM_METRICS.values())
+        for key, batch in batches.items():
+            batch_histograms = build_histograms([r for r in batch if r['success']], metrics)
+            histograms = self.histograms.setdefault(
+                key, {metric: LogHistogram() for metric in metrics}
+            )
+            for metric, histogram in batch_histograms.items():
+                histograms[metric].merge(histogram)
+
+    def _record_path(self, key: Tuple[str, str], path: str, throughput: float,
+                     ttfb: Optional[float]):
+        histograms = self.path_histograms.setdefault(
+            (*key, path), {'throughput': LogHistogram(), 'ttfb': LogHistogram()}
+        )
+        histograms['throughput'].record(throughput)
+        if ttfb is not None:
+            histograms['ttfb'].record(ttfb)
+
+    def run_concurrency_level(self, file_info: Dict, scenario: Dict, workers: int,
+                              pair: Optional[Tuple[Dict, Dict]] = None) -> List[Dict]:
+        """Run `workers` simultaneous upload→download pipelines for one file
+
+        Each worker performs `iterations` pipelines, so a level issues
+        workers × iterations operations in total. `pair` is the (upload,
+        download) target pair (default: by role).
+        """
+        pair = pair or self.default_pair()
+        total = workers * self.test_config['iterations']
+        print(f"\n    Concurrency {workers}: {total} pipelines")
+
+        start_time = time.perf_counter()
+        if self.async_engine is not None:
+            level_results = self.async_engine.run_iterations(
+                file_info, scenario, range(total), in_flight=workers,
+                tags={'concurrency': workers}, pair=pair
+            )
+        else:
+            def pipeline(iteration: int) -> Dict:
+                result = self.run_single_test(file_info, scenario, iteration, *pair)
+                result['concurrency'] = workers
+                self.emit_result(result)
+                return result
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(pipeline, i) for i in range(total)]
+                level_results = [f.result() for f in futures]
+        wall_time = time.perf_counter() - start_time
+
+        level_summary = self.summarize_concurrency_level(
+            file_info, scenario, workers, level_results, wall_time
+        )
+        with self._results_lock:
+            self.concurrency_results.append(level_summary)
+        if self.journal is not None:
+            self.journal.append(level_summary, kind='concurrency_level')
+
+        print(f"      {level_summary['ops_per_second']:.2f} ops/s, "
+              f"↑{level_summary['aggregate_upload_throughput'] * 8 / 1_000_000:.1f} Mbps, "
+              f"↓{level_summary['aggregate_download_throughput'] * 8 / 1_000_000:.1f} Mbps, "
+              f"error rate {level_summary['error_rate'] * 100:.1f}%")
+        latency = level_summary['total_latency']
+        print(f"      Latency p50/p95/p99: {latency['p50']:.2f}s / "
+              f"{latency['p95']:.2f}s / {latency['p99']:.2f}s")
+
+        return level_results
+
+    def run_open_loop(self, file_info: Dict, scenario: Dict,
+                      pair: Optional[Tuple[Dict, Dict]] = None) -> List[Dict]:
+        """Start pipelines at a fixed arrival rate, independent of completions
+
+        Configured by the scenario's openLoop entry: rate (ops/s), arrival
+        ("constant" or "poisson"), operations (default: iterations), seed and
+        maxWorkers. Latency is measured from each operation's intended start,
+        so queueing delay on a slow node shows up instead of being hidden by
+        the closed loop; total_time therefore includes any wait before the
+        operation could be sent. achieved_rate is taken over the arrival
+        window; completion_rate over the whole run, drain included. `pair` is
+        the (upload, download) target pair (default: by role).
+        """
+        pair = pair or self.default_pair()
+        open_loop = scenario['openLoop']
+        rate = open_loop['rate']
+        count = open_loop.get('operations', self.test_config['iterations'])
+        arrival = open_loop.get('arrival', 'constant')
+        max_workers = open_loop.get('maxWorkers', max(self.max_concurrency, 64))
+        offsets = arrival_offsets(rate, count, arrival, open_loop.get('seed'))
+
+        print(f"\n    Open loop: {count} operations at {rate} ops/s ({arrival} arrivals)")
+
+        start_time = time.perf_counter()
+        if self.async_engine is not None:
+            file_results = self.async_engine.run_iterations(
+                file_info, scenario, range(count), in_flight=max_workers, offsets=offsets,
+                pair=pair
+            )
+        else:
+            origin_perf = time.perf_counter()
+            origin_wall = time.time()
+
+            def scheduled(iteration: int) -> Dict:
+                result = self.run_single_test(file_info, scenario, iteration, *pair)
+                result['intended_start'] = origin_wall + offsets[iteration]
+                result['total_time'] = time.perf_counter() - (origin_perf + offsets[iteration])
+                self.emit_result(result)
+                return result
+
+            futures = []
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                for i, offset in enumerate(offsets):
+                    delay = origin_perf + offset - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    futures.append(pool.submit(scheduled, i))
+                file_results = [f.result() for f in futures]
+        wall_time = time.perf_counter() - start_time
+
+        successful = [r for r in file_results if r['success']]
+        latency = build_histograms(successful, ['total_time'])['total_time']
+        # Rate over the arrival window (first to last scheduled start), so the
+        # drain of the last operations does not bias it low; count arrivals
+        # span count - 1 gaps
+        span = offsets[-1] - offsets[0] if count > 1 else 0
+        if span > 0:
+            achieved_rate = len(successful) / count * (count - 1) / span
+        else:
+            achieved_rate = len(successful) / wall_time if wall_time > 0 else 0
+        summary = {
+            'scenario': scenario['id'],
+            'bandwidth': scenario['bandwidth'],
+            'file': file_info['filename'],
+            'fileSize': file_info['sizeBytes'],
+            'arrival': arrival,
+            'operations': count,
+            'offered_rate': rate,
+            'achieved_rate': achieved_rate,
+            'completion_rate': len(successful) / wall_time if wall_time > 0 else 0,
+            'errors': count - len(successful),
+            'error_rate': (count - len(successful)) / count if count else 0,
+            'wall_time': wall_time,
+            'latency': latency_percentiles(latency),
         }
+        with self._results_lock:
+            self.open_loop_results.append(summary)
+        if self.journal is not None:
+            self.journal.append(summary, kind='open_loop')
+
+        print(f"      Offered {rate:.2f} ops/s, achieved {summary['achieved_rate']:.2f} ops/s "
+              f"({summary['completion_rate']:.2f} ops/s including drain), "
+              f"error rate {summary['error_rate'] * 100:.1f}%")
+        print(f"      Latency from intended start p50/p95/p99: {summary['latency']['p50']:.2f}s / "
+              f"{summary['latency']['p95']:.2f}s / {summary['latency']['p99']:.2f}s")
+
+        return file_results
+
+    def run_pair_matrix(self, file_info: Dict, scenario: Dict,
+                        targets: Optional[List[Dict]] = None) -> List[Dict]:
+        """Measure every (uploader, downloader) pair among the test targets
+
+        Configured by the scenario's pairMatrix entry: `true`, or an object
+        with nodes (container names, default: every target of `targets`,
+        which defaults to the first group's) and
+        iterations per pair (default: the test iterations). Pairs run in
+        rounds of disjoint pairs (see pair_rounds), each round in parallel,
+        so n nodes take 2(n-1) rounds, with n rounded up to even, instead of
+        n(n-1) sequential pairs. Needs "prefix" or "prng" payloads, so each
+        pair downloads content only its uploader holds. Results are tagged
+        with upload_node/download_node.
+        """
+        matrix_config = scenario['pairMatrix'] if isinstance(scenario['pairMatrix'], dict) else {}
+        by_container = {t['container']: t for t in targets or self.groups[0]['targets']}
+        names = matrix_config.get('nodes') or list(by_container)
+        missing = [name for name in names if name not in by_container]
+        if missing:
+            raise ValueError(f"Pair matrix nodes {missing} are not in the scenario's container group")
+        iterations = matrix_config.get('iterations', self.test_config['iterations'])
+        rounds = pair_rounds([by_container[name] for name in names])
+
+        print(f"\n    Pair matrix: {len(names)} nodes, {len(names) * (len(names) - 1)} pairs "
+              f"in {len(rounds)} rounds, {iterations} iterations each")
+
+        def measure(upload_target: Dict, download_target: Dict) -> List[Dict]:
+            tags = {'upload_node': upload_target['container'],
+                    'download_node': download_target['container']}
+            if self.async_engine is not None:
+                return self.async_engine.run_iterations(
+                    file_info, scenario, range(iterations), in_flight=1, tags=tags,
+                    pair=(upload_target, download_target)
+                )
+            pair_results = []
+            for i in range(iterations):
+                result = self.run_single_test(file_info, scenario, i, upload_target, download_target)
+                result.update(tags)
+                self.emit_result(result)
+                pair_results.append(result)
+            return pair_results
+
+        file_results = []
+        for number, pairs in enumerate(rounds, 1):
+            print(f"\n    Round {number}/{len(rounds)}: "
+                  + ", ".join(f"{up['container']}→{down['container']}" for up, down in pairs))
+            with ThreadPoolExecutor(max_workers=len(pairs)) as pool:
+                for pair_results in pool.map(lambda pair: measure(*pair), pairs):
+                    file_results.extend(pair_results)
+
+        matrix = self.summarize_pair_matrix(file_info, scenario, names, file_results)
+        with self._results_lock:
+            self.pair_matrix_results.append(matrix)
+        if self.journal is not None:
+            self.journal.append(matrix, kind='pair_matrix')
+
+        print(f"\n    Median download throughput (Mbps), rows upload → columns download:")
+        print("      " + " " * 14 + "".join(f"{name[-12:]:>13}" for name in names))
+        for name, row in zip(names, matrix['download_throughput']):
+            cells = "".join(f"{'—' if v is None else f'{v * 8 / 1_000_000:.1f}':>13}" for v in row)
+            print(f"      {name[-14:]:<14}{cells}")
+
+        return file_results
+
+    def summarize_pair_matrix(self, file_info: Dict, scenario: Dict, names: List[str],
+                              results: List[Dict]) -> Dict:
+        """Per-pair medians and error rates as node × node matrices
+
+        Rows are uploaders and columns downloaders, in `names` order; cells
+        with no measurement (the diagonal) are None.
+        """
+        by_pair: Dict[Tuple[str, str], List[Dict]] = {}
+        for result in results:
+            by_pair.setdefault((result['upload_node'], result['download_node']), []).append(result)
+
+        metrics = ['upload_throughput', 'download_throughput', 'total_time']
+        cells: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for pair, pair_results in by_pair.items():
+            successful = [r for r in pair_results if r['success']]
+            histograms = build_histograms(successful, metrics)
+            cells[pair] = {
+                'upload_throughput': histograms['upload_throughput'].quantile(0.5) if successful else None,
+                'download_throughput': histograms['download_throughput'].quantile(0.5) if successful else None,
+                'total_latency_p50': histograms['total_time'].quantile(0.5) if successful else None,
+                'total_latency_p95': histograms['total_time'].quantile(0.95) if successful else None,
+                'error_rate': (len(pair_results) - len(successful)) / len(pair_results),
+            }
 
-    def calculate_statistics(self, values: List[float]) -> Dict[str, float]:
-        """Calculate statistics for a list of values"""
-        if not values:
-            return {}
+        def matrix(key: str) -> List[List[Optional[float]]]:
+            return [[cells.get((up, down), {}).get(key) for down in names] for up in names]
 
-        sorted_values = sorted(values)
+        return {
+            'scenario': scenario['id'],
+            'bandwidth': scenario['bandwidth'],
+            'file': file_info['filename'],
+            'fileSize': file_info['sizeBytes'],
+            'nodes': names,
+            'operations': len(results),
+            **{key: matrix(key) for key in ('upload_throughput', 'download_throughput',
+                                            'total_latency_p50', 'total_latency_p95', 'error_rate')},
+        }
+
+    def summarize_concurrency_level(self, file_info: Dict, scenario: Dict, workers: int,
+                                    results: List[Dict], wall_time: float) -> Dict:
+        """Aggregate throughput, latency percentiles and error rate for one level"""
+        successful = [r for r in results if r['success']]
+        uploaded = [r for r in results if r.get('ipfs_hash')]
+        upload = build_histograms(uploaded, ['upload_time'])['upload_time']
+        download = build_histograms(successful, ['download_time', 'total_time'])
 
         return {
-            'mean': statistics.mean(values),
-            'median': statistics.median(values),
-            'min': min(values),
-            'max': max(values),
-            'stddev': statistics.stdev(values) if len(values) > 1 else 0,
-            'p95': sorted_values[int(len(sorted_values) * 0.95)] if len(values) > 1 else values[0],
-            'p99': sorted_values[int(len(sorted_values) * 0.99)] if len(values) > 1 else values[0],
-            'count': len(values)
+            'scenario': scenario['id'],
+            'bandwidth': scenario['bandwidth'],
+            'file': file_info['filename'],
+            'fileSize': file_info['sizeBytes'],
+            'concurrency': workers,
+            'operations': len(results),
+            'errors': len(results) - len(successful),
+            'error_rate': (len(results) - len(successful)) / len(results) if results else 0,
+            'wall_time': wall_time,
+            'ops_per_second': len(successful) / wall_time if wall_time > 0 else 0,
+            'aggregate_upload_throughput':
+                len(uploaded) * file_info['sizeBytes'] / wall_time if wall_time > 0 else 0,
+            'aggregate_download_throughput':
+                len(successful) * file_info['sizeBytes'] / wall_time if wall_time > 0 else 0,
+            'upload_latency': latency_percentiles(upload),
+            'download_latency': latency_percentiles(download['download_time']),
+            'total_latency': latency_percentiles(download['total_time']),
         }
 
-    def run_scenario_tests(self, scenario: Dict) -> List[Dict]:
-        """Run all tests for a specific scenario"""
+    def run_scenario_tests(self, scenario: Dict, group: Optional[Dict] = None) -> List[Dict]:
+        """Run all tests for a specific scenario on one container group"""
+        group = group or self.groups[0]
+        pair = self.default_pair(group['targets'])
         print(f"\n{'='*60}")
-        print(f"Running scenario: {scenario['name']}")
+        if len(self.groups) > 1:
+            print(f"Running scenario: {scenario['name']} on group {group['name']}")
+        else:
+            print(f"Running scenario: {scenario['name']}")
         print(f"Description: {scenario['description']}")
         print(f"{'='*60}")
 
         scenario_results = []
-
-        # Apply bandwidth limits to all target containers
-        for target in self.targets:
-            if not self.apply_bandwidth_limit(scenario, target['container']):
-                print(f"Failed to apply bandwidth limit to {target['container']}")
-                return scenario_results
+        if not self.has_pending_work(scenario):
+            print("  Already completed in the resumed run, skipping")
+            return scenario_results
+
+        with self._results_lock:
+            self.scenario_groups[scenario['id']] = group['name']
+
+        # Apply bandwidth limits to the group's containers
+        applied = self.shape_targets(scenario, group['targets'], 'apply')
+        failed = [container for container, outcome in applied.items() if outcome == 'failed']
+        if failed:
+            print(f"Failed to apply bandwidth limit to {', '.join(failed)}")
+            self.shape_targets(scenario, group['targets'], 'remove')
+            return scenario_results
+        unconfirmed = [container for container, outcome in applied.items() if outcome != 'confirmed']
+        if unconfirmed:
+            print(f"  WARNING: bandwidth limit not confirmed on {', '.join(unconfirmed)}; "
+                  f"results are tagged shaping_confirmed=false")
+        with self._results_lock:
+            self.shaping_confirmed[scenario['id']] = not unconfirmed
 
         # Run tests for each file
         for file_info in self.test_files:
             print(f"\n  Testing file: {file_info['filename']} ({file_info['size']})")
+            if (self.baseline_config['enabled']
+                    and (scenario['id'], file_info['filename']) not in self.baselines):
+                self.run_baseline(file_info, scenario, pair[0])
 
             file_results = []
-            for i in range(self.test_config['iterations']):
-                result = self.run_single_test(file_info, scenario, i)
-                file_results.append(result)
-
-                # Progress indicator every 10 iterations
-                if (i + 1) % 10 == 0:
-                    successful = sum(1 for r in file_results if r['success'])
-                    print(f"      Progress: {i + 1}/{self.test_config['iterations']} "
-                          f"(Success rate: {successful}/{i + 1})")
+            pending = self.pending_iterations(file_info, scenario)
+            if scenario.get('pairMatrix'):
+                if (scenario['id'], file_info['filename']) not in self.completed_matrices:
+                    file_results = self.run_pair_matrix(file_info, scenario, group['targets'])
+            elif scenario.get('openLoop'):
+                if (scenario['id'], file_info['filename']) not in self.completed_open_loops:
+                    file_results = self.run_open_loop(file_info, scenario, pair)
+            elif scenario.get('concurrency'):
+                for workers in scenario['concurrency']:
+                    if (scenario['id'], file_info['filename'], workers) in self.completed_levels:
+                        print(f"\n    Concurrency {workers}: already completed, skipping")
+                        continue
+                    file_results.extend(self.run_concurrency_level(file_info, scenario, workers, pair))
+            elif self.async_engine is not None:
+                file_results = self.async_engine.run_iterations(file_info, scenario, pending, pair=pair)
+            else:
+                if len(pending) < self.test_config['iterations']:
+                    print(f"    Resuming: {len(pending)}/{self.test_config['iterations']} iterations left")
+                for i in pending:
+                    result = self.run_single_test(file_info, scenario, i, *pair)
+                    self.emit_result(result)
+                    file_results.append(result)
+
+                    # Progress indicator every 10 iterations
+                    if (i + 1) % 10 == 0:
+                        successful = sum(1 for r in file_results if r['success'])
+                        print(f"      Progress: {i + 1}/{self.test_config['iterations']} "
+                              f"(Success rate: {successful}/{len(file_results)})")
 
             scenario_results.extend(file_results)
+            self.record_results(file_results)
 
             # Calculate and display file statistics
             successful_results = [r for r in file_results if r['success']]
@@ -268,8 +2871,11 @@ class IPFSBandwidthTester:
                 print(f"      Avg download time: {statistics.mean(download_times):.2f}s")
 
         # Remove bandwidth limits
-        for target in self.targets:
-            self.remove_bandwidth_limit(target['container'])
+        self.shape_targets(scenario, group['targets'], 'remove')
+
+        # Collect this scenario's content while the group sets up the next one
+        if self.hygiene is not None:
+            self.hygiene.flush(group['targets'])
 
         return scenario_results
 
@@ -282,7 +2888,8 @@ class IPFSBandwidthTester:
                 'timestamp': datetime.now().isoformat(),
                 'total_iterations': self.test_config['iterations'],
                 'files_tested': len(self.test_files),
-                'scenarios_tested': len([s for s in self.scenarios if s['enabled']])
+                'scenarios_tested': len([s for s in self.scenarios if s['enabled']]),
+                'groups': [group['name'] for group in self.groups]
             },
             'scenario_summaries': []
         }
@@ -291,37 +2898,122 @@ class IPFSBandwidthTester:
             if not scenario['enabled']:
                 continue
 
-            scenario_results = [r for r in self.results if r['scenario'] == scenario['id']]
-            if not scenario_results:
+            if not any(key[0] == scenario['id'] for key in self.result_counts):
                 continue
 
             # Group by file
             file_summaries = []
             for file_info in self.test_files:
-                file_results = [r for r in scenario_results if r['file'] == file_info['filename']]
-                successful = [r for r in file_results if r['success']]
-
-                if successful:
-                    file_summary = {
-                        'file': file_info['filename'],
-                        'size': file_info['size'],
-                        'sizeBytes': file_info['sizeBytes'],
-                        'success_rate': len(successful) / len(file_results),
-                        'upload_stats': self.calculate_statistics([r['upload_time'] for r in successful]),
-                        'download_stats': self.calculate_statistics([r['download_time'] for r in successful]),
-                        'upload_throughput_stats': self.calculate_statistics([r['upload_throughput'] for r in successful]),
-                        'download_throughput_stats': self.calculate_statistics([r['download_throughput'] for r in successful])
+                key = (scenario['id'], file_info['filename'])
+                counts = self.result_counts.get(key)
+                if not counts or not counts['successful']:
+                    continue
+
+                histograms = self.histograms[key]
+                file_summary = {
+                    'file': file_info['filename'],
+                    'size': file_info['size'],
+                    'sizeBytes': file_info['sizeBytes'],
+                    'success_rate': counts['successful'] / counts['total'],
+                }
+                for name, metric in HISTOGRAM_METRICS.items():
+                    file_summary[name] = histograms[metric].stats()
+
+                # Download time by cache state, and how much a warm cache saves
+                by_mode = {
+                    mode: self.cache_histograms[(*key, mode)].stats()
+                    for mode in ('cold', 'warm') if (*key, mode) in self.cache_histograms
+                }
+                if by_mode:
+                    file_summary['cache_download_stats'] = by_mode
+                if len(by_mode) == 2 and by_mode['warm']['median'] > 0:
+                    file_summary['warm_speedup'] = by_mode['cold']['median'] / by_mode['warm']['median']
+
+                # Throughput and TTFB of each retrieval path over the same CIDs
+                paths = {
+                    path: {
+                        'throughput_stats': self.path_histograms[(*key, path)]['throughput'].stats(),
+                        'ttfb_stats': self.path_histograms[(*key, path)]['ttfb'].stats(),
                     }
-                    file_summaries.append(file_summary)
+                    for path in DOWNLOAD_PATHS if (*key, path) in self.path_histograms
+                }
+                if paths:
+                    file_summary['download_paths'] = paths
+
+                # Where the median upload's time goes, and which resource bounds it
+                decomposition = self.upload_decomposition(
+                    scenario, file_info, file_summary['upload_stats']['median']
+                )
+                if decomposition['upload_hash_time'] is not None:
+                    cpu_time = decomposition['upload_hash_time'] + decomposition['upload_import_time']
+                    file_summary['upload_decomposition'] = {
+                        'hash_time': decomposition['upload_hash_time'],
+                        'import_time': decomposition['upload_import_time'],
+                        'network_time': decomposition['upload_network_time'],
+                        'bound': 'cpu' if cpu_time >= decomposition['upload_network_time'] else 'network',
+                    }
+                file_summaries.append(file_summary)
 
             summary['scenario_summaries'].append({
                 'scenario': scenario['name'],
                 'bandwidth': scenario['bandwidth'],
+                'group': self.scenario_groups.get(scenario['id']),
                 'file_summaries': file_summaries
             })
 
+        rankings = self.rank_import_params()
+        if rankings:
+            summary['import_rankings'] = rankings
+
         return summary
 
+    def rank_import_params(self) -> List[Dict]:
+        """Rank the import parameter sets of each swept scenario, per file
+
+        Throughput is the file size over the median upload/download time, so
+        parameter sets that change the encoded DAG size (raw-leaves,
+        trickle, chunker) are compared on the same content bytes.
+        Configurations are ordered by upload throughput and carry their rank
+        in both directions.
+        """
+        variants: Dict[str, List[Dict]] = {}
+        for scenario in self.scenarios:
+            if scenario['enabled'] and 'baseScenario' in scenario:
+                variants.setdefault(scenario['baseScenario'], []).append(scenario)
+
+        rankings = []
+        for base, scenarios in variants.items():
+            for file_info in self.test_files:
+                configurations = []
+                for scenario in scenarios:
+                    key = (scenario['id'], file_info['filename'])
+                    counts = self.result_counts.get(key)
+                    if not counts or not counts['successful']:
+                        continue
+                    upload_time = self.histograms[key]['upload_time'].quantile(0.5)
+                    download_time = self.histograms[key]['download_time'].quantile(0.5)
+                    configurations.append({
+                        'import_params': import_label(self.import_params_for(scenario)),
+                        'upload_throughput': file_info['sizeBytes'] / upload_time if upload_time > 0 else 0,
+                        'download_throughput': file_info['sizeBytes'] / download_time if download_time > 0 else 0,
+                        'success_rate': counts['successful'] / counts['total'],
+                    })
+                if not configurations:
+                    continue
+
+                for direction in ('upload', 'download'):
+                    ordered = sorted(configurations, key=lambda c: c[f'{direction}_throughput'], reverse=True)
+                    for rank, configuration in enumerate(ordered, 1):
+                        configuration[f'{direction}_rank'] = rank
+                configurations.sort(key=lambda c: c['upload_rank'])
+                rankings.append({
+                    'scenario': base,
+                    'file': file_info['filename'],
+                    'sizeBytes': file_info['sizeBytes'],
+                    'configurations': configurations
+                })
+        return rankings
+
     def run_all_tests(self):
         """Run all test scenarios"""
         print(f"\n{'='*60}")
@@ -329,49 +3021,153 @@ class IPFSBandwidthTester:
         print(f"Test files: {len(self.test_files)}")
         print(f"Scenarios: {len([s for s in self.scenarios if s['enabled']])}")
         print(f"Iterations per file: {self.test_config['iterations']}")
+        if len(self.groups) > 1:
+            print(f"Container groups: {', '.join(group['name'] for group in self.groups)}")
         print(f"{'='*60}")
 
         start_time = time.time()
-
-        # Run each enabled scenario
+        self.open_output()
+        if self.hygiene_config['enabled']:
+            self.hygiene = RepoHygiene(self, self.hygiene_config['gcThresholdBytes'])
+
+        # A crashed run may have left its last shaping in place; clear it so
+        # each scenario starts from its own limit
+        if self.resumed_from:
+            self.shape_targets(None, [t for group in self.groups for t in group['targets']], 'remove')
+
+        # Each container group takes the next enabled scenario from a shared
+        # queue as soon as it is free, so scenarios run len(groups) at a time
+        pending: queue.Queue = queue.Queue()
         for scenario in self.scenarios:
             if scenario['enabled']:
-                scenario_results = self.run_scenario_tests(scenario)
-                self.results.extend(scenario_results)
+                pending.put(scenario)
+
+        def group_worker(group: Dict):
+            while True:
+                try:
+                    scenario = pending.get_nowait()
+                except queue.Empty:
+                    return
+                scenario_results = self.run_scenario_tests(scenario, group)
+                with self._results_lock:
+                    if self.result_format == 'json':
+                        self.results.extend(scenario_results)
 
-                # Save intermediate results
-                self.save_results()
+                    # Save intermediate results
+                    self.save_results()
+
+        with ThreadPoolExecutor(max_workers=len(self.groups)) as pool:
+            list(pool.map(group_worker, self.groups))
 
         total_time = time.time() - start_time
+        if self.hygiene is not None:
+            self.hygiene.close()
+        self.close_sessions()
 
         # Generate and save summary
         summary = self.generate_summary()
         summary['test_info']['total_runtime'] = total_time
+        summary['test_info']['shaping_wait'] = sum(entry['wait'] for entry in self.shaping_waits)
 
         # Save final results and summary
-        self.save_results(include_summary=True)
+        self.save_results(summary)
+        if self.journal is not None:
+            self.journal.close()
+        if self.result_format == 'npz':
+            self.finish_store()
 
         print(f"\n{'='*60}")
         print(f"Test completed in {total_time:.2f} seconds")
         print(f"Results saved to: {self.result_file}")
+        if self.result_format != 'json':
+            print(f"Summary saved to: {summary_path(self.result_file)}")
         print(f"{'='*60}")
 
         # Display summary
         self.display_summary(summary)
 
-    def save_results(self, include_summary: bool = False):
-        """Save test results to file"""
-        output = {
-            'config': self.config,
-            'results': self.results,
-            'timestamp': datetime.now().isoformat()
-        }
+    def save_results(self, summary: Optional[Dict] = None):
+        """Save test results to file
 
-        if include_summary:
-            output['summary'] = self.generate_summary()
+        The "json" format rewrites the whole document. NDJSON journals (and
+        the spool of an .npz store, see finish_store) already hold every
+        result, so here they are only flushed. Once the run has a summary it
+        is written as a separate artifact next to the journal or store.
+        """
+        with self._results_lock:
+            self._save_results_locked(summary)
 
-        with open(self.result_file, 'w') as f:
-            json.dump(output, f, indent=2)
+    def _save_results_locked(self, summary: Optional[Dict]):
+        aggregates = {}
+        if self.concurrency_results:
+            aggregates['concurrency_level'] = self.concurrency_results
+
+        if self.open_loop_results:
+            aggregates['open_loop'] = self.open_loop_results
+
+        if self.pair_matrix_results:
+            aggregates['pair_matrix'] = self.pair_matrix_results
+
+        if self.shaping_waits:
+            aggregates['shaping'] = self.shaping_waits
+
+        if self.scenario_setups:
+            aggregates['scenario_setup'] = self.scenario_setups
+
+        if self.hygiene is not None:
+            aggregates['hygiene'] = self.hygiene.records
+
+        if self.baselines:
+            aggregates['baseline'] = list(self.baselines.values())
+
+        aggregates['histograms'] = [
+            {
+                'scenario': scenario_id,
+                'file': filename,
+                **self.result_counts[(scenario_id, filename)],
+                'metrics': {metric: h.to_dict() for metric, h in histograms.items()},
+            }
+            for (scenario_id, filename), histograms in self.histograms.items()
+        ]
+
+        if self.result_format == 'json':
+            output = {
+                'config': self.config,
+                'results': self.results,
+                'timestamp': datetime.now().isoformat(),
+                **aggregates
+            }
+            if summary is not None:
+                output['summary'] = summary
+
+            with open(self.result_file, 'w') as f:
+                json.dump(output, f, indent=2)
+            return
+
+        if self.journal is not None:
+            self.journal.flush()
+        if summary is not None:
+            with open(summary_path(self.result_file), 'w') as f:
+                json.dump({
+                    'config': self.config,
+                    'result_file': Path(self.result_file).name,
+                    'timestamp': datetime.now().isoformat(),
+                    'summary': summary,
+                    **aggregates
+                }, f, indent=2)
+
+    def finish_store(self):
+        """Build the .npz store from the run's spool journal, then drop the spool
+
+        Every record reaches the store through the spool, so it is written
+        once per run instead of after every scenario, and a crash before
+        this point leaves the spool to resume from.
+        """
+        spool = spool_path(self.result_file)
+        compress = self.config.get('reporting', {}).get('compression') is not None
+        build_store(spool, self.result_file, compress=compress,
+                    metadata={'config': self.config, 'timestamp': datetime.now().isoformat()})
+        os.remove(spool)
 
     def display_summary(self, summary: Dict):
         """Display test summary in console"""
@@ -381,6 +3177,8 @@ class IPFSBandwidthTester:
         for scenario_summary in summary['scenario_summaries']:
             print(f"\nScenario: {scenario_summary['scenario']}")
             print(f"Bandwidth: {scenario_summary['bandwidth'] or 'Unlimited'}")
+            if len(self.groups) > 1 and scenario_summary.get('group'):
+                print(f"Group: {scenario_summary['group']}")
             print("-"*40)
 
             for file_summary in scenario_summary['file_summaries']:
@@ -395,9 +3193,134 @@ class IPFSBandwidthTester:
                 avg_upload_mbps = (file_summary['sizeBytes'] * 8 / file_summary['upload_stats']['mean']) / 1_000_000
                 avg_download_mbps = (file_summary['sizeBytes'] * 8 / file_summary['download_stats']['mean']) / 1_000_000
                 print(f"    Throughput: ↑{avg_upload_mbps:.1f} Mbps, ↓{avg_download_mbps:.1f} Mbps")
+                cache_stats = file_summary.get('cache_download_stats', {})
+                if cache_stats:
+                    print("    Download by cache state: " + ", ".join(
+                        f"{mode} {stats['median']:.2f}s (n={stats['count']})"
+                        for mode, stats in cache_stats.items()
+                    ) + (f", warm {file_summary['warm_speedup']:.1f}x faster"
+                         if 'warm_speedup' in file_summary else ""))
+                paths = file_summary.get('download_paths', {})
+                if paths:
+                    print("    Download paths (median): " + ", ".join(
+                        f"{path} {stats['throughput_stats']['median'] * 8 / 1_000_000:.1f} Mbps"
+                        + (f" ttfb {stats['ttfb_stats']['median']:.3f}s" if stats['ttfb_stats'] else "")
+                        for path, stats in paths.items()
+                    ))
+                split = file_summary.get('upload_decomposition')
+                if split:
+                    print(f"    Upload split: hash {split['hash_time']:.3f}s, "
+                          f"local import {split['import_time']:.3f}s, "
+                          f"network {split['network_time']:.3f}s ({split['bound']}-bound)")
+                propagation = file_summary.get('propagation_wait_stats')
+                if propagation:
+                    print(f"    Propagation wait: {propagation['mean']:.3f}s "
+                          f"(p95 {propagation['p95']:.3f}s)")
+
+        if self.shaping_waits:
+            unconfirmed = sum(1 for entry in self.shaping_waits if not entry['ready'])
+            slept = sum(1 for entry in self.shaping_waits if entry.get('probe') == 'sleep')
+            print(f"\nShaping setup wait: {summary['test_info']['shaping_wait']:.2f}s over "
+                  f"{len(self.shaping_waits)} changes ({unconfirmed} not confirmed, "
+                  f"{slept} unobservable)")
+            if slept:
+                print(f"  WARNING: shaping could not be observed for {slept} changes; those "
+                      f"scenarios may have been measured before their limit took effect")
+            for setup in self.scenario_setups:
+                failed = [container for container, ok in setup['containers'].items() if not ok]
+                unconfirmed = [container for container, ok in setup.get('confirmed', {}).items()
+                               if not ok and container not in failed]
+                print(f"  {setup['scenario'] or '(resume)':<12} {setup['action']:<7} "
+                      f"{setup['latency']:>6.2f}s  {len(setup['containers']) - len(failed)}/"
+                      f"{len(setup['containers'])} ok" + (f" (failed: {', '.join(failed)})" if failed else "")
+                      + (f" (not confirmed: {', '.join(unconfirmed)})" if unconfirmed else ""))
+
+        if self.hygiene is not None:
+            collections = [entry for entry in self.hygiene.records if entry['action'] == 'gc']
+            failed = [entry for entry in collections if entry.get('error')]
+            print(f"\nRepo hygiene: {len(collections)} GC runs, "
+                  f"{sum(entry['gc_time'] for entry in collections):.2f}s collecting"
+                  + (f", {len(failed)} failed" if failed else ""))
+            for container, size in self.hygiene.repo_sizes.items():
+                if size is not None:
+                    print(f"  {container}: repo {size / (1024 * 1024):.1f} MiB at end")
+
+        if summary.get('import_rankings'):
+            print("\nImport Parameters (median Mbps, ranked by upload; ↓# is the download rank):")
+            print("="*60)
+            print(f"{'Scenario':<12} {'File':<14} {'↑#':>3} {'↓#':>3} {'↑Mbps':>9} {'↓Mbps':>9}  Parameters")
+            for ranking in summary['import_rankings']:
+                for configuration in ranking['configurations']:
+                    print(f"{ranking['scenario']:<12} {ranking['file']:<14} "
+                          f"{configuration['upload_rank']:>3} {configuration['download_rank']:>3} "
+                          f"{configuration['upload_throughput'] * 8 / 1_000_000:>9.1f} "
+                          f"{configuration['download_throughput'] * 8 / 1_000_000:>9.1f}  "
+                          f"{configuration['import_params']}")
+
+        if self.concurrency_results:
+            print("\nConcurrency Sweep:")
+            print("="*60)
+            print(f"{'Scenario':<12} {'File':<14} {'Workers':>7} {'ops/s':>8} "
+                  f"{'↑Mbps':>9} {'↓Mbps':>9} {'p50 s':>8} {'p99 s':>8} {'err%':>6}")
+            for level in self.concurrency_results:
+                print(f"{level['scenario']:<12} {level['file']:<14} {level['concurrency']:>7} "
+                      f"{level['ops_per_second']:>8.2f} "
+                      f"{level['aggregate_upload_throughput'] * 8 / 1_000_000:>9.1f} "
+                      f"{level['aggregate_download_throughput'] * 8 / 1_000_000:>9.1f} "
+                      f"{level['total_latency']['p50']:>8.2f} {level['total_latency']['p99']:>8.2f} "
+                      f"{level['error_rate'] * 100:>6.1f}")
+
+        if self.open_loop_results:
+            print("\nOpen Loop:")
+            print("="*60)
+            print(f"{'Scenario':<12} {'File':<14} {'Arrival':<9} {'offered':>8} {'achieved':>9} "
+                  f"{'p50 s':>8} {'p99 s':>8} {'err%':>6}")
+            for run in self.open_loop_results:
+                print(f"{run['scenario']:<12} {run['file']:<14} {run['arrival']:<9} "
+                      f"{run['offered_rate']:>8.2f} {run['achieved_rate']:>9.2f} "
+                      f"{run['latency']['p50']:>8.2f} {run['latency']['p99']:>8.2f} "
+                      f"{run['error_rate'] * 100:>6.1f}")
+
+        if self.pair_matrix_results:
+            print("\nPair Matrix (median Mbps, slowest and most asymmetric pairs):")
+            print("="*60)
+            for matrix in self.pair_matrix_results:
+                names = matrix['nodes']
+                pairs = [(matrix['download_throughput'][i][j], names[i], names[j], i, j)
+                         for i in range(len(names)) for j in range(len(names))
+                         if matrix['download_throughput'][i][j] is not None]
+                if not pairs:
+                    continue
+                slowest = min(pairs)
+                print(f"{matrix['scenario']:<12} {matrix['file']:<14} slowest "
+                      f"{slowest[1]}→{slowest[2]} {slowest[0] * 8 / 1_000_000:.1f} Mbps")
+                asymmetric = [(abs(v - matrix['download_throughput'][j][i]) / max(v, matrix['download_throughput'][j][i]), a, b)
+                              for v, a, b, i, j in pairs
+                              if i < j and matrix['download_throughput'][j][i] is not None]
+                if asymmetric:
+                    ratio, a, b = max(asymmetric)
+                    print(f"{'':<27} most asymmetric {a}↔{b} ({ratio * 100:.0f}% difference)")
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="IPFS Bandwidth Performance Test Runner")
+    parser.add_argument("config", nargs="?", default="test-scenarios.json",
+                        help="Scenario configuration file (default: test-scenarios.json)")
+    parser.add_argument("--engine", choices=["sync", "async"], default="sync",
+                        help="Execution engine: blocking requests (sync) or asyncio/aiohttp (async)")
+    parser.add_argument("--resume", metavar="RESULTS",
+                        help="Continue an interrupted run from its results journal (or JSON) file, "
+                             "skipping iterations that already succeeded")
+    return parser.parse_args()
+
 
 def main():
     """Main entry point"""
+    args = parse_args()
+
+    if args.engine == 'async' and aiohttp is None:
+        print("Error: --engine async requires aiohttp (python3 -m pip install aiohttp)")
+        sys.exit(1)
+
     # Check if Docker is running
     try:
         subprocess.run(['docker', 'ps'], capture_output=True, check=True)
@@ -426,7 +3349,14 @@ def main():
         sys.exit(1)
 
     # Run tests
-    tester = IPFSBandwidthTester()
+    tester = IPFSBandwidthTester(args.config, engine=args.engine)
+    if args.resume:
+        # A crashed .npz run leaves only its spool journal behind
+        if not Path(args.resume).exists() and not (is_store(args.resume)
+                                                   and spool_path(args.resume).exists()):
+            print(f"Error: Results file not found: {args.resume}")
+            sys.exit(1)
+        tester.resume_from(args.resume)
     tester.run_all_tests()
 
 if __name__ == "__main__":
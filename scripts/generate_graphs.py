@@ -4,20 +4,22 @@ IPFS Bandwidth Test Results Visualization
 Generate graphs from test results JSON files
 """
 
-import json
+import sys
 import matplotlib.pyplot as plt
 import matplotlib
 import numpy as np
 from pathlib import Path
 import japanize_matplotlib
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from result_frame import load_results
+
 # Use non-interactive backend
 matplotlib.use('Agg')
 
 def load_json(filepath):
-    """Load JSON test results"""
-    with open(filepath, 'r') as f:
-        return json.load(f)
+    """Load test results (any runner output format, cached)"""
+    return load_results(filepath)
 
 def aggregate_results(results):
     """Aggregate results by file size (average of iterations)"""
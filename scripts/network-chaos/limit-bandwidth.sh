@@ -46,7 +46,7 @@ fi
 
 # Kill any existing Pumba process for this container
 print_blue "Stopping any existing network chaos for $CONTAINER_NAME..."
-docker ps -a | grep pumba | grep -E "rate.*$CONTAINER_NAME" | awk '{print $1}' | xargs -r docker rm -f 2>/dev/null || true
+docker ps -a --format '{{.ID}} {{.Names}}' | grep -E " pumba-rate-${CONTAINER_NAME}\$" | awk '{print $1}' | xargs -r docker rm -f 2>/dev/null || true
 
 # Apply bandwidth limit using Pumba
 print_blue "Limiting bandwidth to ${RATE} for $CONTAINER_NAME..."
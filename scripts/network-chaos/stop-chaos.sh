@@ -45,7 +45,8 @@ else
     CONTAINER_NAME=$1
     print_blue "Stopping network chaos for $CONTAINER_NAME..."
 
-    PUMBA_CONTAINERS=$(docker ps -a | grep pumba | grep -E "(delay|loss|rate|corrupt).*$CONTAINER_NAME" | awk '{print $1}')
+    # Match the whole sidecar name, so ipfs-org1 does not also stop ipfs-org10's chaos
+    PUMBA_CONTAINERS=$(docker ps -a --format '{{.ID}} {{.Names}}' | grep -E " pumba-(delay|loss|rate|corrupt|multi)-${CONTAINER_NAME}\$" | awk '{print $1}')
 
     if [ -z "$PUMBA_CONTAINERS" ]; then
         print_yellow "No active network chaos found for $CONTAINER_NAME"
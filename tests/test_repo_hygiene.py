@@ -0,0 +1,115 @@
+"""RepoHygiene under the async engine: a pending GC must not deadlock the run"""
+import asyncio
+import importlib.util
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+spec = importlib.util.spec_from_file_location(
+    'run_bandwidth_test', Path(__file__).resolve().parent.parent / 'run-bandwidth-test.py'
+)
+bench = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bench)
+
+
+class FakeResponse:
+    def __init__(self, status_code: int = 200, text: str = ''):
+        self.status_code = status_code
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {'RepoSize': 0}
+
+
+class FakeTester:
+    """Just what RepoHygiene uses of IPFSBandwidthTester"""
+
+    def __init__(self, targets):
+        self.groups = [{'name': 'default', 'targets': targets}]
+        self.group_of = {target['container']: 'default' for target in targets}
+        self.readiness = {'pollIntervalSeconds': 0.01}
+        self.journal = None
+        self._results_lock = threading.Lock()
+        self.calls = []
+
+    def rpc(self, target, path, **params):
+        self.calls.append((target['container'], path))
+        return FakeResponse()
+
+
+class FailingGCTester(FakeTester):
+    def rpc(self, target, path, **params):
+        self.calls.append((target['container'], path))
+        if path == '/api/v0/repo/gc':
+            return FakeResponse(500, 'gc failed')
+        return FakeResponse()
+
+
+def test_async_iterations_wait_out_pending_gc_without_deadlock():
+    upload, download = {'container': 'up'}, {'container': 'down'}
+    tester = FakeTester([upload, download])
+    hygiene = bench.RepoHygiene(tester, gc_threshold_bytes=1)
+    pair = (upload, download)
+
+    async def iteration(gc_pending: asyncio.Event = None, waiters_queued: asyncio.Event = None):
+        ticket = await hygiene.begin_async(pair)
+        try:
+            if gc_pending is not None:
+                # Queue a GC over the threshold while this measurement is in flight
+                hygiene.finish({'ipfs_hash': 'bafy', 'fileSize': 10}, pair, ticket)
+                while not hygiene._collecting:
+                    await asyncio.sleep(0.01)
+                gc_pending.set()
+                await waiters_queued.wait()
+            # In-flight work that needs the (small) default executor, like
+            # content_sha256 and the sync RPC helpers of the real engine
+            await asyncio.to_thread(time.sleep, 0.05)
+        finally:
+            hygiene.end(pair)
+        return ticket
+
+    async def run():
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=2))
+        gc_pending, waiters_queued = asyncio.Event(), asyncio.Event()
+        first = asyncio.create_task(iteration(gc_pending, waiters_queued))
+        await gc_pending.wait()
+        waiting = [asyncio.create_task(iteration()) for _ in range(16)]
+        await asyncio.sleep(0.1)
+        waiters_queued.set()
+        return await asyncio.wait_for(asyncio.gather(first, *waiting), timeout=10)
+
+    try:
+        tickets = asyncio.run(run())
+    finally:
+        hygiene.close()
+
+    assert all(ticket['gc_wait'] > 0 for ticket in tickets[1:])
+    assert all(ticket['gc_duration'] > 0 for ticket in tickets[1:])
+    assert [entry['container'] for entry in hygiene.records if entry['action'] == 'gc'] == ['up', 'down']
+    assert all(count == 0 for count in hygiene._active.values())
+
+
+def test_failed_gc_is_recorded_and_retried():
+    upload, download = {'container': 'up'}, {'container': 'down'}
+    tester = FailingGCTester([upload, download])
+    hygiene = bench.RepoHygiene(tester, gc_threshold_bytes=1)
+    pair = (upload, download)
+    try:
+        hygiene.finish({'ipfs_hash': 'bafy', 'fileSize': 10}, pair, hygiene.begin(pair))
+        hygiene.end(pair)
+        while len(hygiene.records) < 4:  # two unpins, two GCs
+            time.sleep(0.01)
+        ticket = hygiene.begin(pair)
+        hygiene.end(pair)
+    finally:
+        hygiene.close()
+
+    collections = [entry for entry in hygiene.records if entry['action'] == 'gc']
+    assert collections and all('HTTP 500' in entry['error'] for entry in collections)
+    # The unpinned bytes stay pending, so close() collects again
+    assert [c for c, path in tester.calls if path == '/api/v0/repo/gc'].count('up') == 2
+    assert ticket['repo_sizes'] == {'up': 0, 'down': 0}
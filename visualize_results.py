@@ -12,15 +12,16 @@ import numpy as np
 from pathlib import Path
 from datetime import datetime
 import seaborn as sns
+from analyze_results import timeline_throughput, find_stalls
+import result_frame
 
 # Set style
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
 
 def load_results(json_file):
-    """Load results from JSON file"""
-    with open(json_file, 'r') as f:
-        return json.load(f)
+    """Load results from a results JSON file or NDJSON journal"""
+    return result_frame.load_results(json_file)
 
 def create_summary_table(data):
     """Create a summary table of results"""
@@ -189,6 +190,84 @@ def create_performance_graphs(data, output_dir):
 
     return fig, df
 
+def create_timeline_graphs(data, output_dir):
+    """Plot instantaneous download throughput curves from transfer timelines
+
+    One panel per scenario, one line per successful iteration, coloured by
+    file. Detected stalls are shaded so mid-transfer pauses stand out.
+    Returns None if the results carry no timelines.
+    """
+    results = [r for r in data['results'] if r['success'] and r.get('download_timeline')]
+    if not results:
+        return None
+
+    scenarios_list = list(dict.fromkeys(r['scenario_name'] for r in results))
+    files_list = list(dict.fromkeys(r['file'] for r in results))
+    colors = dict(zip(files_list, sns.color_palette("husl", len(files_list))))
+
+    fig, axes = plt.subplots(len(scenarios_list), 1, figsize=(14, 4 * len(scenarios_list)), squeeze=False)
+    for ax, scenario in zip(axes[:, 0], scenarios_list):
+        labelled = set()
+        for result in results:
+            if result['scenario_name'] != scenario:
+                continue
+            series = timeline_throughput(result['download_timeline'])
+            if not series:
+                continue
+            times, rates = zip(*series)
+            label = result['file'] if result['file'] not in labelled else None
+            labelled.add(result['file'])
+            ax.plot(times, [r * 8 / 1_000_000 for r in rates], color=colors[result['file']],
+                    alpha=0.6, linewidth=1, label=label)
+            for start_ms, duration_ms in find_stalls(result['download_timeline']):
+                ax.axvspan(start_ms / 1000, (start_ms + duration_ms) / 1000,
+                           color=colors[result['file']], alpha=0.1)
+        ax.set_title(f'Download Throughput over Time - {scenario}', fontsize=12, fontweight='bold')
+        ax.set_xlabel('Elapsed (s)')
+        ax.set_ylabel('Speed (Mbps)')
+        ax.legend(title='File', bbox_to_anchor=(1.01, 1), loc='upper left')
+        ax.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_file = f"{output_dir}/download_timeline_{timestamp}.png"
+    plt.savefig(output_file, dpi=150, bbox_inches='tight')
+    print(f"Timeline graphs saved to: {output_file}")
+
+    return fig
+
+def create_pair_matrix_heatmaps(data, output_dir):
+    """Heatmaps of median download throughput for every node pair
+
+    One panel per (scenario, file) pair-matrix run; rows are uploaders and
+    columns downloaders, so slow links and asymmetric paths stand out.
+    Returns None if the run has no pair matrix.
+    """
+    matrices = data.get('pair_matrix') or []
+    if not matrices:
+        return None
+
+    fig, axes = plt.subplots(1, len(matrices), figsize=(7 * len(matrices), 6), squeeze=False)
+    for ax, matrix in zip(axes[0], matrices):
+        mbps = np.array([[np.nan if v is None else v * 8 / 1_000_000 for v in row]
+                         for row in matrix['download_throughput']])
+        sns.heatmap(mbps, ax=ax, annot=True, fmt='.0f', cmap='viridis',
+                    xticklabels=matrix['nodes'], yticklabels=matrix['nodes'],
+                    cbar_kws={'label': 'Median download (Mbps)'})
+        ax.set_title(f"{matrix['scenario']} - {matrix['file']}", fontsize=12, fontweight='bold')
+        ax.set_xlabel('Download node')
+        ax.set_ylabel('Upload node')
+
+    plt.tight_layout()
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_file = f"{output_dir}/pair_matrix_{timestamp}.png"
+    plt.savefig(output_file, dpi=150, bbox_inches='tight')
+    print(f"Pair matrix heatmaps saved to: {output_file}")
+
+    return fig
+
 def create_detailed_table(data):
     """Create a detailed table with statistics"""
     results = data['results']
@@ -289,6 +368,8 @@ def main():
     print("\n📉 GENERATING PERFORMANCE GRAPHS...")
     print("="*80)
     fig, plot_df = create_performance_graphs(data, output_dir)
+    create_timeline_graphs(data, output_dir)
+    create_pair_matrix_heatmaps(data, output_dir)
     plt.show()
 
     # Create comparison matrix